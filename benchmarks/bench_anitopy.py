@@ -0,0 +1,106 @@
+"""
+anitopy 解析基准 (L1 内核的 AnitopyWrapper.parse 热路径)
+
+用法: PYTHONPATH=src python benchmarks/bench_anitopy.py [--stride N] [--rounds N] [--pack 8,32,128]
+- corpus: 以内核选项逐条解析语料 (不经过结果缓存与看门狗)，统计每个文件名的平均耗时 (µs)
+- pack:   合成长合集文件名 (N 个分集/规格片段拼接)，观察耗时随 token 数的增长曲线；
+          线性实现下 µs/token 应基本持平，若随 N 增大明显上升说明出现了二次方查找
+每项取 --rounds 轮中的最小值以压低共享机器的抖动。
+--replay FILE: 重放看门狗记录的事故输入 (AM_ANITOPY_INCIDENT_FILE)，逐条报告当前是否仍超预算 / 崩溃
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+import anitopy
+from recognition_engine.anitopy_wrapper import DEFAULT_OPTIONS, AnitopyWrapper
+
+from corpus_loader import CORPUS_VERSION, load_corpus
+
+PACK_SEGMENT = "[{n:02d}][1080P][WEB-DL][AAC AVC][CHT] "
+
+
+def pack_name(segments: int) -> str:
+    """合成的长合集文件名：一个标题 + segments 个带括号的分集/规格片段"""
+    body = "".join(PACK_SEGMENT.format(n=i + 1) for i in range(segments))
+    return f"[Nekomoe kissaten&LoliHouse] Sousou no Frieren - Batch {body}Complete.mkv"
+
+
+def best_of(rounds: int, func: Callable[[], None]) -> float:
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+
+# 与内核相同的选项，但绕过 AnitopyWrapper 的结果缓存与看门狗，测的是解析本身
+PARSER = anitopy.CompiledAnitopy(DEFAULT_OPTIONS)
+
+
+def parse_all(names: List[str]) -> Callable[[], None]:
+    def run():
+        for name in names:
+            PARSER.parse(name)
+    return run
+
+
+def count_tokens(name: str) -> int:
+    from anitopy.element import Elements
+    from anitopy.anitopy import default_options
+    from anitopy.token import Tokens
+    from anitopy.tokenizer import Tokenizer
+    tokens = Tokens()
+    Tokenizer(name, dict(default_options), Elements(), tokens).tokenize()
+    return len(tokens.get_list())
+
+
+def replay(path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    parser = AnitopyWrapper._parser
+    failed = 0
+    for row in rows:
+        t0 = time.perf_counter()
+        try:
+            parser.parse(row["filename"])
+            status = "ok"
+        except anitopy.ParseBudgetExceeded as e:
+            status, failed = f"budget ({e.reason}, {e.steps} steps)", failed + 1
+        except Exception as e:
+            status, failed = f"crash ({type(e).__name__})", failed + 1
+        print(f"{(time.perf_counter() - t0) * 1000:8.1f} ms  {status:<40} {row['filename']!r}")
+    print(f"replayed {len(rows)} inputs, {failed} still failing")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=CORPUS_VERSION)
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pack", default="8,32,128", help="合集片段数，逗号分隔")
+    parser.add_argument("--replay", help="重放看门狗事故记录 (JSON Lines)")
+    args = parser.parse_args()
+    if args.replay:
+        return replay(args.replay)
+
+    names = load_corpus(args.version, stride=args.stride)
+    parse_all(names[:50])()  # 预热
+
+    elapsed = best_of(args.rounds, parse_all(names))
+    print(f"corpus {args.version}: {len(names)} files, {elapsed / len(names) * 1e6:8.1f} µs/file")
+
+    packs = [int(s) for s in args.pack.split(",") if s]
+    if packs: print(f"{'pack segments':>14} {'tokens':>7} {'µs/parse':>10} {'µs/token':>9}")
+    for segments in packs:
+        name = pack_name(segments)
+        tokens = count_tokens(name)
+        elapsed = best_of(args.rounds, parse_all([name]))
+        print(f"{segments:>14} {tokens:>7} {elapsed * 1e6:>10.1f} {elapsed * 1e6 / tokens:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
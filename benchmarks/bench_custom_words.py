@@ -0,0 +1,77 @@
+"""
+自定义识别词预处理基准
+
+用法: PYTHONPATH=src python benchmarks/bench_custom_words.py [规则数] [文件名数]
+生成一份混合类型的规则列表 (屏蔽 / 替换 / 提取 / 集数偏移 / 组合)，
+对一批合成文件名执行 TitleCleaner.pre_clean，输出总耗时与吞吐。
+"""
+import random
+import sys
+import time
+
+from recognition_engine.title_cleaner import TitleCleaner
+
+SEED = 20261019
+
+
+def build_rules(count: int):
+    rng = random.Random(SEED)
+    rules = []
+    for i in range(count):
+        kind = i % 6
+        if kind == 0:
+            rules.append(f"NoiseWord{i}")
+        elif kind == 1:
+            rules.append(f"Show\\s*Title\\s*{i} => 番剧{i}")
+        elif kind == 2:
+            rules.append(f"[REMOTE]Series {i} => {{[tmdbid={100000 + i};type=tv;s={rng.randint(1, 4)}]}}")
+        elif kind == 3:
+            rules.append(f"第 <> 话{i} >> EP+{rng.randint(1, 24)}")
+        elif kind == 4:
+            rules.append(f"Alpha{i} && Beta{i} => Gamma{i}")
+        else:
+            rules.append(f"\\[(\\d+)v{i}\\] => {{[e=\\1@+{rng.randint(1, 12)}]}}")
+    return rules
+
+
+def build_names(count: int, rule_count: int):
+    rng = random.Random(SEED + 1)
+    groups = ["ANi", "Nekomoe kissaten", "LoliHouse", "SweetSub", "喵萌奶茶屋"]
+    names = []
+    for i in range(count):
+        idx = rng.randrange(rule_count)
+        ep = rng.randint(1, 26)
+        style = i % 4
+        if style == 0:
+            names.append(f"[{rng.choice(groups)}] Show Title {idx} - {ep:02d} [1080p][CHS].mkv")
+        elif style == 1:
+            names.append(f"[{rng.choice(groups)}] Series {idx} [{ep:02d}v{idx}][WebRip 1080p HEVC-10bit AAC].mp4")
+        elif style == 2:
+            names.append(f"Anime/Series {idx}/Season 1/[{rng.choice(groups)}] Alpha{idx} 第{ep}话{idx} NoiseWord{idx} [720p].mkv")
+        else:
+            names.append(f"[{rng.choice(groups)}] Untouched Title {i} - {ep:02d} [BDRip 1080p].mkv")
+    return names
+
+
+def main():
+    rule_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    name_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    rules = build_rules(rule_count)
+    names = build_names(name_count, rule_count)
+
+    t0 = time.perf_counter()
+    TitleCleaner.pre_clean(names[0], rules)
+    warm = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for name in names:
+        TitleCleaner.pre_clean(name, rules)
+    elapsed = time.perf_counter() - t0
+
+    print(f"rules={rule_count} names={name_count}")
+    print(f"first call: {warm * 1000:.1f} ms")
+    print(f"total: {elapsed:.2f} s  per-name: {elapsed / name_count * 1000:.3f} ms  throughput: {name_count / elapsed:.0f} names/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+导入耗时预算 (python -X importtime)
+
+用法:
+  PYTHONPATH=src python benchmarks/bench_import.py              # 逐模块比对预算，超出时非零退出
+  PYTHONPATH=src python benchmarks/bench_import.py --top 15     # 同时列出自身耗时最高的子模块
+  PYTHONPATH=src python benchmarks/bench_import.py --rounds 9 --module recognition_engine.kernel
+
+每个模块在全新子进程中导入 --rounds 次，取累计耗时 (cumulative) 的最小值以压低共享机器的抖动。
+zhconv / cn2an / httpx / difflib 与 FastAPI 栈均为按需导入，任何一个被重新提到模块顶层都会让预算失守。
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+# 模块 -> 预算 (ms)
+BUDGETS = {
+    "recognition_engine": 30.0,
+    "recognition_engine.kernel": 150.0,
+    "recognition_service.recognizer": 250.0,
+}
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """在子进程中导入 module，返回 -X importtime 的 (模块名, 自身 µs, 累计 µs) 列表"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, os.environ.get("PYTHONPATH", "")]))
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         env=env, check=True, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str, rounds: int) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """返回 (最小累计耗时 ms, 该轮的明细)"""
+    best, best_rows = None, []
+    for _ in range(rounds):
+        rows = import_profile(module)
+        total = next((cum for name, _, cum in reversed(rows) if name == module), 0)
+        if best is None or total < best: best, best_rows = total, rows
+    return best / 1000, best_rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", action="append", help="只测指定模块 (可重复)，未在预算表中的模块只报告不判定")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="列出自身耗时最高的 N 个子模块")
+    args = parser.parse_args()
+
+    ok = True
+    results: Dict[str, float] = {}
+    print(f"{'module':<34} {'import ms':>10} {'budget':>8}  status")
+    for module in args.module or list(BUDGETS):
+        elapsed, rows = measure(module, args.rounds)
+        results[module] = elapsed
+        budget = BUDGETS.get(module)
+        status = "-" if budget is None else ("ok" if elapsed <= budget else "OVER BUDGET")
+        if budget is not None and elapsed > budget: ok = False
+        print(f"{module:<34} {elapsed:>10.1f} {budget if budget is not None else '-':>8}  {status}")
+        if args.top:
+            for name, self_us, cum_us in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+                print(f"    {name:<48} self {self_us / 1000:>7.1f}ms  cumulative {cum_us / 1000:>7.1f}ms")
+    print("import budget: PASS" if ok else "import budget: FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
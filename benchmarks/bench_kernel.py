@@ -0,0 +1,79 @@
+"""
+识别内核吞吐与分步剖析基准
+
+用法: PYTHONPATH=src python benchmarks/bench_kernel.py [--stride N] [--limit N] [--alloc]
+- 吞吐: 对语料逐条调用 core_recognize，分别统计 log_level=off (NullLog) 与 full (list) 的 files/sec
+  两种级别交替执行 --rounds 轮、取最快一轮，每轮前清空 anitopy 解析缓存，避免后跑的级别白捡缓存命中
+- 分步: 通过 StepSpans.profiler 统计 STEP 1~7 每步的平均耗时与占比
+- --alloc: 额外开启 tracemalloc，统计每步的内存分配峰值 (会显著拖慢执行，耗时数据仅供相对比较)
+首轮预热 (内置组名单、正则缓存) 不计入统计。
+"""
+import argparse
+import time
+import tracemalloc
+
+from recognition_engine.anitopy_wrapper import AnitopyWrapper
+from recognition_engine.audit_log import NullLog
+from recognition_engine.kernel import core_recognize
+from recognition_engine.tracing import StepProfiler, StepSpans
+
+from corpus_loader import CORPUS_VERSION, load_corpus
+
+
+def throughput(names, full_logs: bool) -> float:
+    AnitopyWrapper.cache_clear()
+    t0 = time.process_time()
+    for name in names:
+        core_recognize(name, [], [], name, [] if full_logs else NullLog())
+    return len(names) / (time.process_time() - t0)
+
+
+def profile_steps(names, track_alloc: bool) -> StepProfiler:
+    profiler = StepProfiler()
+    StepSpans.profiler = profiler
+    if track_alloc: tracemalloc.start()
+    try:
+        for name in names:
+            core_recognize(name, [], [], name, NullLog())
+    finally:
+        if track_alloc: tracemalloc.stop()
+        StepSpans.profiler = None
+    return profiler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=CORPUS_VERSION)
+    parser.add_argument("--stride", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--alloc", action="store_true")
+    args = parser.parse_args()
+
+    names = load_corpus(args.version, stride=args.stride, limit=args.limit)
+    print(f"corpus {args.version}: {len(names)} files")
+
+    # 预热
+    for name in names[:20]:
+        core_recognize(name, [], [], name, NullLog())
+
+    best = {False: 0.0, True: 0.0}
+    for _ in range(args.rounds):
+        for full_logs in (False, True):
+            best[full_logs] = max(best[full_logs], throughput(names, full_logs))
+    print(f"throughput (log off):  {best[False]:8.1f} files/sec")
+    print(f"throughput (log full): {best[True]:8.1f} files/sec")
+
+    profiler = profile_steps(names, args.alloc)
+    total = sum(row[1] for row in profiler.stats.values()) or 1.0
+    header = f"{'step':<28} {'ms/file':>9} {'share':>7}"
+    if args.alloc: header += f" {'peak KiB/file':>14}"
+    print(header)
+    for step, (count, seconds, peak) in profiler.stats.items():
+        line = f"{step:<28} {seconds / count * 1000:>9.3f} {seconds / total:>6.1%}"
+        if args.alloc: line += f" {peak / count / 1024:>14.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
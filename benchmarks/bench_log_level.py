@@ -0,0 +1,70 @@
+"""
+审计日志级别开销基准
+
+用法: PYTHONPATH=src python benchmarks/bench_log_level.py [轮数]
+以离线模式 (with_cloud=False, use_storage=False) 执行完整 RecognitionWorkflow，
+分别统计 log_level = full / summary / off 时的单请求 CPU 时间与 JSON 响应体积。
+CPU 时间取各轮中最快的一轮 (虚拟机上单轮波动可达 ±15%，均值会淹没级别之间的差异)。
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from recognition_service.context import RecognitionContext
+from recognition_service.recognizer import RecognitionWorkflow
+
+SAMPLES = [
+    "[ANi] 花樣少年少女 - 02 [1080P][Baha][WEB-DL][AAC AVC][CHT].mp4",
+    "[Nekomoe kissaten&LoliHouse] Sousou no Frieren - 12 [WebRip 1080p HEVC-10bit AAC ASSx2].mkv",
+    "[喵萌奶茶屋&LoliHouse] 葬送的芙莉莲 / Sousou no Frieren - 28 [WebRip 1080p HEVC-10bit AAC][简繁日内封字幕].mkv",
+    "Spy.x.Family.S02E05.1080p.CR.WEB-DL.AAC2.0.H.264-VARYG.mkv",
+    "[SweetSub][Mono][01-12][WebRip][1080P][AVC 8bit][简日双语].mkv",
+    "[VCB-Studio] Kimi no Na wa. [Ma10p_1080p][x265_flac_aac].mkv",
+    "/downloads/Anime/Oshi no Ko/Season 2/[SubsPlease] Oshi no Ko - 15 (1080p) [2A1F6F4B].mkv",
+    "[桜都字幕组] 欢迎来到实力至上主义的教室 第三季 / Youkoso Jitsuryoku Shijou Shugi no Kyoushitsu e S3 [07][1080p][简繁内封].mkv",
+    "【幻樱字幕组】【4月新番】【我独自升级 Ore dake Level Up na Ken】【03】【BIG5_MP4】【1920X1080】.mp4",
+    "[DBD-Raws][进击的巨人 最终季/Shingeki no Kyojin The Final Season][01-16TV全集][1080P][BDRip][HEVC-10bit][FLAC][MKV]",
+]
+
+
+async def run_once(filename: str, level: str):
+    ctx = RecognitionContext(filename=filename, original_filename=filename, log_level=level)
+    return await RecognitionWorkflow(ctx).run()
+
+
+async def measure(level: str, rounds: int):
+    # 预热一轮 (内置组名单、正则缓存)，再统计
+    for name in SAMPLES:
+        await run_once(name, level)
+
+    best, size, lines = float("inf"), 0, 0
+    for _ in range(rounds):
+        cpu = 0.0
+        for name in SAMPLES:
+            t0 = time.process_time()
+            result = await run_once(name, level)
+            body = json.dumps(result, ensure_ascii=False, default=str)
+            cpu += time.process_time() - t0
+            size += len(body.encode("utf-8"))
+            lines += len(result.get("logs", []))
+        best = min(best, cpu)
+    n = rounds * len(SAMPLES)
+    print(f"{level:<8} {best / len(SAMPLES) * 1000:>11.2f} {size / n:>10.0f} {lines / n:>10.1f}", flush=True)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    if len(sys.argv) > 2:
+        asyncio.run(measure(sys.argv[2], rounds))
+        return
+
+    # 每个级别在独立进程中执行，避免彼此共享缓存造成的偏差
+    print(f"{'level':<8} {'cpu ms/req':>11} {'bytes/req':>10} {'log lines':>10}")
+    for level in ("full", "summary", "off"):
+        subprocess.run([sys.executable, __file__, str(rounds), level], check=True)
+
+
+if __name__ == "__main__":
+    main()
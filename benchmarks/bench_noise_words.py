@@ -0,0 +1,91 @@
+"""
+NOISE_WORDS 剥离一致性校验与基准
+
+用法: PYTHONPATH=src python benchmarks/bench_noise_words.py [样本数]
+将 NoiseMatcher.strip 与逐条 search + sub 的参考实现逐一比对 (文本与命中记录必须完全一致)，
+随后输出两者的耗时对比。任何差异都会打印出来并以非零状态退出。
+"""
+import random
+import sys
+import time
+
+import regex as re
+
+from recognition_engine.constants import NOISE_WORDS
+from recognition_engine.noise_matcher import NoiseMatcher
+
+SEED = 20261019
+
+FRAGMENTS = [
+    "10bit", "8bit", "Hi10p", "Ma10p", "HEVC", "AVC", "x265", "FullHD", "Full-HD", "(VFR)", "(cfr)",
+    "BBC", "XXX", "DC", "ABCTV", "LINETV", "JADE", "TVB", "CCTV-4K", "V2", "v3", "ver2", "Movie", "OVA",
+    "SP", "Specials", "剧场版", "CD1", "DVD 2", "DISC3", " GB", "UNCUT", "REPACK", "Complete", "Version",
+    "简繁日内封", "简体", "繁中", "双语", "简日双语 MKV", "中文字幕", "[CHS]", "[JPN]", "[SC]",
+    "年龄限制版", "无修正", "10月新番", "★10月新番★", "合集", "搬运", "喵萌字幕组", "YYeTs", "人人影视",
+    "Title", "Show", "Kimi no Na wa", "Sousou no Frieren", "进击的巨人", "-", "_", ".", " ", "[", "]", "(", ")",
+]
+
+EDGE_CASES = [
+    "HEVC10bitV2",
+    "SP10bit",
+    "Title 10bit v2 - 01",
+    "[Group] Show - 01 [1080p][10bit][简繁日内封][CHS].mkv",
+    "ABCTV10bitDC",
+    "FullHD(VFR)Movie",
+    "LINETV ABCTV",
+    "",
+]
+
+
+def reference_strip(text: str):
+    """改造前的逐条实现"""
+    hits = []
+    for nw in NOISE_WORDS:
+        if re.search(nw, text, flags=re.I):
+            hits.append((nw, [m.group(0) for m in re.finditer(nw, text, flags=re.I)]))
+            text = re.sub(nw, " ", text, flags=re.I)
+    return text, hits
+
+
+def build_samples(count: int):
+    rng = random.Random(SEED)
+    samples = list(EDGE_CASES)
+    for _ in range(count):
+        parts = rng.choices(FRAGMENTS, k=rng.randint(1, 12))
+        sep = rng.choice(["", " ", ".", "_"])
+        samples.append(sep.join(parts))
+    return samples
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    samples = build_samples(count)
+
+    mismatches = 0
+    for s in samples:
+        expected = reference_strip(s)
+        actual = NoiseMatcher.strip(s)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH {s!r}\n  expected: {expected!r}\n  actual:   {actual!r}")
+
+    t0 = time.perf_counter()
+    for s in samples:
+        for nw in NOISE_WORDS:
+            if re.search(nw, s, flags=re.I):
+                s = re.sub(nw, " ", s, flags=re.I)
+    ref_elapsed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for s in samples: NoiseMatcher.strip(s)
+    new_elapsed = time.perf_counter() - t0
+
+    print(f"samples={len(samples)} mismatches={mismatches}")
+    print(f"sequential: {ref_elapsed / len(samples) * 1e6:.1f} us/title")
+    print(f"matcher:    {new_elapsed / len(samples) * 1e6:.1f} us/title")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
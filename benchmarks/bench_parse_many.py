@@ -0,0 +1,58 @@
+"""
+anitopy 批量解析吞吐基准 (CompiledAnitopy.parse 逐条 vs parse_many，均以内核选项、不经过结果缓存)
+
+用法: PYTHONPATH=src python benchmarks/bench_parse_many.py [--sizes 1000,10000] [--rounds 3]
+标题按语料顺序循环取满 N 条；每个规模先校验 parse_many 与逐条结果完全一致，再分别统计 titles/sec
+(取 --rounds 轮中的最好成绩)。--no-prepass 关闭整批关键字预扫描，用于单独观察预扫描的收益。
+"""
+import argparse
+import itertools
+import time
+from typing import Callable, List
+
+import anitopy
+from recognition_engine.anitopy_wrapper import DEFAULT_OPTIONS
+
+from corpus_loader import CORPUS_VERSION, load_corpus
+
+
+def titles_of(names: List[str], size: int) -> List[str]:
+    return list(itertools.islice(itertools.cycle(names), size))
+
+
+def best_rate(rounds: int, size: int, func: Callable[[], None]) -> float:
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best: best = elapsed
+    return size / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=CORPUS_VERSION)
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--no-prepass", action="store_true")
+    args = parser.parse_args()
+
+    names = load_corpus(args.version)
+    compiled = anitopy.CompiledAnitopy(DEFAULT_OPTIONS)
+    prepass = not args.no_prepass
+    compiled.parse_many(names[:50])  # 预热
+
+    print(f"{'titles':>8} {'per-title/s':>12} {'parse_many/s':>13} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        titles = titles_of(names, size)
+        single = [compiled.parse(t) for t in titles]
+        if compiled.parse_many(titles, prepass=prepass) != single:
+            raise SystemExit(f"parse_many 结果与逐条解析不一致 (size={size})")
+        per_title = best_rate(args.rounds, size, lambda: [compiled.parse(t) for t in titles])
+        batched = best_rate(args.rounds, size, lambda: compiled.parse_many(titles, prepass=prepass))
+        print(f"{size:>8} {per_title:>12.0f} {batched:>13.0f} {batched / per_title:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
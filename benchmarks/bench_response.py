@@ -0,0 +1,96 @@
+"""
+识别结果响应序列化基准
+
+用法: PYTHONPATH=src python benchmarks/bench_response.py [请求数]
+先以离线模式生成真实的 data_packet (含完整 logs)，再分别挂载到两个最小 FastAPI 应用上：
+- legacy: 端点直接返回 dict (jsonable_encoder + 标准库 json)
+- fast:   端点返回 make_response(...) (orjson，绕过 jsonable_encoder，按 Accept-Encoding 压缩)
+通过 TestClient 压测，输出 requests/sec 与单响应字节数。识别本身不计入耗时。
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from recognition_service.context import RecognitionContext
+from recognition_service.recognizer import RecognitionWorkflow
+from recognition_service.responses import FastJSONResponse, dumps, make_response
+
+from bench_log_level import SAMPLES
+
+
+async def build_packets():
+    packets = []
+    for name in SAMPLES:
+        ctx = RecognitionContext(filename=name, original_filename=name)
+        packets.append(await RecognitionWorkflow(ctx).run())
+    return packets
+
+
+def build_apps(packets):
+    legacy = FastAPI()
+    fast = FastAPI(default_response_class=FastJSONResponse)
+
+    @legacy.get("/r/{idx}")
+    async def legacy_endpoint(idx: int):
+        return packets[idx]
+
+    @fast.get("/r/{idx}")
+    async def fast_endpoint(idx: int, request: Request):
+        return make_response(packets[idx], request)
+
+    return legacy, fast
+
+
+def bench(app, count: int, accept_encoding: str):
+    client = TestClient(app)
+    headers = {"Accept-Encoding": accept_encoding}
+    total_bytes = 0
+    t0 = time.perf_counter()
+    for i in range(count):
+        resp = client.get(f"/r/{i % len(SAMPLES)}", headers=headers)
+        # TestClient 会自动解压，这里统计线上传输的字节数
+        total_bytes += int(resp.headers.get("content-length", len(resp.content)))
+    elapsed = time.perf_counter() - t0
+    return count / elapsed, total_bytes / count
+
+
+def bench_serialize(packets, rounds: int = 200):
+    """仅序列化环节 (不含 HTTP 栈)"""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for p in packets: JSONResponse(jsonable_encoder(p)).body
+    legacy = (time.perf_counter() - t0) / (rounds * len(packets))
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for p in packets: dumps(p)
+    fast = (time.perf_counter() - t0) / (rounds * len(packets))
+    return legacy, fast
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    packets = asyncio.run(build_packets())
+    legacy, fast = build_apps(packets)
+
+    ser_legacy, ser_fast = bench_serialize(packets)
+    print(f"serialize only: jsonable_encoder+json {ser_legacy * 1e6:.0f} us/resp, orjson {ser_fast * 1e6:.0f} us/resp")
+
+    print(f"{'variant':<20} {'req/s':>8} {'bytes/resp':>11}")
+    for label, app, enc in (
+        ("legacy", legacy, "identity"),
+        ("fast (identity)", fast, "identity"),
+        ("fast (gzip)", fast, "gzip"),
+        ("fast (br, gzip)", fast, "br, gzip"),
+    ):
+        rps, size = bench(app, count, enc)
+        print(f"{label:<20} {rps:>8.0f} {size:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+内核输出稳定性校验 (golden)
+
+用法:
+  PYTHONPATH=src python benchmarks/check_golden.py              # 全量语料比对
+  PYTHONPATH=src python benchmarks/check_golden.py --stride 10  # 抽样比对 (快速冒烟)
+  PYTHONPATH=src python benchmarks/check_golden.py --update     # 重新生成 golden (识别效果有意变更时)
+
+以 log_level=off 调用 core_recognize (不带自定义规则)，把 MetaBase 快照与 golden 逐字段比对。
+任一文件名结果不同即以非零状态退出，并打印前若干条差异。
+"""
+import argparse
+import json
+import sys
+import time
+
+from recognition_engine.audit_log import NullLog
+from recognition_engine.kernel import core_recognize
+
+from corpus_loader import CORPUS_VERSION, golden_path, load_corpus, load_golden, snapshot
+
+
+def recognize(name: str):
+    return snapshot(core_recognize(name, [], [], name, NullLog()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=CORPUS_VERSION)
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--update", action="store_true")
+    parser.add_argument("--show", type=int, default=20, help="最多打印的差异条数")
+    args = parser.parse_args()
+
+    if args.update:
+        names = load_corpus(args.version)
+        t0 = time.perf_counter()
+        with open(golden_path(args.version), "w", encoding="utf-8") as f:
+            for name in names:
+                f.write(json.dumps({"name": name, "meta": recognize(name)}, ensure_ascii=False, sort_keys=True) + "\n")
+        print(f"golden updated: {len(names)} entries in {time.perf_counter() - t0:.1f}s -> {golden_path(args.version)}")
+        return
+
+    golden = load_golden(args.version)
+    names = load_corpus(args.version, stride=args.stride)
+    diffs = []
+    t0 = time.perf_counter()
+    for name in names:
+        expected = golden.get(name)
+        actual = recognize(name)
+        if expected is None:
+            diffs.append((name, "<missing in golden>", actual))
+        elif json.loads(json.dumps(actual, ensure_ascii=False)) != expected:
+            changed = {k: (expected.get(k), actual.get(k)) for k in set(expected) | set(actual) if expected.get(k) != actual.get(k)}
+            diffs.append((name, changed, None))
+    elapsed = time.perf_counter() - t0
+
+    for name, changed, actual in diffs[:args.show]:
+        print(f"✗ {name}")
+        if actual is not None:
+            print(f"    {changed}: {actual}")
+        else:
+            for key, (old, new) in sorted(changed.items()):
+                print(f"    {key}: {old!r} -> {new!r}")
+    print(f"{len(names) - len(diffs)}/{len(names)} stable ({elapsed:.1f}s, corpus {args.version})")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+基准语料与 golden 结果的公共工具
+
+- 语料: benchmarks/corpus/filenames_<版本>.txt
+- golden: benchmarks/golden/kernel_<版本>.jsonl (每行一个文件名的内核输出快照)
+语料一旦发布不再原地修改，新增样本请递增版本号，保证历史基准数据可比。
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+CORPUS_VERSION = "v1"
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+
+def corpus_path(version: str = CORPUS_VERSION) -> str:
+    return os.path.join(CORPUS_DIR, f"filenames_{version}.txt")
+
+
+def golden_path(version: str = CORPUS_VERSION) -> str:
+    return os.path.join(GOLDEN_DIR, f"kernel_{version}.jsonl")
+
+
+def load_corpus(version: str = CORPUS_VERSION, stride: int = 1, limit: Optional[int] = None) -> List[str]:
+    """读取语料；stride > 1 时按固定间隔抽样，便于快速冒烟"""
+    with open(corpus_path(version), encoding="utf-8") as f:
+        names = [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+    names = names[::max(1, stride)]
+    return names[:limit] if limit else names
+
+
+def snapshot(meta: Any) -> Dict[str, Any]:
+    """MetaBase -> 可比较的 dict (只保留有值的字段，枚举取 value)"""
+    out = {}
+    for key, value in vars(meta).items():
+        if value is None or value == [] or value is False: continue
+        out[key] = value.value if hasattr(value, "value") else value
+    return out
+
+
+def load_golden(version: str = CORPUS_VERSION) -> Dict[str, Dict[str, Any]]:
+    golden = {}
+    with open(golden_path(version), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            row = json.loads(line)
+            golden[row["name"]] = row["meta"]
+    return golden
@@ -0,0 +1,165 @@
+"""
+识别服务端到端压测 (with_cloud=true，上游为本地桩服务)
+
+用法:
+  # 自动拉起桩服务与识别服务 (临时数据库)，压测后全部退出
+  PYTHONPATH=src python benchmarks/load_test.py --spawn --requests 500 --concurrency 16 --latency-ms 80 --error-rate 0.02
+  PYTHONPATH=src python benchmarks/load_test.py --spawn --workers 4 --requests 500 --concurrency 32   # 多 worker 模式
+
+  # 压测已在运行的服务 (需自行以 TMDB_API_BASE / BANGUMI_API_BASE 指向桩服务)
+  PYTHONPATH=src python benchmarks/load_test.py --service http://127.0.0.1:8000 --stub http://127.0.0.1:18080
+
+输出 req/s、延迟分位 (p50/p90/p95/p99/max)、失败数，以及每次识别平均触发的上游调用次数 (按路由拆分)。
+存在 HTTP 失败 (非 200 / 连接错误) 时以非零状态退出，可直接作为冒烟检查；--bangumi-priority 覆盖 Bangumi 数据源链路。
+当前服务只有 /recognize 一个识别端点，没有批量端点。
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from corpus_loader import CORPUS_VERSION, load_corpus
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500: return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"服务未能在 {timeout}s 内就绪: {url}")
+
+
+def spawn(args) -> Tuple[str, str, List[subprocess.Popen]]:
+    """拉起桩服务与识别服务 (独立进程，临时 SQLite)"""
+    stub_port, service_port = _free_port(), _free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, BENCH_DIR]))
+    stub_cmd = [sys.executable, os.path.join(BENCH_DIR, "stub_upstream.py"), "--port", str(stub_port),
+                "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms), "--error-rate", str(args.error_rate)]
+    if args.seed is not None: stub_cmd += ["--seed", str(args.seed)]
+    stub = subprocess.Popen(stub_cmd, env=env)
+
+    db_dir = tempfile.mkdtemp(prefix="am_load_")
+    service_env = dict(env,
+                       TMDB_API_BASE=f"http://127.0.0.1:{stub_port}/tmdb/3",
+                       BANGUMI_API_BASE=f"http://127.0.0.1:{stub_port}/bgm",
+                       AM_DATABASE_PATH=os.path.join(db_dir, "matcher_storage.db"))
+    for key in ("TMDB_PROXY", "BANGUMI_PROXY", "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        service_env.pop(key, None)
+    service = subprocess.Popen([sys.executable, "-m", "uvicorn", "recognition_service.main:app",
+                                "--host", "127.0.0.1", "--port", str(service_port), "--log-level", "warning",
+                                "--workers", str(args.workers)], env=dict(service_env, AM_WORKERS=str(args.workers)))
+
+    stub_url, service_url = f"http://127.0.0.1:{stub_port}", f"http://127.0.0.1:{service_port}"
+    _wait_ready(f"{stub_url}/_stub/stats")
+    _wait_ready(f"{service_url}/health")
+    return service_url, stub_url, [service, stub]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values: return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def run_load(service_url: str, names: List[str], args) -> Dict:
+    latencies, failures, not_success = [], 0, 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests): queue.put_nowait(names[i % len(names)])
+
+    payload_base = {"with_cloud": True, "tmdb_api_key": "stub", "use_storage": args.use_storage, "log_level": args.log_level}
+    if args.bangumi_priority: payload_base["bangumi_priority"] = True
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal failures, not_success
+        while True:
+            try:
+                name = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(f"{service_url}/recognize", json=dict(payload_base, filename=name))
+                latencies.append(time.perf_counter() - t0)
+                if resp.status_code != 200: failures += 1
+                elif not resp.json().get("success"): not_success += 1
+            except httpx.HTTPError:
+                latencies.append(time.perf_counter() - t0)
+                failures += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+    return {"elapsed": elapsed, "latencies": latencies, "failures": failures, "not_success": not_success}
+
+
+def report(result: Dict, stats: Dict, requests: int):
+    lat = result["latencies"]
+    print(f"requests      {requests}  (failed {result['failures']}, success=false {result['not_success']})")
+    print(f"throughput    {requests / result['elapsed']:.1f} req/s  ({result['elapsed']:.1f}s)")
+    print("latency ms    " + "  ".join(f"{p}={percentile(lat, q) * 1000:.0f}" for p, q in
+                                      (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))))
+    if stats is None: return
+    print(f"upstream      {stats['total']} calls, {stats['total'] / requests:.2f} per recognition (injected errors {stats['errors']})")
+    for route, count in sorted(stats["routes"].items(), key=lambda kv: -kv[1]):
+        print(f"  {route:<36} {count:>7}  {count / requests:>6.2f}/req")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spawn", action="store_true", help="自动拉起桩服务与识别服务")
+    parser.add_argument("--service", default="http://127.0.0.1:8000")
+    parser.add_argument("--stub", default=None, help="桩服务地址 (用于统计上游放大倍数)")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--version", default=CORPUS_VERSION)
+    parser.add_argument("--stride", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="--spawn 时识别服务的 uvicorn worker 数")
+    parser.add_argument("--use-storage", action="store_true", help="开启智能记忆与本地缓存")
+    parser.add_argument("--bangumi-priority", action="store_true")
+    parser.add_argument("--log-level", default="off", choices=["off", "summary", "full"])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    procs = []
+    service_url, stub_url = args.service, args.stub
+    if args.spawn: service_url, stub_url, procs = spawn(args)
+    try:
+        names = load_corpus(args.version, stride=args.stride)
+        if stub_url: httpx.post(f"{stub_url}/_stub/reset")
+        result = asyncio.run(run_load(service_url, names, args))
+        stats = httpx.get(f"{stub_url}/_stub/stats").json() if stub_url else None
+        report(result, stats, args.requests)
+    finally:
+        for p in procs:
+            p.terminate()
+            p.wait(timeout=10)
+    if result["failures"]: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+性能回归门禁
+
+用法:
+  PYTHONPATH=src python benchmarks/perf_gate.py                # 与基线比对，超出阈值时非零退出
+  PYTHONPATH=src python benchmarks/perf_gate.py --update       # 以本机结果重写基线
+  PYTHONPATH=src python benchmarks/perf_gate.py --threshold 0.2 --mem-threshold 0.15
+
+两个场景各自在独立子进程中运行 (峰值内存互不干扰)，全程离线：
+- kernel:   core_recognize (log_level=off) 逐条处理抽样语料
+- workflow: 完整 RecognitionWorkflow (with_cloud=true)，TMDB / Bangumi 指向本地桩服务，SQLite 使用临时库
+- workflow_bgm: 同上，但 bangumi_priority=true (Bangumi 优先 + TMDB 对撞)，覆盖 Bangumi 数据源链路
+每个场景重复 --rounds 轮 (每轮全新子进程与临时库)，单文件耗时取各轮最小值以压低共享机器的抖动，
+再统计 median / p95；峰值 RSS 取各轮最大值。结果与 benchmarks/baseline/perf_baseline.json 比较。
+基线与机器相关，更换基准机器后请先 --update。
+
+噪声处理 (共享虚拟机上同一份代码前后两次运行可相差一倍)：
+- 每轮子进程在场景前后各跑一次固定的 CPU 校准负载 (取较快者)，耗时按校准值归一化后再与基线比较，
+  抵消机器整体变快/变慢；
+- 只对 median 设门禁。workflow 的 p95 主要由本机回环 HTTP 的调度抖动决定 (约 40ms 一档)，
+  kernel 的 p95 只有个位数样本落在尾部，两者仅作参考输出；
+- 各轮归一化 median 的极差 (相对值) 超过 --threshold 时，以极差作为本次的阈值，避免噪声误报；
+  该放宽以 --noise-cap 为上限 (默认 30%)。某场景噪声超过上限时整体重测 (--retries 次)，取噪声最小的一次，
+  仍超过上限则按上限判定，噪声再大也不会无限放宽门禁。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline", "perf_baseline.json")
+
+SCENARIOS = {
+    # 场景 -> 语料抽样间隔
+    "kernel": 20,
+    "workflow": 40,
+    "workflow_bgm": 40,
+}
+METRICS = ("median_ms", "p95_ms", "peak_rss_mb")
+# 仅参考、不设门禁的指标
+INFO_METRICS = ("p95_ms",)
+
+
+def _p95(values: List[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def _peak_rss_mb() -> float:
+    # Linux 下 ru_maxrss 单位为 KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _calibrate(reps: int = 5) -> float:
+    """固定的 CPU 校准负载 (正则替换 + 字符串切分 + 字典计数，与内核的热点构成相近)，返回最快一次的秒数"""
+    text = "[Nekomoe kissaten&LoliHouse] Sousou no Frieren - 12 [WebRip 1080p HEVC-10bit AAC ASSx2].mkv"
+    space, bracket = re.compile(r"\s+"), re.compile(r"\[([^\]]+)\]")
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        counts: Dict[str, int] = {}
+        for i in range(3000):
+            cleaned = space.sub(" ", bracket.sub(" ", text + str(i)))
+            for word in cleaned.lower().split():
+                counts[word] = counts.get(word, 0) + 1
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _summary(rounds: List[Dict]) -> Dict[str, float]:
+    timings = [min(per_file) for per_file in zip(*(r["timings"] for r in rounds))]
+    calib = min(r["calib_s"] for r in rounds)
+    # 各轮自身的归一化 median，用于估计本次测量的噪声
+    norm_medians = [statistics.median(r["timings"]) / r["calib_s"] for r in rounds]
+    return {
+        "files": len(timings),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(_p95(timings) * 1000, 3),
+        "peak_rss_mb": round(max(r["peak_rss_mb"] for r in rounds), 1),
+        "calib_ms": round(calib * 1000, 3),
+        "median_norm": round(statistics.median(timings) / calib, 4),
+        "noise": round((max(norm_medians) - min(norm_medians)) / statistics.median(norm_medians), 4),
+    }
+
+
+def run_kernel(names: List[str]) -> List[float]:
+    from recognition_engine.audit_log import NullLog
+    from recognition_engine.kernel import core_recognize
+
+    for name in names[:10]: core_recognize(name, [], [], name, NullLog())
+    timings = []
+    for name in names:
+        t0 = time.perf_counter()
+        core_recognize(name, [], [], name, NullLog())
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def run_workflow(names: List[str], bangumi_priority: bool = False) -> List[float]:
+    from recognition_service.context import RecognitionContext
+    from recognition_service.recognizer import RecognitionWorkflow
+
+    async def _run():
+        timings = []
+        for i, name in enumerate(names):
+            ctx = RecognitionContext(filename=name, original_filename=name, with_cloud=True, api_key="stub", log_level="off",
+                                     bangumi_priority=bangumi_priority)
+            t0 = time.perf_counter()
+            await RecognitionWorkflow(ctx).run()
+            if i >= 5: timings.append(time.perf_counter() - t0)  # 前几条作为预热
+        return timings
+
+    return asyncio.run(_run())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(scenario: str, stride: int, rounds: int) -> Dict[str, float]:
+    return _summary([measure_once(scenario, stride) for _ in range(rounds)])
+
+
+def measure_once(scenario: str, stride: int) -> Dict:
+    """在子进程中运行单个场景一轮，workflow 场景附带拉起零延迟桩服务"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, BENCH_DIR]), AM_TRACING="off")
+    for key in ("TMDB_PROXY", "BANGUMI_PROXY", "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        env.pop(key, None)
+    stub = None
+    if scenario.startswith("workflow"):
+        port = _free_port()
+        stub = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "stub_upstream.py"), "--port", str(port)], env=env)
+        env.update(TMDB_API_BASE=f"http://127.0.0.1:{port}/tmdb/3", BANGUMI_API_BASE=f"http://127.0.0.1:{port}/bgm",
+                   AM_DATABASE_PATH=os.path.join(tempfile.mkdtemp(prefix="am_gate_"), "matcher_storage.db"))
+        _wait_port(port)
+    try:
+        out = subprocess.run([sys.executable, __file__, "--run", scenario, "--stride", str(stride)],
+                             env=env, check=True, capture_output=True, text=True)
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait(timeout=10)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _wait_port(port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0: return
+        time.sleep(0.2)
+    raise RuntimeError(f"桩服务未能在 {timeout}s 内就绪 (port {port})")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, mem_threshold: float, noise_cap: float) -> bool:
+    ok = True
+    print(f"{'scenario':<12} {'metric':<12} {'baseline':>10} {'current':>10} {'delta':>8}  status")
+    for scenario, result in current.items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            print(f"{scenario:<12} {'-':<12} {'-':>10} {'-':>10} {'-':>8}  NEW (无基线)")
+            continue
+        # 耗时按校准负载归一化：机器整体变快/变慢时两者同比例变化
+        speed = result["calib_ms"] / base["calib_ms"] if base.get("calib_ms") else 1.0
+        noise = max(result.get("noise", 0.0), base.get("noise", 0.0))
+        # 噪声只能在上限以内放宽阈值，否则一次抖动很大的测量会让任何回归都判为 ok
+        allowance = min(max(threshold, noise), max(threshold, noise_cap))
+        for metric in METRICS:
+            old, new = base[metric], result[metric]
+            is_time = metric != "peak_rss_mb"
+            expected = old * speed if is_time else old
+            delta = (new - expected) / expected if expected else 0.0
+            limit = allowance if is_time else mem_threshold
+            status = "ok"
+            if metric in INFO_METRICS:
+                status = "info (不设门禁)"
+            elif delta > limit:
+                status, ok = f"REGRESSION (> +{limit:.0%})", False
+            elif delta < -limit:
+                status = "improved"
+            print(f"{scenario:<12} {metric:<12} {old:>10.2f} {new:>10.2f} {delta:>+7.1%}  {status}")
+        capped = f"，超过上限按 {noise_cap:.0%} 判定" if noise > noise_cap else ""
+        print(f"{scenario:<12} {'calib_ms':<12} {base.get('calib_ms', 0):>10.2f} {result['calib_ms']:>10.2f} {speed - 1:>+7.1%}  "
+              f"机器速度基准 (耗时 delta 已按其归一化，噪声 {noise:.1%}{capped})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--run", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--stride", type=int, default=None)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.15, help="耗时允许的相对退化 (默认 15%%)")
+    parser.add_argument("--mem-threshold", type=float, default=0.10, help="峰值内存允许的相对退化 (默认 10%%)")
+    parser.add_argument("--noise-cap", type=float, default=0.30, help="噪声放宽耗时阈值的上限 (默认 30%%)")
+    parser.add_argument("--retries", type=int, default=2, help="噪声超过上限时的重测次数")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+
+    if args.run:
+        # 子进程入口：只输出一行 JSON (逐文件耗时 + 峰值 RSS)
+        from corpus_loader import load_corpus
+        names = load_corpus(stride=args.stride or SCENARIOS[args.run])
+        calib = _calibrate()
+        timings = run_kernel(names) if args.run == "kernel" else run_workflow(names, bangumi_priority=args.run == "workflow_bgm")
+        calib = min(calib, _calibrate())
+        print(json.dumps({"timings": timings, "peak_rss_mb": _peak_rss_mb(), "calib_s": calib}))
+        return
+
+    current = {}
+    for scenario in args.scenario or sorted(SCENARIOS):
+        stride = args.stride or SCENARIOS[scenario]
+        result = measure(scenario, stride, args.rounds)
+        # 噪声超过上限说明本次测量不可信：整体重测，保留噪声最小的一次
+        for attempt in range(args.retries):
+            if result["noise"] <= args.noise_cap:
+                break
+            print(f"[perf gate] {scenario} 噪声 {result['noise']:.1%} 超过上限 {args.noise_cap:.0%}，"
+                  f"重测 ({attempt + 1}/{args.retries})", file=sys.stderr)
+            retry = measure(scenario, stride, args.rounds)
+            if retry["noise"] < result["noise"]:
+                result = retry
+        current[scenario] = result
+
+    if args.update:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        payload = {
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpu)",
+            "rounds": args.rounds,
+            "scenarios": current,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    ok = compare(baseline, current, args.threshold, args.mem_threshold, args.noise_cap)
+    print("perf gate: PASS" if ok else "perf gate: FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+TMDB / Bangumi 本地桩服务 (压测与回归基准用，不访问外网)
+
+用法:
+  PYTHONPATH=src python benchmarks/stub_upstream.py --port 18080 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+
+识别服务通过环境变量指向桩服务:
+  TMDB_API_BASE=http://127.0.0.1:18080/tmdb/3  BANGUMI_API_BASE=http://127.0.0.1:18080/bgm
+
+- 回放 stub_data/recorded_<版本>.json 中的 TMDB /search/{tv,movie,multi}、/tv/{id}、/movie/{id}
+  与 Bangumi /v0/search/subjects、/v0/subjects/{id} 响应
+- 未收录的搜索词默认合成一个同名条目 (--no-synthesize 关闭则返回空结果)，使云端匹配链路完整走完
+- 每个请求注入 latency ± jitter 的延迟，并按 error-rate 返回 error-status (默认 500)
+- GET /_stub/stats 返回按路由统计的调用次数，POST /_stub/reset 清零 (用于计算上游放大倍数)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_data")
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"[\W_]+", "", str(text or "")).lower()
+
+
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    synthesize: bool = True
+    seed: Optional[int] = None
+
+
+class RecordedData:
+    """录制数据索引：按别名匹配搜索词，按 ID 回放详情；合成条目登记后同样可查详情"""
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        self.tmdb: Dict[str, List[Dict[str, Any]]] = raw.get("tmdb", {})
+        self.bangumi: List[Dict[str, Any]] = raw.get("bangumi", [])
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        for media_type, items in self.tmdb.items():
+            for item in items: self.by_id[f"{media_type}:{item['id']}"] = item
+        self.bgm_by_id = {str(s["id"]): s for s in self.bangumi}
+
+    @staticmethod
+    def _names(item: Dict[str, Any]) -> List[str]:
+        names = [item.get("name"), item.get("title"), item.get("original_name"), item.get("original_title"), item.get("name_cn")]
+        return [_norm(n) for n in names + item.get("aliases", []) if n]
+
+    def _match(self, items: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        q = _norm(query)
+        if not q: return []
+        return [i for i in items if any(q == n or (len(q) >= 3 and (q in n or n in q)) for n in self._names(i))]
+
+    @staticmethod
+    def _public(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in item.items() if k != "aliases"}
+
+    def _synthesize(self, media_type: str, query: str, year: Optional[str]) -> Dict[str, Any]:
+        m_id = 900000 + zlib.crc32(f"{media_type}:{query}".encode("utf-8")) % 90000
+        date = f"{year or '2020'}-01-01"
+        item = {
+            "id": m_id, "original_language": "ja", "origin_country": ["JP"], "genre_ids": [16],
+            "popularity": 10.0, "vote_average": 7.0, "vote_count": 100,
+            "poster_path": f"/stub{m_id}.jpg", "backdrop_path": f"/stub{m_id}_bg.jpg", "overview": f"{query} (stub)",
+        }
+        if media_type == "movie": item.update({"title": query, "original_title": query, "release_date": date, "runtime": 100})
+        else: item.update({"name": query, "original_name": query, "first_air_date": date, "number_of_seasons": 1})
+        self.by_id.setdefault(f"{media_type}:{m_id}", item)
+        return item
+
+    def search(self, media_type: str, query: str, year: Optional[str]) -> List[Dict[str, Any]]:
+        if media_type == "multi":
+            results = [dict(self._public(i), media_type=t) for t in ("tv", "movie") for i in self._match(self.tmdb.get(t, []), query)]
+            if not results and StubConfig.synthesize: results = [dict(self._public(self._synthesize("tv", query, year)), media_type="tv")]
+            return results
+        results = [self._public(i) for i in self._match(self.tmdb.get(media_type, []), query)]
+        if not results and StubConfig.synthesize: results = [self._public(self._synthesize(media_type, query, year))]
+        return results
+
+    def details(self, media_type: str, m_id: str) -> Optional[Dict[str, Any]]:
+        item = self.by_id.get(f"{media_type}:{m_id}")
+        if item is None: return None
+        data = self._public(item)
+        data["genres"] = [{"id": 16, "name": "动画"}]
+        data["credits"] = {"cast": [{"character": "主角", "name": "声优 A", "profile_path": "/stub_cast.jpg"}]}
+        return data
+
+    def bgm_search(self, keyword: str) -> List[Dict[str, Any]]:
+        return [{"id": s["id"], "name": s["name"], "name_cn": s.get("name_cn")} for s in self._match(self.bangumi, keyword)]
+
+
+def create_app(data: RecordedData) -> FastAPI:
+    app = FastAPI(title="anime-matcher upstream stub")
+    calls: Counter = Counter()
+    rng = random.Random(StubConfig.seed)
+
+    async def _simulate(route: str) -> Optional[JSONResponse]:
+        calls[route] += 1
+        delay = StubConfig.latency_ms + rng.uniform(-StubConfig.jitter_ms, StubConfig.jitter_ms)
+        if delay > 0: await asyncio.sleep(delay / 1000)
+        if StubConfig.error_rate and rng.random() < StubConfig.error_rate:
+            calls["_errors"] += 1
+            return JSONResponse({"status_message": "stub injected error"}, status_code=StubConfig.error_status)
+        return None
+
+    @app.get("/tmdb/3/search/{media_type}")
+    async def tmdb_search(media_type: str, request: Request):
+        error = await _simulate(f"tmdb:/search/{media_type}")
+        if error: return error
+        q = request.query_params
+        results = data.search(media_type, q.get("query", ""), q.get("year") or q.get("first_air_date_year"))
+        return {"page": 1, "results": results, "total_pages": 1, "total_results": len(results)}
+
+    @app.get("/tmdb/3/discover/{media_type}")
+    async def tmdb_discover(media_type: str):
+        error = await _simulate(f"tmdb:/discover/{media_type}")
+        if error: return error
+        results = [data._public(i) for i in data.tmdb.get(media_type, [])]
+        return {"page": 1, "results": results, "total_pages": 1, "total_results": len(results)}
+
+    @app.get("/tmdb/3/tv/{m_id}/season/{season}")
+    async def tmdb_season(m_id: str, season: int):
+        error = await _simulate("tmdb:/tv/{id}/season/{n}")
+        if error: return error
+        episodes = [{"episode_number": i, "name": f"第{i}话", "air_date": "2020-01-01", "episode_type": "standard"} for i in range(1, 13)]
+        return {"season_number": season, "episodes": episodes}
+
+    @app.get("/tmdb/3/{media_type}/{m_id}")
+    async def tmdb_details(media_type: str, m_id: str):
+        error = await _simulate(f"tmdb:/{media_type}/{{id}}")
+        if error: return error
+        item = data.details(media_type, m_id)
+        if item is None: return JSONResponse({"status_message": "The resource you requested could not be found."}, status_code=404)
+        return item
+
+    @app.post("/bgm/v0/search/subjects")
+    async def bgm_search(request: Request):
+        error = await _simulate("bgm:/v0/search/subjects")
+        if error: return error
+        body = await request.json()
+        results = data.bgm_search(body.get("keyword", ""))
+        return {"data": results, "total": len(results), "limit": 10, "offset": 0}
+
+    @app.get("/bgm/v0/subjects/{s_id}/characters")
+    async def bgm_characters(s_id: str):
+        error = await _simulate("bgm:/v0/subjects/{id}/characters")
+        if error: return error
+        return []
+
+    @app.get("/bgm/v0/subjects/{s_id}")
+    async def bgm_subject(s_id: str):
+        error = await _simulate("bgm:/v0/subjects/{id}")
+        if error: return error
+        subject = data.bgm_by_id.get(s_id)
+        if subject is None: return JSONResponse({"title": "Not Found"}, status_code=404)
+        return data._public(subject)
+
+    @app.get("/_stub/stats")
+    async def stats():
+        routes = {k: v for k, v in calls.items() if not k.startswith("_")}
+        return {"total": sum(routes.values()), "errors": calls.get("_errors", 0), "routes": routes}
+
+    @app.post("/_stub/reset")
+    async def reset():
+        calls.clear()
+        return {"ok": True}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--data", default=os.path.join(DATA_DIR, "recorded_v1.json"))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--no-synthesize", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    StubConfig.latency_ms = args.latency_ms
+    StubConfig.jitter_ms = min(args.jitter_ms, args.latency_ms)
+    StubConfig.error_rate = args.error_rate
+    StubConfig.error_status = args.error_status
+    StubConfig.synthesize = not args.no_synthesize
+    StubConfig.seed = args.seed
+    uvicorn.run(create_app(RecordedData(args.data)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
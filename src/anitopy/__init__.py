@@ -10,7 +10,9 @@ Anitopy is a python library for parsing anime video filenames.
 """
 from __future__ import absolute_import
 
-from .anitopy import parse
+from .anitopy import CompiledAnitopy, parse, parse_many
+from .watchdog import ParseBudget, ParseBudgetExceeded
 
 
-__all__ = ['parse']
+__all__ = ['CompiledAnitopy', 'ParseBudget', 'ParseBudgetExceeded', 'parse',
+           'parse_many']
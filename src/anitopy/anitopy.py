@@ -2,11 +2,15 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import threading
+from types import MappingProxyType
+
 from .element import Elements, ElementCategory
 from .keyword import keyword_manager
 from .parser import Parser
 from .token import Tokens
-from .tokenizer import Tokenizer
+from .tokenizer import BRACKET_TABLE, Tokenizer, compile_delimiter_splitter
+from .watchdog import ParseBudget
 
 
 default_options = {
@@ -19,36 +23,116 @@ default_options = {
 }
 
 
-def parse(filename, options=default_options):
-    elements = Elements()
-    tokens = Tokens()
-
-    # Add missing options
-    for key, value in default_options.items():
-        options.setdefault(key, value)
-
-    elements.insert(ElementCategory.FILE_NAME, filename)
-    if options['parse_file_extension']:
-        filename, extension = remove_extension_from_filename(filename)
+def freeze_options(options=None):
+    """Merge options over the defaults into a hashable, read-only mapping"""
+    merged = dict(default_options)
+    if options:
+        merged.update(options)
+    merged['ignored_strings'] = tuple(merged['ignored_strings'])
+    return MappingProxyType(merged)
+
+
+class CompiledAnitopy:
+    """Parser bound to one frozen set of options.
+
+    The delimiter splitter and bracket table are compiled once, and the
+    Elements/Tokens buffers are reused per thread, so repeated parse() calls
+    only pay for the filename itself. Caller option dicts are never mutated.
+    """
+
+    def __init__(self, options=None, budget=None):
+        self.options = freeze_options(options)
+        # Optional per-parse step/time budget (raises ParseBudgetExceeded)
+        self.budget = budget or ParseBudget()
+        self.options_key = tuple(sorted(self.options.items()))
+        self.delimiter_splitter = compile_delimiter_splitter(
+            self.options['allowed_delimiters'])
+        self.bracket_table = BRACKET_TABLE
+        self._local = threading.local()
+
+    def _buffers(self):
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = (Elements(), Tokens())
+        elements, tokens = buffers
+        elements.clear()
+        tokens.clear()
+        return elements, tokens
+
+    def _prepare(self, filename):
+        """Strip the extension and ignored strings: (filename, extension)"""
+        options = self.options
+        extension = None
+        if options['parse_file_extension']:
+            filename, extension = remove_extension_from_filename(filename)
+
+        if options['ignored_strings']:
+            filename = remove_ignored_strings_from_filename(
+                filename, options['ignored_strings'])
+
+        return filename, extension
+
+    def _parse_prepared(self, original, filename, extension,
+                        peek_keywords=True):
+        options = self.options
+        elements, tokens = self._buffers()
+
+        elements.insert(ElementCategory.FILE_NAME, original)
         if extension:
             elements.insert(ElementCategory.FILE_EXTENSION, extension)
 
-    if options['ignored_strings']:
-        filename = remove_ignored_strings_from_filename(
-            filename, options['ignored_strings'])
+        if not filename:
+            return None
+
+        watchdog = self.budget.start(original)
+        tokenizer = Tokenizer(filename, options, elements, tokens,
+                              self.delimiter_splitter, self.bracket_table,
+                              peek_keywords, watchdog)
+        if not tokenizer.tokenize():
+            return None
+
+        parser = Parser(options, elements, tokens, watchdog)
+        if not parser.parse():
+            return None
+
+        return elements.get_dictionary()
+
+    def parse(self, filename):
+        return self._parse_prepared(filename, *self._prepare(filename))
+
+    def parse_many(self, filenames, prepass=True):
+        """Parse a batch of filenames; same results as parse() per filename.
+
+        With prepass, the peek keywords are searched once over the whole
+        batch, and filenames without any of them skip per-segment peeking.
+        """
+        filenames = list(filenames)
+        prepared = [self._prepare(filename) for filename in filenames]
+        if prepass:
+            peek_flags = keyword_manager.peek_candidates(
+                [filename for filename, _ in prepared])
+        else:
+            peek_flags = [True] * len(filenames)
+        return [
+            self._parse_prepared(original, filename, extension, peek)
+            for original, (filename, extension), peek
+            in zip(filenames, prepared, peek_flags)
+        ]
+
+
+_default_parser = CompiledAnitopy()
 
-    if not filename:
-        return None
 
-    tokenizer = Tokenizer(filename, options, elements, tokens)
-    if not tokenizer.tokenize():
-        return None
+def parse(filename, options=None):
+    if options is None:
+        return _default_parser.parse(filename)
+    return CompiledAnitopy(options).parse(filename)
 
-    parser = Parser(options, elements, tokens)
-    if not parser.parse():
-        return None
 
-    return elements.get_dictionary()
+def parse_many(filenames, options=None):
+    if options is None:
+        return _default_parser.parse_many(filenames)
+    return CompiledAnitopy(options).parse_many(filenames)
 
 
 def remove_extension_from_filename(filename):
@@ -77,6 +77,12 @@ class Elements:
         self._elements = {}
         self._check_alt_number = False
 
+    def clear(self):
+        # Rebind rather than clear in place: dictionaries returned earlier
+        # still share the value lists
+        self._elements = {}
+        self._check_alt_number = False
+
     def get_check_alt_number(self):
         return self._check_alt_number
 
@@ -2,7 +2,10 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import re
 import unicodedata as ud
+from bisect import bisect_right
+from functools import lru_cache
 
 from .element import ElementCategory
 
@@ -20,6 +23,23 @@ class Keyword:
         self.options = options
 
 
+_PEEK_ENTRIES = [
+    (ElementCategory.AUDIO_TERM, ['Dual Audio', 'Multi Audio']),
+    (ElementCategory.VIDEO_TERM, ['H264', 'H.264', 'h264', 'h.264']),
+    (ElementCategory.VIDEO_RESOLUTION, ['480p', '720p', '1080p']),
+    (ElementCategory.SUBTITLES, ['Multiple Subtitle', 'Multi Subs']),
+    (ElementCategory.SOURCE, ['Blu-Ray'])
+]
+# (category, keyword) in the order elements are inserted
+_PEEK_KEYWORDS = [(category, keyword)
+                  for category, keywords in _PEEK_ENTRIES
+                  for keyword in keywords]
+# No peek keyword is a prefix of another, so one alternative per position
+# is enough
+_PEEK_PATTERN = re.compile('(?=({0}))'.format(
+    '|'.join(re.escape(keyword) for _, keyword in _PEEK_KEYWORDS)))
+
+
 class KeywordManager:
     def __init__(self):
         options_default = KeywordOption()
@@ -151,20 +171,18 @@ class KeywordManager:
 
     @staticmethod
     def peek(elements, string):
-        entries = [
-            (ElementCategory.AUDIO_TERM, ['Dual Audio', 'Multi Audio']),
-            (ElementCategory.VIDEO_TERM, ['H264', 'H.264', 'h264', 'h.264']),
-            (ElementCategory.VIDEO_RESOLUTION, ['480p', '720p', '1080p']),
-            (ElementCategory.SUBTITLES, ['Multiple Subtitle', 'Multi Subs']),
-            (ElementCategory.SOURCE, ['Blu-Ray'])
-        ]
+        # Zero-width lookahead reports a match at every position, so
+        # overlapping keywords are found exactly like a str.find per keyword
+        found = {}
+        for match in _PEEK_PATTERN.finditer(string):
+            found.setdefault(match.group(1), match.start())
 
         preidentified_tokens = []
 
-        for category, keywords in entries:
-            for keyword in keywords:
-                keyword_begin_pos = string.find(keyword)
-                if keyword_begin_pos != -1:  # Found the keyword in the string
+        if found:
+            for category, keyword in _PEEK_KEYWORDS:
+                keyword_begin_pos = found.get(keyword)
+                if keyword_begin_pos is not None:  # Found the keyword in the string
                     elements.insert(category, keyword)
 
                     keyword_end_pos = keyword_begin_pos + len(keyword)
@@ -174,8 +192,29 @@ class KeywordManager:
         return sorted(preidentified_tokens)
 
     @staticmethod
+    def peek_candidates(strings):
+        """For each string, whether peek() could find anything in it.
+
+        One scan over the joined batch; peek keywords never contain the
+        NUL separator, so a match always lies within a single string.
+        """
+        flags = [False] * len(strings)
+        if not strings:
+            return flags
+        offsets = []
+        offset = 0
+        for string in strings:
+            offsets.append(offset)
+            offset += len(string) + 1
+        for match in _PEEK_PATTERN.finditer('\0'.join(strings)):
+            flags[bisect_right(offsets, match.start()) - 1] = True
+        return flags
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize(string):
-        # Remove accents and other special symbols
+        # Remove accents and other special symbols (memoized: the same words
+        # are normalized for every filename of a release)
         nfkd = ud.normalize('NFKD', string)
         without_accents = ''.join([c for c in nfkd if not ud.combining(c)])
 
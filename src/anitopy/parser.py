@@ -6,13 +6,15 @@ from . import parser_helper, parser_number
 from .element import ElementCategory
 from .keyword import keyword_manager
 from .token import TokenCategory, TokenFlags
+from .watchdog import NULL_WATCHDOG
 
 
 class Parser:
-    def __init__(self, options, elements, tokens):
+    def __init__(self, options, elements, tokens, watchdog=NULL_WATCHDOG):
         self.options = options
         self.elements = elements
         self.tokens = tokens
+        self.watchdog = watchdog
 
     def parse(self):
         self.search_for_keywords()
@@ -169,6 +171,7 @@ class Parser:
             token_begin = self.tokens.get(0)
             skipped_previous_group = False
             while token_begin is not None:
+                self.watchdog.tick()
                 token_begin = self.tokens.find_next(token_begin, TokenFlags.UNKNOWN)
                 if token_begin is None:
                     break
@@ -209,6 +212,7 @@ class Parser:
             token = self.tokens.find_previous(token_end, TokenFlags.NOT_DELIMITER)
             while token.category == TokenCategory.BRACKET and \
                     token.content != ')':
+                self.watchdog.tick()
                 token = self.tokens.find_previous(token, TokenFlags.BRACKET)
                 if token is not None:
                     token_end = token
@@ -224,6 +228,7 @@ class Parser:
     def search_for_release_group(self):
         token_end = None
         while True:
+            self.watchdog.tick()
             # Find the first enclosed unknown token
             if token_end:
                 token_begin = self.tokens.find_next(
@@ -261,6 +266,7 @@ class Parser:
     def search_for_episode_title(self):
         token_end = None
         while True:
+            self.watchdog.tick()
             # Find the first non-enclosed unknown token
             if token_end:
                 token_begin = self.tokens.find_next(
@@ -278,6 +284,10 @@ class Parser:
             # Ignore if it's only a dash
             if self.tokens.distance(token_begin, token_end) <= 2 and \
                     parser_helper.is_dash_character(token_begin.content):
+                # A trailing dash has no end token; restarting from the
+                # first token would loop forever
+                if token_end is None:
+                    return
                 continue
 
             # If token end is a bracket, then we get the previous token to be
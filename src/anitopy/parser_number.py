@@ -489,8 +489,8 @@ def search_for_last_number(elements, parsed_tokens, tokens):
             continue
 
         # Ignore if it's the first non-enclosed, non-delimiter token
-        if all([t.enclosed or t.category == TokenCategory.DELIMITER
-                for t in parsed_tokens.get_list()[:token_index]]):
+        if all(t.enclosed or t.category == TokenCategory.DELIMITER
+               for t in map(parsed_tokens.get, range(token_index))):
             continue
 
         # Ignore if the previous token is "Movie" or "Part"
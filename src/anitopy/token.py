@@ -2,22 +2,16 @@
 
 from __future__ import unicode_literals
 
-from enum import Enum
 
+class TokenCategory:
+    # Plain ints: category comparisons on the hot path are int compares
+    UNKNOWN = 1
+    BRACKET = 2
+    DELIMITER = 3
+    IDENTIFIER = 4
+    INVALID = 5
 
-class TokenCategory(Enum):
-    # Auto enumerate elements
-    def __new__(cls):
-        value = len(cls.__members__) + 1
-        obj = object.__new__(cls)
-        obj._value_ = value
-        return obj
-
-    UNKNOWN = ()
-    BRACKET = ()
-    DELIMITER = ()
-    IDENTIFIER = ()
-    INVALID = ()
+    ALL = (UNKNOWN, BRACKET, DELIMITER, IDENTIFIER, INVALID)
 
 
 class TokenFlags:
@@ -46,12 +40,85 @@ class TokenFlags:
     MASK_ENCLOSED = ENCLOSED | NOT_ENCLOSED
 
 
+def _state_bit(category, enclosed):
+    """One bit per (category, enclosed) pair a token can be in"""
+    return 1 << (category * 2 + (1 if enclosed else 0))
+
+
+def _matches(flags, category, enclosed):
+    """Reference flag semantics, evaluated once per (flags, state) pair"""
+    def check_flag(flag):
+        return (flags & flag) == flag
+
+    if flags & TokenFlags.MASK_ENCLOSED:
+        success = enclosed if check_flag(TokenFlags.ENCLOSED) \
+            else not enclosed
+        if not success:
+            return False
+
+    if flags & TokenFlags.MASK_CATEGORIES:
+        def check_category(fe, fn, cat):
+            return category == cat if check_flag(fe) else \
+                   category != cat if check_flag(fn) else False
+        return check_category(TokenFlags.BRACKET, TokenFlags.NOT_BRACKET,
+                              TokenCategory.BRACKET) or \
+            check_category(TokenFlags.DELIMITER, TokenFlags.NOT_DELIMITER,
+                           TokenCategory.DELIMITER) or \
+            check_category(TokenFlags.IDENTIFIER, TokenFlags.NOT_IDENTIFIER,
+                           TokenCategory.IDENTIFIER) or \
+            check_category(TokenFlags.UNKNOWN, TokenFlags.NOT_UNKNOWN,
+                           TokenCategory.UNKNOWN) or \
+            check_category(TokenFlags.NOT_VALID, TokenFlags.VALID,
+                           TokenCategory.INVALID)
+
+    return True
+
+
+_accept_masks = {}
+
+
+def accept_mask(flags):
+    """Bitmask of token states matched by flags (cached per flags value)"""
+    mask = _accept_masks.get(flags)
+    if mask is None:
+        mask = 0
+        for category in TokenCategory.ALL:
+            for enclosed in (False, True):
+                if _matches(flags, category, enclosed):
+                    mask |= _state_bit(category, enclosed)
+        _accept_masks[flags] = mask
+    return mask
+
+
 class Token:
+    __slots__ = ('_category', 'content', '_enclosed', 'index', 'state')
+
     def __init__(self, category=TokenCategory.UNKNOWN, content=None,
                  enclosed=False):
-        self.category = category
+        self._category = category
         self.content = content
-        self.enclosed = enclosed
+        self._enclosed = enclosed
+        # Position in the owning Tokens container, maintained by Tokens
+        self.index = -1
+        self.state = _state_bit(category, enclosed)
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, category):
+        self._category = category
+        self.state = _state_bit(category, self._enclosed)
+
+    @property
+    def enclosed(self):
+        return self._enclosed
+
+    @enclosed.setter
+    def enclosed(self, enclosed):
+        self._enclosed = enclosed
+        self.state = _state_bit(self._category, enclosed)
 
     def __repr__(self):
         return 'Token(category = {0}, content = "{1}", enclosed = {2}'.format(
@@ -59,54 +126,42 @@ class Token:
         )
 
     def check_flags(self, flags):
-        def check_flag(flag):
-            return (flags & flag) == flag
-
-        if flags & TokenFlags.MASK_ENCLOSED:
-            success = self.enclosed if check_flag(TokenFlags.ENCLOSED) \
-                else not self.enclosed
-            if not success:
-                return False
-
-        if flags & TokenFlags.MASK_CATEGORIES:
-            def check_category(fe, fn, cat):
-                return self.category == cat if check_flag(fe) else \
-                       self.category != cat if check_flag(fn) else False
-            if check_category(TokenFlags.BRACKET, TokenFlags.NOT_BRACKET,
-                              TokenCategory.BRACKET):
-                return True
-            if check_category(TokenFlags.DELIMITER, TokenFlags.NOT_DELIMITER,
-                              TokenCategory.DELIMITER):
-                return True
-            if check_category(TokenFlags.IDENTIFIER, TokenFlags.NOT_IDENTIFIER,
-                              TokenCategory.IDENTIFIER):
-                return True
-            if check_category(TokenFlags.UNKNOWN, TokenFlags.NOT_UNKNOWN,
-                              TokenCategory.UNKNOWN):
-                return True
-            if check_category(TokenFlags.NOT_VALID, TokenFlags.VALID,
-                              TokenCategory.INVALID):
-                return True
-            return False
-
-        return True
+        return (accept_mask(flags) & self.state) != 0
 
 
 class Tokens:
+    """Token list where every token knows its own position.
+
+    Positions are kept in sync on every mutation, so index lookups are O(1)
+    and neighbor searches walk only the distance to the match, without
+    copying or slicing the underlying list.
+    """
+
     def __init__(self):
         self._tokens = []
 
     def empty(self):
         return len(self._tokens) == 0
 
+    def clear(self):
+        self._tokens = []
+
     def append(self, token):
+        token.index = len(self._tokens)
         self._tokens.append(token)
 
     def insert(self, index, token):
         self._tokens.insert(index, token)
+        self._reindex(index)
 
     def update(self, tokens):
         self._tokens = tokens
+        self._reindex(0)
+
+    def _reindex(self, start):
+        tokens = self._tokens
+        for i in range(max(start, 0), len(tokens)):
+            tokens[i].index = i
 
     def get(self, index):
         return self._tokens[index]
@@ -118,10 +173,15 @@ class Tokens:
         if flags is None:
             return tokens[begin_index:end_index+1]
         else:
-            return [token for token in tokens[begin_index:end_index+1]
-                    if token.check_flags(flags)]
+            mask = accept_mask(flags)
+            return [tokens[i] for i in range(begin_index, min(end_index+1, len(tokens)))
+                    if tokens[i].state & mask]
 
     def get_index(self, token):
+        index = token.index
+        if 0 <= index < len(self._tokens) and self._tokens[index] is token:
+            return index
+        # Token is not (or no longer) part of this container
         return self._tokens.index(token)
 
     def distance(self, token_begin, token_end):
@@ -130,28 +190,28 @@ class Tokens:
             self.get_index(token_end)
         return end_index - begin_index
 
-    @staticmethod
-    def _find_in_tokens(tokens, flags):
-        for token in tokens:
-            if token.check_flags(flags):
-                return token
+    def _find_in_range(self, indices, flags):
+        tokens = self._tokens
+        mask = accept_mask(flags)
+        for i in indices:
+            if tokens[i].state & mask:
+                return tokens[i]
         return None
 
     def find(self, flags):
-        return self._find_in_tokens(self._tokens, flags)
+        return self._find_in_range(range(len(self._tokens)), flags)
 
     def find_previous(self, token, flags):
-        tokens = self._tokens
         if token is None:
-            tokens = tokens[::-1]
+            start = len(self._tokens) - 1
         else:
-            token_index = self.get_index(token)
-            tokens = tokens[token_index-1::-1]
-        return self._find_in_tokens(tokens, flags)
+            start = self.get_index(token) - 1
+            if start < 0:
+                # Mirrors the historical `tokens[-1::-1]` slice: searching
+                # before the first token scans the whole list from the end
+                start = len(self._tokens) - 1
+        return self._find_in_range(range(start, -1, -1), flags)
 
     def find_next(self, token, flags):
-        tokens = self._tokens
-        if token is not None:
-            token_index = self.get_index(token)
-            tokens = tokens[token_index+1:]
-        return self._find_in_tokens(tokens, flags)
+        start = 0 if token is None else self.get_index(token) + 1
+        return self._find_in_range(range(start, len(self._tokens)), flags)
@@ -6,14 +6,52 @@ import re
 
 from .keyword import keyword_manager
 from .token import TokenCategory, TokenFlags, Token
+from .watchdog import NULL_WATCHDOG
+
+
+BRACKETS = (
+    ('(', ')'),  # U+0028-U+0029 Parenthesis
+    ('[', ']'),  # U+005B-U+005D Square bracket
+    ('{', '}'),  # U+007B-U+007D Curly bracket
+    ('\u300C', '\u300D'),  # Corner bracket
+    ('\u300E', '\u300F'),  # White corner bracket
+    ('\u3010', '\u3011'),  # Black lenticular bracket
+    ('\uFF08', '\uFF09'),  # Fullwidth parenthesis
+)
+
+
+def compile_bracket_table(brackets):
+    """(open -> close lookup, regex matching any opening bracket)"""
+    open_to_close = dict(brackets)
+    opener = re.compile('[{0}]'.format(
+        ''.join(re.escape(bracket) for bracket in open_to_close)))
+    return open_to_close, opener
+
+
+BRACKET_TABLE = compile_bracket_table(BRACKETS)
+
+
+def compile_delimiter_splitter(allowed_delimiters):
+    """Regex splitting text on (and keeping) each allowed delimiter"""
+    delimiters = ''.join(['\\' + d for d in allowed_delimiters])
+    return re.compile('([{0}])'.format(delimiters))
 
 
 class Tokenizer:
-    def __init__(self, filename, options, elements, tokens):
+    def __init__(self, filename, options, elements, tokens,
+                 delimiter_splitter=None, bracket_table=BRACKET_TABLE,
+                 peek_keywords=True, watchdog=NULL_WATCHDOG):
         self.filename = filename
         self.options = options
         self.elements = elements
         self.tokens = tokens
+        self.delimiter_splitter = delimiter_splitter or \
+            compile_delimiter_splitter(options['allowed_delimiters'])
+        self.bracket_table = bracket_table
+        # False when a batch pre-pass has shown the filename has no peek
+        # keyword at all
+        self.peek_keywords = peek_keywords
+        self.watchdog = watchdog
 
     def tokenize(self):
         self._tokenize_by_brackets()
@@ -23,55 +61,44 @@ class Tokenizer:
         self.tokens.append(Token(category, content, enclosed))
 
     def _tokenize_by_brackets(self):
-        brackets = [
-            ('(', ')'),  # U+0028-U+0029 Parenthesis
-            ('[', ']'),  # U+005B-U+005D Square bracket
-            ('{', '}'),  # U+007B-U+007D Curly bracket
-            ('\u300C', '\u300D'),  # Corner bracket
-            ('\u300E', '\u300F'),  # White corner bracket
-            ('\u3010', '\u3011'),  # Black lenticular bracket
-            ('\uFF08', '\uFF09'),  # Fullwidth parenthesis
-        ]
-
+        # Single pass over the filename: `pos` advances past each bracket
+        # instead of slicing off the remaining text
+        open_to_close, opener = self.bracket_table
         text = self.filename
+        length = len(text)
+        pos = 0
         is_bracket_open = False
-        matching_bracket = ''
+        matching_bracket = None
 
-        def find_first_bracket():
-            open_brackets = [bracket_pair[0] for bracket_pair in brackets]
-
-            index = next(
-                (idx for idx, bracket in enumerate(text)
-                 if bracket in open_brackets), -1)
-            matching_bracket = next(
-                (bracket_pair[1] for bracket_pair in brackets
-                 if bracket_pair[0] == text[index]), None)
-            return index, matching_bracket
-
-        while text:
+        while pos < length:
+            self.watchdog.tick()
             if not is_bracket_open:
-                bracket_index, matching_bracket = find_first_bracket()
+                match = opener.search(text, pos)
+                bracket_index = match.start() if match else -1
+                if match:
+                    matching_bracket = open_to_close[match.group()]
             else:
                 # Looking for the matching bracket allows us to better handle
                 # some rare cases with nested brackets.
-                bracket_index = text.find(matching_bracket) if matching_bracket is not None else -1
+                bracket_index = text.find(matching_bracket, pos)
 
-            if bracket_index != 0:  # Found a token before the bracket
+            if bracket_index != pos:  # Found a token before the bracket
                 self._tokenize_by_preidentified(
-                    text[:bracket_index] if bracket_index != -1 else text,
+                    text[pos:bracket_index] if bracket_index != -1 else text[pos:],
                     enclosed=is_bracket_open
                 )
 
-            if bracket_index != -1:  # Found bracket
-                self._add_token(
-                    TokenCategory.BRACKET, text[bracket_index], enclosed=True)
-                is_bracket_open = not is_bracket_open
-                text = text[bracket_index+1:]
-            else:  # Reached the end
-                text = ''
+            if bracket_index == -1:  # Reached the end
+                break
+
+            self._add_token(
+                TokenCategory.BRACKET, text[bracket_index], enclosed=True)
+            is_bracket_open = not is_bracket_open
+            pos = bracket_index + 1
 
     def _tokenize_by_preidentified(self, text, enclosed):
-        preidentified_tokens = keyword_manager.peek(self.elements, text)
+        preidentified_tokens = keyword_manager.peek(self.elements, text) \
+            if self.peek_keywords else []
 
         last_token_end_pos = 0
         for token_begin_pos, token_end_pos in preidentified_tokens:
@@ -88,10 +115,7 @@ class Tokenizer:
             self._tokenize_by_delimiters(text[last_token_end_pos:], enclosed)
 
     def _tokenize_by_delimiters(self, text, enclosed):
-        delimiters = ''.join(
-            ['\\' + d for d in self.options['allowed_delimiters']])
-        pattern = '([{0}])'.format(delimiters)
-        splited_text = re.split(pattern, text)
+        splited_text = self.delimiter_splitter.split(text)
 
         for sub_text in splited_text:
             if sub_text:
@@ -126,9 +150,11 @@ class Tokenizer:
             append_to.content += token.content
             token.category = TokenCategory.INVALID
 
+        tick = self.watchdog.tick
         for token in self.tokens.get_list():
             if token.category != TokenCategory.DELIMITER:
                 continue
+            tick()
 
             delimiter = token.content
             prev_token = find_previous_valid_token(token)
@@ -140,6 +166,7 @@ class Tokenizer:
                 if is_single_character_token(prev_token):
                     append_token_to(token, prev_token)
                     while is_unknown_token(next_token):
+                        tick()
                         append_token_to(next_token, prev_token)
                         next_token = find_next_valid_token(next_token)
                         if is_delimiter_token(next_token) and \
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import time
+
+
+class ParseBudgetExceeded(Exception):
+    """Raised when a single parse runs past its step or time budget"""
+
+    # Values of `reason`
+    STEP_BUDGET = 'step budget exceeded'
+    TIME_BUDGET = 'time budget exceeded'
+
+    def __init__(self, filename, reason, steps, elapsed):
+        super(ParseBudgetExceeded, self).__init__(
+            '{0} after {1} steps / {2:.3f}s: {3!r}'.format(
+                reason, steps, elapsed, filename))
+        self.filename = filename
+        self.reason = reason
+        self.steps = steps
+        self.elapsed = elapsed
+
+
+class ParseBudget:
+    """Per-parse limits; None disables a limit"""
+
+    def __init__(self, max_steps=None, max_seconds=None):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+
+    def __bool__(self):
+        return self.max_steps is not None or self.max_seconds is not None
+
+    def start(self, filename):
+        return ParseWatchdog(filename, self.max_steps, self.max_seconds) \
+            if self else NULL_WATCHDOG
+
+
+class ParseWatchdog:
+    """Counts loop iterations of the tokenizer/parser for one filename.
+
+    tick() is called once per iteration of every loop that is not bounded
+    by the token count (bracket scan, delimiter validation, title/group/
+    episode title searches). The clock is read every CHECK_INTERVAL ticks
+    only, to keep the hot path cheap.
+    """
+    __slots__ = ('filename', 'steps', 'max_steps', 'started', 'deadline')
+
+    CHECK_INTERVAL = 64
+
+    def __init__(self, filename, max_steps=None, max_seconds=None):
+        self.filename = filename
+        self.steps = 0
+        self.max_steps = max_steps
+        self.started = time.perf_counter()
+        self.deadline = None if max_seconds is None \
+            else self.started + max_seconds
+
+    def tick(self):
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            self._fail(ParseBudgetExceeded.STEP_BUDGET)
+        if self.deadline is not None and \
+                self.steps % self.CHECK_INTERVAL == 0 and \
+                time.perf_counter() > self.deadline:
+            self._fail(ParseBudgetExceeded.TIME_BUDGET)
+
+    def _fail(self, reason):
+        raise ParseBudgetExceeded(self.filename, reason, self.steps,
+                                  time.perf_counter() - self.started)
+
+
+class _NullWatchdog:
+    __slots__ = ()
+
+    def tick(self):
+        pass
+
+
+NULL_WATCHDOG = _NullWatchdog()
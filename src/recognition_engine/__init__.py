@@ -1,9 +1,16 @@
-from .kernel import core_recognize
-from .data_models import MetaBase, MediaType
-from .path_parser import PathParser
-from .batch_helper import BatchHelper
-from .bgm_matcher.logic import BangumiMatcher
-from .tmdb_matcher.logic import TMDBMatcher
+# [Optimize] 子模块按需导入 (PEP 562)：仅 import recognition_engine 或其轻量子模块 (audit_log / data_models 等)
+# 时不再连带加载内核、两套匹配器及 zhconv / cn2an，CLI 与 GUI 冷启动更快；首次访问属性时才导入对应子模块
+import importlib
+
+_LAZY_EXPORTS = {
+    "core_recognize": ".kernel",
+    "MetaBase": ".data_models",
+    "MediaType": ".data_models",
+    "PathParser": ".path_parser",
+    "BatchHelper": ".batch_helper",
+    "BangumiMatcher": ".bgm_matcher.logic",
+    "TMDBMatcher": ".tmdb_matcher.logic",
+}
 
 __all__ = [
     "core_recognize",
@@ -13,4 +20,17 @@ __all__ = [
     "BatchHelper",
     "BangumiMatcher",
     "TMDBMatcher"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
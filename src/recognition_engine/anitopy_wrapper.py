@@ -1,23 +1,178 @@
 import anitopy
+import json
+import logging
+import os
+import threading
+import time
 import traceback
 import sys
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger("recognition_engine.anitopy_wrapper")
+
+# 内核使用的 anitopy 选项
+DEFAULT_OPTIONS = {
+    "allow_extended_episode_numbering": True,
+    "parse_release_group": False,
+    "parse_file_extension": False,
+    "parse_episode_title": True
+}
+
+# [NEW] 解析结果 LRU 容量，0 关闭缓存
+CACHE_SIZE = int(os.environ.get("AM_ANITOPY_CACHE_SIZE", "2048"))
+
+# [NEW] 解析看门狗：单次解析的循环步数 / 耗时上限 (语料中最多约 700 步)，0 关闭对应限制
+MAX_STEPS = int(os.environ.get("AM_ANITOPY_MAX_STEPS", "50000"))
+MAX_SECONDS = float(os.environ.get("AM_ANITOPY_TIMEOUT", "1.0"))
+# 触发看门狗或崩溃的输入追加写入该文件 (JSON Lines)，作为回归语料；留空则只记日志
+# 默认不写文件：引擎也被 CLI / 桌面端直接使用，由服务部署 (docker-compose) 显式开启
+INCIDENT_FILE = os.environ.get("AM_ANITOPY_INCIDENT_FILE", "")
+# 事故文件大小上限 (字节)，达到后不再追加
+INCIDENT_MAX_BYTES = int(os.environ.get("AM_ANITOPY_INCIDENT_MAX_BYTES", str(1024 * 1024)))
+# 用于去重的已记录输入数 (LRU)
+INCIDENT_SEEN_SIZE = 1024
+
+
+def _copy_result(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """解析结果的值只有 str 与 list[str]，复制外层 dict 与其中的 list 即可隔离调用方的修改"""
+    if result is None: return None
+    return {k: list(v) if isinstance(v, list) else v for k, v in result.items()}
+
+
+class ParseIncidents:
+    """anitopy 解析事故 (看门狗超限 / 崩溃) 的计数与回归语料记录"""
+    counts: Dict[str, int] = {"budget": 0, "crash": 0}
+    # [Fix] 有界 LRU：达到上限后淘汰最久未出现的输入，成员判断始终有效
+    _seen: "OrderedDict[str, None]" = OrderedDict()
+    _file_full = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, kind: str, filename: str, detail: str, steps: int = 0, elapsed: float = 0.0) -> None:
+        with cls._lock:
+            cls.counts[kind] = cls.counts.get(kind, 0) + 1
+            first = filename not in cls._seen
+            cls._seen[filename] = None
+            cls._seen.move_to_end(filename)
+            while len(cls._seen) > INCIDENT_SEEN_SIZE: cls._seen.popitem(last=False)
+        # 同一输入只记录一次，避免重复提交时刷屏
+        if not first: return
+        logger.warning(f"⚠️ [Anitopy] 解析{'超出预算' if kind == 'budget' else '崩溃'}，已快速失败: {detail} | {filename}")
+        if not INCIDENT_FILE or cls._file_full: return
+        row = {"ts": round(time.time(), 3), "kind": kind, "filename": filename, "detail": detail,
+               "steps": steps, "elapsed": round(elapsed, 4)}
+        try:
+            os.makedirs(os.path.dirname(INCIDENT_FILE) or ".", exist_ok=True)
+            if os.path.exists(INCIDENT_FILE) and os.path.getsize(INCIDENT_FILE) >= INCIDENT_MAX_BYTES:
+                cls._file_full = True
+                logger.warning(f"⚠️ [Anitopy] 事故文件已达上限 ({INCIDENT_MAX_BYTES} 字节)，停止追加: {INCIDENT_FILE}")
+                return
+            with open(INCIDENT_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.debug(f"解析事故写入失败: {e}")
+
 
 class AnitopyWrapper:
+    # [Optimize] 常驻的已编译解析器：选项冻结、分隔符正则与括号表只构建一次
+    _budget = anitopy.ParseBudget(MAX_STEPS or None, MAX_SECONDS or None)
+    _parser = anitopy.CompiledAnitopy(DEFAULT_OPTIONS, _budget)
+    # [NEW] 同一发布的各集在 pre_clean / 屏蔽后往往得到相同的 processed_title，按 (标题, 冻结选项) 缓存解析结果
+    # 值为解析结果，或超出步数预算时的 ParseBudgetExceeded (负缓存)
+    _cache: "OrderedDict[tuple, Any]" = OrderedDict()
+    _cache_size = CACHE_SIZE
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+    _evictions = 0
+
     @staticmethod
     def parse(filename: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Pure wrapper around Anitopy with crash protection.
         """
         try:
-            if options is None:
-                options = {
-                    "allow_extended_episode_numbering": True,
-                    "parse_release_group": False,
-                    "parse_file_extension": False,
-                    "parse_episode_title": True
-                }
-            return anitopy.parse(filename, options=options)
-        except Exception:
+            parser = AnitopyWrapper._parser if options is None else anitopy.CompiledAnitopy(options, AnitopyWrapper._budget)
+            if AnitopyWrapper._cache_size <= 0:
+                return parser.parse(filename)
+            return AnitopyWrapper._cached_parse(parser, filename)
+        except anitopy.ParseBudgetExceeded as e:
+            # [NEW] 病态输入快速失败并记录，不让工作线程卡死在解析循环中
+            ParseIncidents.record("budget", filename, e.reason, e.steps, e.elapsed)
+            return {}
+        except Exception as e:
             # If anitopy crashes, return empty dict to let fallback logic handle it
+            ParseIncidents.record("crash", filename, f"{type(e).__name__}: {e}")
             return {}
+
+    @classmethod
+    def _cached_parse(cls, parser: "anitopy.CompiledAnitopy", filename: str) -> Optional[Dict[str, Any]]:
+        key = (filename, parser.options_key)
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                cls._hits += 1
+                cached = cls._cache[key]
+                if not isinstance(cached, anitopy.ParseBudgetExceeded):
+                    return _copy_result(cached)
+            else:
+                cls._misses += 1
+                cached = None
+        if cached is not None:
+            # 负缓存命中：抛出新的异常对象 (复用旧对象会不断累积 traceback)
+            raise anitopy.ParseBudgetExceeded(cached.filename, cached.reason, cached.steps, cached.elapsed)
+
+        # 解析在锁外执行；普通异常不缓存，交由 parse 的崩溃保护处理
+        try:
+            result = parser.parse(filename)
+        except anitopy.ParseBudgetExceeded as e:
+            # [Fix] 超出步数预算的输入做负缓存：重复提交时直接快速失败，不再耗尽一次预算
+            # 耗时超限受负载影响 (CPU 争用 / GC / 繁忙的进程池)，不缓存，下次请求重新解析
+            if e.reason == anitopy.ParseBudgetExceeded.STEP_BUDGET:
+                cls._store(key, e)
+            raise
+        cls._store(key, _copy_result(result))
+        return result
+
+    @classmethod
+    def _store(cls, key: tuple, value: Any) -> None:
+        with cls._lock:
+            cls._cache[key] = value
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls._cache_size:
+                cls._cache.popitem(last=False)
+                cls._evictions += 1
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, float]:
+        """解析缓存统计 (供 /metrics 输出)"""
+        with cls._lock:
+            lookups = cls._hits + cls._misses
+            return {
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "evictions": cls._evictions,
+                "size": len(cls._cache),
+                "capacity": cls._cache_size,
+                "hit_ratio": cls._hits / lookups if lookups else 0.0,
+            }
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+            cls._hits = cls._misses = cls._evictions = 0
+
+    @staticmethod
+    def parse_many(filenames: Iterable[str], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        [NEW] 批量解析：共享已编译状态，并对整批标题做一次 peek 关键字预扫描。
+        结果与逐条调用 parse 完全一致；整批失败时退回逐条解析，保持单条的崩溃保护语义。
+        """
+        filenames = list(filenames)
+        parser = AnitopyWrapper._parser if options is None else anitopy.CompiledAnitopy(options, AnitopyWrapper._budget)
+        try:
+            return parser.parse_many(filenames)
+        except Exception:
+            return [AnitopyWrapper.parse(filename, options) for filename in filenames]
@@ -0,0 +1,71 @@
+"""
+审计日志分级
+- full:    完整审计 (内核各 STEP、数据源请求与候选对撞追踪、最终汇报)
+- summary: 仅保留流水线里程碑与最终汇报，内核与数据源的细节追踪不再生成
+- off:     不生成任何审计日志 (批量调用场景)
+
+引擎与数据源函数依旧接收 List[str] 形式的 logs 参数；传入 NullLog 即表示"无人关心"。
+内核热路径通过 emit() 写入 LogEvent：只保存模板与参数，渲染推迟到汇出端 (render_logs)；
+日志关闭时 emit() 直接返回，既不创建事件也不做任何格式化。
+"""
+from typing import Any, List
+
+LOG_LEVELS = ("off", "summary", "full")
+
+
+class NullLog(list):
+    """丢弃所有写入的日志容器，兼容 list / RecognitionLogger 两种写法"""
+    enabled = False
+
+    def append(self, item): pass
+    def extend(self, items): pass
+    def insert(self, index, item): pass
+    def log(self, message: str, *args, **kwargs): pass
+    def __iadd__(self, other): return self
+
+
+class LogEvent:
+    """延迟格式化的审计事件，模板使用 str.format 语法，render() 时才拼接字符串 (无参数时模板原样输出)"""
+    __slots__ = ("template", "args")
+
+    def __init__(self, template: str, args: tuple = ()):
+        self.template = template
+        self.args = args
+
+    def render(self) -> str:
+        return self.template.format(*self.args) if self.args else self.template
+
+    __str__ = render
+
+    def __repr__(self) -> str:
+        return f"LogEvent({self.render()!r})"
+
+
+def emit(logs: Any, template: str, *args: Any) -> None:
+    """写入一条审计事件；logs 为 None / NullLog 时立即返回"""
+    if logs is not None and getattr(logs, "enabled", True):
+        logs.append(LogEvent(template, args))
+
+
+def new_log(enabled: bool) -> List[Any]:
+    """子流程的局部日志容器：开启时为普通列表，关闭时为 NullLog"""
+    return [] if enabled else NullLog()
+
+
+def render_logs(logs: Any) -> Any:
+    """汇出端：把 logs 中的 LogEvent 原地渲染为字符串 (已是字符串的条目保持不变)"""
+    if not audit_enabled(logs): return logs
+    for i, item in enumerate(logs):
+        if type(item) is LogEvent: logs[i] = item.render()
+    return logs
+
+
+def audit_enabled(logs: Any) -> bool:
+    """普通列表或记录器视为开启；None 与 NullLog 视为关闭"""
+    return logs is not None and getattr(logs, "enabled", True)
+
+
+def normalize_log_level(level: Any) -> str:
+    """非法或缺省值统一回落到 full，保持旧客户端行为不变"""
+    level = str(level or "").strip().lower()
+    return level if level in LOG_LEVELS else "full"
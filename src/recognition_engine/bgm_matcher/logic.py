@@ -1,6 +1,5 @@
 import regex as re
 from typing import List, Optional, Dict, Tuple
-from difflib import SequenceMatcher
 from datetime import datetime
 from .constants import TRUNCATION_PATTERNS, FORMAT_CLEAN_PATTERNS
 
@@ -66,6 +65,7 @@ class BangumiMatcher:
         """
         计算 TMDB 候选人与 Bangumi 条目的匹配分值 (100分制)，并返回轨迹
         """
+        from difflib import SequenceMatcher
         tmdb_title_cn = candidate.get('title') or candidate.get('name', '')
         tmdb_title_orig = candidate.get('original_title') or candidate.get('original_name', '')
         
@@ -1,61 +1,226 @@
+import hashlib
 import os
-from typing import Set
+import pickle
+import sys
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Sequence, Set, Tuple
 import logging
 
+import regex as re
+
+from .constants import PLATFORM_RE, NOT_GROUPS
+
 logger = logging.getLogger(__name__)
 
+_DIR = os.path.dirname(os.path.abspath(__file__))
+TXT_PATH = os.path.join(_DIR, "builtin_groups.txt")
+# [NEW] 预计算产物：由 `python -m recognition_engine.builtin_group_loader --build` 生成
+ARTIFACT_PATH = os.path.join(_DIR, "builtin_groups.bin")
+ARTIFACT_VERSION = 1
+
+# 制作组匹配的 CJK/字母数字边界
+BOUNDARY_CHARS = r"a-zA-Z0-9\u4e00-\u9fa5\u3040-\u309f\u30a0-\u30ff"
+
+# (制作组名, 边界匹配正则, 预筛用的 casefold 变体)
+GroupEntry = Tuple[str, str, Tuple[str, ...]]
+
+
+def _zhconv_version() -> str:
+    """已安装的 zhconv 版本 (繁简变体由它派生)，未安装时为空串"""
+    from importlib import metadata
+    try:
+        return metadata.version("zhconv")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _signature(text: str, zhconv_version: str) -> str:
+    """产物签名：名单内容 + 影响派生结果的常量与 zhconv 版本，任一变化即视为过期"""
+    h = hashlib.sha1()
+    for part in (str(ARTIFACT_VERSION), PLATFORM_RE, NOT_GROUPS, BOUNDARY_CHARS, zhconv_version, text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def build_group_entry(g: str) -> Optional[GroupEntry]:
+    """
+    派生单个制作组的匹配条目；平台词与技术规格返回 None (排他性检查)。
+    同时匹配原始、简体、繁体三个版本，并应用 CJK 边界保护。
+    """
+    if re.search(PLATFORM_RE, g) or re.search(rf"(?i)^({NOT_GROUPS})$", g):
+        return None
+    import zhconv
+    g_simp, g_trad = zhconv.convert(g, "zh-hans"), zhconv.convert(g, "zh-hant")
+    p_esc, s_esc, t_esc = re.escape(g), re.escape(g_simp), re.escape(g_trad)
+    pattern = rf"(?i)(?<![{BOUNDARY_CHARS}])({p_esc}|{s_esc}|{t_esc})(?![{BOUNDARY_CHARS}])"
+    needles = tuple(sorted({v.casefold() for v in (g, g_simp, g_trad)}))
+    return g, pattern, needles
+
+
+def _order_key(entry: GroupEntry):
+    # 长词优先匹配，防止短词拦截长词；同长度按名称排序保证顺序稳定
+    return -len(entry[0]), entry[0]
+
+
 class BuiltinGroupLoader:
     """内置制作组加载器"""
-    
+
     _instance = None
     _builtin_groups: Set[str] = set()
+    _entries: Tuple[GroupEntry, ...] = ()
+    _lower_names: FrozenSet[str] = frozenset()
+    _compiled: Optional[Tuple[Tuple[str, re.Pattern, Tuple[str, ...]], ...]] = None
+    _source = ""
     _loaded = False
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     @classmethod
     def load(cls) -> None:
-        """加载内置制作组"""
+        """加载内置制作组：优先读取预计算产物，产物缺失或与名单不一致时回退文本解析"""
         if cls._loaded:
             return
-        
+
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            txt_path = os.path.join(current_dir, "builtin_groups.txt")
-            
-            with open(txt_path, 'r', encoding='utf-8') as f:
-                groups = [line.strip() for line in f if line.strip()]
-            
+            with open(TXT_PATH, 'r', encoding='utf-8') as f:
+                text = f.read()
+            groups = [line.strip() for line in text.splitlines() if line.strip()]
+
+            artifact = cls._read_artifact(_signature(text, _zhconv_version()))
+            if artifact is not None:
+                entries, cls._source = artifact["entries"], "artifact"
+            else:
+                entries, cls._source = cls.build_entries(groups), "text"
+
             cls._builtin_groups = set(groups)
+            cls._entries = tuple(entries)
+            cls._lower_names = frozenset(g.lower() for g in groups)
+            cls._compiled = None
             cls._loaded = True
-            logger.info(f"已加载 {len(cls._builtin_groups)} 个内置制作组")
-            
+            logger.info(f"已加载 {len(cls._builtin_groups)} 个内置制作组 (来源: {cls._source})")
+
         except FileNotFoundError:
-            logger.warning(f"内置制作组文件不存在: {txt_path}")
+            logger.warning(f"内置制作组文件不存在: {TXT_PATH}")
             cls._loaded = True
         except Exception as e:
             logger.error(f"加载内置制作组失败: {e}")
             cls._loaded = True
-    
+
+    @staticmethod
+    def _read_artifact(signature: str) -> Optional[dict]:
+        try:
+            with open(ARTIFACT_PATH, "rb") as f:
+                artifact = pickle.load(f)
+        except FileNotFoundError:
+            logger.warning("内置制作组产物不存在，回退文本解析 (可运行 python -m recognition_engine.builtin_group_loader --build)")
+            return None
+        except Exception as e:
+            logger.warning(f"内置制作组产物读取失败，回退文本解析: {e}")
+            return None
+        if not isinstance(artifact, dict) or artifact.get("version") != ARTIFACT_VERSION or artifact.get("signature") != signature:
+            logger.warning("内置制作组产物已过期，回退文本解析 (可运行 python -m recognition_engine.builtin_group_loader --build)")
+            return None
+        return artifact
+
+    @staticmethod
+    def build_entries(groups: Sequence[str]) -> List[GroupEntry]:
+        """为名单派生匹配条目 (已剔除排他词)，按匹配优先级排序"""
+        entries = [e for e in (build_group_entry(g) for g in set(groups)) if e is not None]
+        entries.sort(key=_order_key)
+        return entries
+
+    @classmethod
+    def build_artifact(cls, path: str = ARTIFACT_PATH) -> dict:
+        """构建步骤：读取 builtin_groups.txt，派生全部条目并序列化"""
+        with open(TXT_PATH, 'r', encoding='utf-8') as f:
+            text = f.read()
+        groups = [line.strip() for line in text.splitlines() if line.strip()]
+        zhconv_version = _zhconv_version()
+        artifact = {
+            "version": ARTIFACT_VERSION,
+            "signature": _signature(text, zhconv_version),
+            "zhconv": zhconv_version,
+            "groups": len(set(groups)),
+            "entries": cls.build_entries(groups),
+        }
+        with open(path, "wb") as f:
+            pickle.dump(artifact, f, protocol=4)
+        return artifact
+
     @classmethod
     def get_builtin_groups(cls) -> Set[str]:
         """获取所有内置制作组"""
         if not cls._loaded:
             cls.load()
         return cls._builtin_groups
-    
+
     @classmethod
     def is_builtin_group(cls, name: str) -> bool:
         """检查是否是内置制作组"""
         if not cls._loaded:
             cls.load()
         return name in cls._builtin_groups
-    
+
+    @classmethod
+    def compiled_entries(cls) -> Tuple[Tuple[str, re.Pattern, Tuple[str, ...]], ...]:
+        """内置条目的已编译版本 (首次调用时编译，之后常驻)"""
+        if not cls._loaded:
+            cls.load()
+        if cls._compiled is None:
+            cls._compiled = tuple((g, re.compile(p), n) for g, p, n in cls._entries)
+        return cls._compiled
+
+    @staticmethod
+    def clean_custom_groups(custom_groups: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        """清洗自定义制作组：去掉来源标签前缀，丢弃过短的名称"""
+        cleaned = []
+        for g in custom_groups or ():
+            g_clean = re.sub(r"^\[(?:REMOTE|私有|社区|内置)\]", "", g).strip()
+            if g_clean and len(g_clean) >= 2:
+                cleaned.append(g_clean)
+        return tuple(cleaned)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def match_order(cls, custom_groups: Tuple[str, ...] = ()) -> Tuple[Tuple[str, re.Pattern, Tuple[str, ...]], ...]:
+        """
+        内置 + 自定义制作组的匹配顺序 (长词优先)，元素为 (名称, 已编译正则, casefold 变体)。
+        custom_groups 需为 clean_custom_groups 的结果；结果按自定义名单缓存。
+        """
+        builtin = cls.compiled_entries()
+        if not custom_groups: return builtin
+        extra = []
+        for g in set(custom_groups) - cls._builtin_groups:
+            entry = build_group_entry(g)
+            if entry is not None:
+                extra.append((entry[0], re.compile(entry[1]), entry[2]))
+        return tuple(sorted(builtin + tuple(extra), key=_order_key))
+
+    @classmethod
+    def lower_names(cls, custom_groups: Tuple[str, ...] = ()) -> FrozenSet[str]:
+        """内置 + 自定义制作组的小写名称集合 (用于精确查库)"""
+        if not cls._loaded:
+            cls.load()
+        if not custom_groups: return cls._lower_names
+        return cls._lower_names | {g.lower() for g in custom_groups}
+
     @classmethod
     def reload(cls) -> None:
         """重新加载内置制作组"""
         cls._loaded = False
+        cls.match_order.cache_clear()
         cls.load()
+
+
+if __name__ == "__main__":
+    # python -m recognition_engine.builtin_group_loader --build | --check
+    if "--check" in sys.argv:
+        BuiltinGroupLoader.load()
+        print(f"source={BuiltinGroupLoader._source} groups={len(BuiltinGroupLoader._builtin_groups)} entries={len(BuiltinGroupLoader._entries)}")
+        sys.exit(0 if BuiltinGroupLoader._source == "artifact" else 1)
+    result = BuiltinGroupLoader.build_artifact()
+    print(f"wrote {ARTIFACT_PATH}: {result['groups']} groups, {len(result['entries'])} entries (zhconv {result['zhconv'] or '?'})")
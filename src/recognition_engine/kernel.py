@@ -1,8 +1,11 @@
 import regex as re
 from typing import List, Optional, Tuple, Any, Dict, Callable
-import zhconv
 
-from .constants import MediaType, PIX_RE, VIDEO_RE, AUDIO_RE, SOURCE_RE, DYNAMIC_RANGE_RE, PLATFORM_RE, NOISE_WORDS
+from .constants import MediaType, PIX_RE, VIDEO_RE, AUDIO_RE, SOURCE_RE, DYNAMIC_RANGE_RE, PLATFORM_RE
+from .noise_matcher import NoiseMatcher
+from .regex_guard import RegexGuard
+from .audit_log import LogEvent, audit_enabled, emit, new_log, render_logs
+from .tracing import StepSpans
 from .data_models import MetaBase
 from .title_cleaner import TitleCleaner
 from .tag_extractor import TagExtractor
@@ -16,17 +19,20 @@ class LoggerStub:
     """
     def __init__(self, logs: List[str]):
         self.logs = logs
+        # 日志关闭 (NullLog) 时跳过所有审计字符串拼接
+        self.enabled = audit_enabled(logs)
     
     def log(self, message: str):
-        self.logs.append(message)
+        if self.enabled: self.logs.append(message)
         
     def debug_out(self, section: str, msgs: List[str]):
-        self.logs.append(f"┃ [DEBUG][{section}]: 启动子流程审计")
+        if not self.enabled: return
+        self.logs.append(LogEvent("┃ [DEBUG][{}]: 启动子流程审计", (section,)))
         if not msgs:
-            self.logs.append(f"┣ ⏩ 该步骤未产生关键动作")
+            self.logs.append("┣ ⏩ 该步骤未产生关键动作")
         else:
-            for m in msgs: self.logs.append(f"┣ {m}")
-        self.logs.append(f"┗ ✅ 流程结束")
+            for m in msgs: self.logs.append(LogEvent("┣ {}", (m,)))
+        self.logs.append("┗ ✅ 流程结束")
 
 def core_recognize(
     input_name: str, 
@@ -41,16 +47,39 @@ def core_recognize(
     """
     The Pure Recognition Kernel.
     Stateless, I/O-free (except via callbacks).
+    审计日志以 LogEvent 延迟格式化，返回前统一渲染，current_logs 中得到的仍是字符串。
     """
+    try:
+        # 步骤 span 在此统一收尾：任一步骤抛出异常时也会结束当前步骤并标记错误
+        with StepSpans("kernel") as steps:
+            return _recognize(input_name, custom_words, custom_groups, original_input, current_logs, batch_enhancement, fingerprint_data, force_filename, steps)
+    finally:
+        render_logs(current_logs)
+
+
+def _recognize(
+    input_name: str,
+    custom_words: List[str],
+    custom_groups: List[str],
+    original_input: str,
+    current_logs: List[str],
+    batch_enhancement: bool,
+    fingerprint_data: Optional[Dict[str, Any]],
+    force_filename: bool,
+    steps: StepSpans
+) -> MetaBase:
     logger_stub = LoggerStub(current_logs)
+    verbose = logger_stub.enabled
 
     meta_obj = MetaBase(type=MediaType.UNKNOWN)
     # --- STEP 1: 预处理 ---
-    processed_title, forced, debug1 = TitleCleaner.pre_clean(input_name, custom_words, force_filename=force_filename)
+    steps.next("step1_pre_clean", {"rules": len(custom_words or [])})
+    processed_title, forced, debug1 = TitleCleaner.pre_clean(input_name, custom_words, force_filename=force_filename, verbose=verbose, lazy=True)
     meta_obj.processed_name = input_name 
     logger_stub.debug_out("STEP 1: 预处理与自定义规则", debug1)
     if forced:
-        for k, v in forced.items(): current_logs.append(f"┣ [DEBUG][Forced] 应用强制元数据: {k} = {v}")
+        if verbose:
+            for k, v in forced.items(): emit(current_logs, "┣ [DEBUG][Forced] 应用强制元数据: {} = {}", k, v)
         if "tmdbid" in forced: meta_obj.forced_tmdbid = forced["tmdbid"]
         if "type" in forced:
             type_val = forced["type"].lower()
@@ -64,9 +93,10 @@ def core_recognize(
         if "e" in forced: meta_obj.begin_episode = int(forced["e"])
 
     # --- [NEW] STEP 1.5: 特权提取 (标题 + 集数) ---
+    steps.next("step1_5_privileged")
     from .special_episode_handler import SpecialEpisodeHandler
-    current_logs.append(f"┃")
-    sp_group, sp_title, sp_ep, sp_raw, sp_logs, sp_meta = SpecialEpisodeHandler.extract(input_name)
+    emit(current_logs, "┃")
+    sp_group, sp_title, sp_ep, sp_raw, sp_logs, sp_meta = SpecialEpisodeHandler.extract(input_name, verbose=verbose)
     if sp_title is not None:
         meta_obj.privileged_title = sp_title  # 存储特权标题，用于优先搜索
         if sp_ep is not None:
@@ -94,13 +124,13 @@ def core_recognize(
             pattern = rf"(?<!\d){re.escape(sp_raw)}(?!\d)"
             if re.search(pattern, processed_title):
                 processed_title = re.sub(pattern, " ", processed_title, count=1)
-                sp_logs.append(f"┣ [Shield] 特权集数已从标题中剥离: {sp_raw}")
+                emit(sp_logs, "┣ [Shield] 特权集数已从标题中剥离: {}", sp_raw)
             else:
                 sp_raw_alt = str(int(sp_raw))
                 pattern_alt = rf"(?<!\d){re.escape(sp_raw_alt)}(?!\d)"
                 if sp_raw_alt != sp_raw and re.search(pattern_alt, processed_title):
                     processed_title = re.sub(pattern_alt, " ", processed_title, count=1)
-                    sp_logs.append(f"┣ [Shield] 特权集数已从标题中剥离 (格式转换): {sp_raw_alt}")
+                    emit(sp_logs, "┣ [Shield] 特权集数已从标题中剥离 (格式转换): {}", sp_raw_alt)
 
         # 剥离特权制作组
         if sp_group:
@@ -108,15 +138,17 @@ def core_recognize(
             if re.search(group_pattern, processed_title, re.IGNORECASE):
                 processed_title = re.sub(group_pattern, " ", processed_title, flags=re.IGNORECASE)
                 processed_title = re.sub(r"\s+", " ", processed_title).strip()
-                sp_logs.append(f"┣ [Shield] 特权制作组已从标题中剥离: {sp_group}")
+                emit(sp_logs, "┣ [Shield] 特权制作组已从标题中剥离: {}", sp_group)
 
-        sp_logs.append(f"清洗后结果: {processed_title}")
+        if verbose: emit(sp_logs, "清洗后结果: {}", processed_title)
         logger_stub.debug_out("STEP 1.5: 特权提取 (标题 + 集数)", sp_logs)
+        steps.set_attribute("hit", True)
     else:
         logger_stub.debug_out("STEP 1.5: 特权提取 (标题 + 集数)", ["未命中任何特权规则"])
 
     # --- STEP 2: 元数据独立探测 ---
-    current_logs.append(f"┃")
+    steps.next("step2_probe")
+    emit(current_logs, "┃")
     meta_obj.year, debug2_y = TagExtractor.extract_year(processed_title)
     
     # 只有在未指定强制季数时，才尝试提取季数
@@ -124,32 +156,26 @@ def core_recognize(
     if meta_obj.begin_season is None:
         meta_obj.begin_season, debug2_s = TagExtractor.extract_season(processed_title)
     else:
-        debug2_s = [f"保留强制季数 S{meta_obj.begin_season}"]
+        debug2_s = [LogEvent("保留强制季数 S{}", (meta_obj.begin_season,))] if verbose else []
 
     # [Fix] 优先从原始输入提取发布平台，防止被预处理噪声逻辑误删
     meta_obj.resource_platform, debug2_p = TagExtractor.extract_platform(input_name)
     logger_stub.debug_out("STEP 2: 元数据独立探测", debug2_y + debug2_s + debug2_p)
 
     # --- STEP 2.5: 技术规格预提取与标题屏蔽 (Noise Shielding) ---
-    current_logs.append(f"┃")
-    s_logs = []
+    steps.next("step2_5_shield")
+    emit(current_logs, "┃")
+    s_logs = new_log(verbose)
     
     # [Strategy] 顶级优先级：全局制作组扫描（内置 + 自定义）
     from .builtin_group_loader import BuiltinGroupLoader
     from .constants import GROUP_KEYWORDS
     
     # 合并内置制作组和自定义制作组
+    # [Optimize] 简繁变体、排他检查与边界正则均已预计算 (builtin_groups.bin)，这里只取结果
     builtin_groups = BuiltinGroupLoader.get_builtin_groups()
-    all_groups = set(builtin_groups)
-    
-    # 预处理：提取所有清洗后的自定义制作组名称
-    cleaned_custom_groups = []
-    if custom_groups:
-        for g in custom_groups:
-            g_clean = re.sub(r"^\[(?:REMOTE|私有|社区|内置)\]", "", g).strip()
-            if g_clean and len(g_clean) >= 2:
-                cleaned_custom_groups.append(g_clean)
-                all_groups.add(g_clean)
+    cleaned_custom_groups = BuiltinGroupLoader.clean_custom_groups(custom_groups)
+    group_names_lower = BuiltinGroupLoader.lower_names(cleaned_custom_groups)
     
     # [New Strategy] 优先扫描所有括号内容，检查是否是联合制作组
     bracket_matches = re.findall(r'\[([^\]]+)\]', processed_title)
@@ -166,7 +192,7 @@ def core_recognize(
                     all_valid = False
                     break
                 # 检查是否在制作组库中（精确匹配），或者符合制作组特征
-                in_lib = any(g.lower() == part.lower() for g in all_groups)
+                in_lib = part.lower() in group_names_lower
                 has_keyword = re.search(GROUP_KEYWORDS, part)
                 if not in_lib and not has_keyword:
                     all_valid = False
@@ -175,26 +201,20 @@ def core_recognize(
             if all_valid and len(parts) >= 2:
                 # 确认是联合制作组，直接使用整个括号内容
                 meta_obj.resource_team = bracket_content
-                s_logs.append(f"┣ [Shield] 全局匹配命中制作组(含联合扩张): {bracket_content}")
+                emit(s_logs, "┣ [Shield] 全局匹配命中制作组(含联合扩张): {}", bracket_content)
                 processed_title = re.sub(rf'\[{re.escape(bracket_content)}\]', " ", processed_title)
                 processed_title = re.sub(r"\s+", " ", processed_title).strip()
                 break
     
     # [Fallback] 如果没有匹配到联合制作组，使用原有的遍历逻辑
     if not meta_obj.resource_team:
-        from .constants import NOT_GROUPS
-        sorted_groups = sorted(all_groups, key=len, reverse=True)
-        for g in sorted_groups:
-            # [Crucial] 平台词与技术规格排他性检查
-            if re.search(PLATFORM_RE, g) or re.search(rf"(?i)^({NOT_GROUPS})$", g):
+        # 长词优先；平台词与技术规格已在构建条目时排除。先以 casefold 子串预筛，命中后再跑边界正则
+        folded_title = processed_title.casefold()
+        for g, pattern, needles in BuiltinGroupLoader.match_order(cleaned_custom_groups):
+            if not any(n in folded_title for n in needles):
                 continue
             
-            g_simp, g_trad = zhconv.convert(g, "zh-hans"), zhconv.convert(g, "zh-hant")
-            p_esc, s_esc, t_esc = re.escape(g), re.escape(g_simp), re.escape(g_trad)
-            boundary_chars = r"a-zA-Z0-9\u4e00-\u9fa5\u3040-\u309f\u30a0-\u30ff"
-            pattern = rf"(?i)(?<![{boundary_chars}])({p_esc}|{s_esc}|{t_esc})(?![{boundary_chars}])"
-            
-            match = re.search(pattern, processed_title)
+            match = pattern.search(processed_title)
             if match:
                 start, end = match.start(), match.end()
                 l_pos, r_pos = start, end
@@ -262,7 +282,7 @@ def core_recognize(
                 
                 # 判断来源
                 source = "内置库" if g in builtin_groups else "自定义库"
-                s_logs.append(f"┣ [Shield] 全局匹配命中制作组({source}): {full_block}")
+                emit(s_logs, "┣ [Shield] 全局匹配命中制作组({}): {}", source, full_block)
                 processed_title = (processed_title[:l_pos] + " " + processed_title[r_pos:]).strip()
                 processed_title = re.sub(r"\s+", " ", processed_title)
                 break
@@ -275,7 +295,7 @@ def core_recognize(
         if first_block_match:
             candidate = first_block_match.group(1).strip()
             # 检查是否在制作组库中
-            in_lib = any(g.lower() == candidate.lower() for g in all_groups)
+            in_lib = candidate.lower() in group_names_lower
             has_keyword = re.search(GROUP_KEYWORDS, candidate)
             
             # 语义校验：在库中或包含制作组特征词
@@ -286,7 +306,7 @@ def core_recognize(
                     
                     # 判断来源
                     source = "内置库" if in_lib else "特征词"
-                    s_logs.append(f"┣ [Shield] 探测到首部制作组({source}): {candidate}")
+                    emit(s_logs, "┣ [Shield] 探测到首部制作组({}): {}", source, candidate)
                     # 从标题中切除该块
                     processed_title = processed_title[first_block_match.end():].strip()
                     # 清理可能残留在开头的空格或星号碎屑
@@ -298,7 +318,7 @@ def core_recognize(
         if leading_noise:
             noise_text = leading_noise.group(0)
             processed_title = processed_title[len(noise_text):].strip()
-            s_logs.append(f"┣ [Shield] 自动剔除首部噪声块: {noise_text}")
+            emit(s_logs, "┣ [Shield] 自动剔除首部噪声块: {}", noise_text)
 
     # 提取并抹除技术规格
     from .constants import SUBTITLE_RE, ALIAS_RE
@@ -309,8 +329,8 @@ def core_recognize(
         (SOURCE_RE, TagExtractor.extract_source, "resource_type"),
         (DYNAMIC_RANGE_RE, TagExtractor.extract_dynamic_range, "video_effect"),
         (PLATFORM_RE, TagExtractor.extract_platform, "resource_platform"),
-        (SUBTITLE_RE, None, None), 
-        (ALIAS_RE, None, None), # [New] 屏蔽别名/检索用等元描述
+        (SUBTITLE_RE, None, "subtitle"), 
+        (ALIAS_RE, None, "alias"), # [New] 屏蔽别名/检索用等元描述
     ]
     for pattern, extractor_func, attr_name in shield_patterns:
         # [Fix] 统一采用 re.sub 进行正则屏蔽，确保复杂正则逻辑能够正确执行
@@ -321,7 +341,11 @@ def core_recognize(
                 s_logs.extend(logs)
         
         # 执行屏蔽：连带括号内容一起替换为空格
-        processed_title = re.sub(pattern, " ", processed_title)
+        # [Fix] 经由 RegexGuard 执行，病态长文件名触发超时时跳过该屏蔽而不是卡死
+        try:
+            processed_title = RegexGuard.sub(pattern, " ", processed_title, f"kernel.shield.{attr_name}")
+        except TimeoutError:
+            emit(s_logs, "┣ ⚠️ [Shield] 规格屏蔽正则执行超时，已跳过: {}", attr_name)
         # 合并由于屏蔽产生的连续空格
         processed_title = re.sub(r"\s+", " ", processed_title)
     
@@ -338,17 +362,13 @@ def core_recognize(
         try:
             match = re.search(np, processed_title)
             if match:
-                s_logs.append(f"┣ [Shield] 清除{label}: {match.group(0)}")
+                emit(s_logs, "┣ [Shield] 清除{}: {}", label, match.group(0))
                 processed_title = re.sub(np, " ", processed_title)
         except: continue
     
-    for nw in NOISE_WORDS:
-        try:
-            match = re.search(nw, processed_title, flags=re.I)
-            if match:
-                s_logs.append(f"┣ [Shield] 清除干扰词: {match.group(0)}")
-                processed_title = re.sub(nw, " ", processed_title, flags=re.I)
-        except: continue
+    processed_title, noise_hits = NoiseMatcher.strip(processed_title)
+    for _, spans in noise_hits:
+        emit(s_logs, "┣ [Shield] 清除干扰词: {}", spans[0])
     
     # [Optimize] 递归清理：合并空格并处理由于剥离产生的孤儿括号
     processed_title = re.sub(r"\s+", " ", processed_title)
@@ -360,7 +380,11 @@ def core_recognize(
     
     for _ in range(3): 
         processed_title = re.sub(shell_pattern, " ", processed_title)
-        processed_title = re.sub(orphan_pattern, " ", processed_title)
+        try:
+            processed_title = RegexGuard.sub(orphan_pattern, " ", processed_title, "kernel.orphan_bracket")
+        except TimeoutError:
+            emit(s_logs, "┣ ⚠️ [Shield] 孤儿括号清理正则执行超时，已跳过")
+            break
         processed_title = re.sub(r"\s+", " ", processed_title).strip()
 
     processed_title = processed_title.strip()
@@ -373,36 +397,41 @@ def core_recognize(
     s_logs.extend(sub_logs)
     
     # [NEW] 输出 STEP 2.5 屏蔽后的最终结果
-    s_logs.append(f"清洗后结果: {processed_title}")
+    if verbose: emit(s_logs, "清洗后结果: {}", processed_title)
     
     if s_logs: logger_stub.debug_out("STEP 2.5: 规格提取与规范化预处理", s_logs)
 
     # --- STEP 3: 内核解析 ---
-    current_logs.append(f"┃")
+    steps.next("step3_anitopy")
+    emit(current_logs, "┃")
     
     # [Fix] 在进入内核前再次清理末尾的残留符号 (如 - . _) 防止 Anitopy 卡死
     processed_title = re.sub(r"[\s\-\._]+$", "", processed_title)
-    current_logs.append(f"┣ [DEBUG] 内核前终极清洗: {processed_title}")
+    if verbose:
+        emit(current_logs, "┣ [DEBUG] 内核前终极清洗: {}", processed_title)
     
     safe_title = str(processed_title).strip()
-    current_logs.append(f"┃ [DEBUG][STEP 3]: 调用 Anitopy 语义内核")
+    steps.set_attribute("query", safe_title)
+    emit(current_logs, "┃ [DEBUG][STEP 3]: 调用 Anitopy 语义内核")
     info_dict = {}
     try:
         if safe_title: info_dict = AnitopyWrapper.parse(processed_title) or {}
         else:
-            current_logs.append(f"┣ ⚠️ 标题经预处理后为空，跳过内核解析")
+            emit(current_logs, "┣ ⚠️ 标题经预处理后为空，跳过内核解析")
             info_dict = {}
-        ignore_keys = ["file_name", "file_extension", "file_type"]
-        found_any = False
-        for k, v in info_dict.items():
-            if v is not None and k not in ignore_keys:
-                val_str = ", ".join([str(i) for i in v]) if isinstance(v, list) else str(v)
-                current_logs.append(f"┣ [RAW] {k}: {val_str}")
-                found_any = True
-        if not found_any: current_logs.append(f"┣ ⚠️ 内核未发现任何语义属性")
-        current_logs.append(f"┗ ✅ 内核解析完成")
-    except Exception as e: current_logs.append(f"┗ ❌ 内核解析异常: {str(e)}")
+        if verbose:
+            ignore_keys = ["file_name", "file_extension", "file_type"]
+            found_any = False
+            for k, v in info_dict.items():
+                if v is not None and k not in ignore_keys:
+                    val_str = ", ".join([str(i) for i in v]) if isinstance(v, list) else str(v)
+                    emit(current_logs, "┣ [RAW] {}: {}", k, val_str)
+                    found_any = True
+            if not found_any: emit(current_logs, "┣ ⚠️ 内核未发现任何语义属性")
+            emit(current_logs, "┗ ✅ 内核解析完成")
+    except Exception as e: emit(current_logs, "┗ ❌ 内核解析异常: {}", str(e))
 
     # --- STEP 4-7: 后处理与精炼 ---
-    PostProcessor.process(meta_obj, info_dict, input_name, processed_title, current_logs, custom_groups, logger_stub, batch_enhancement=batch_enhancement, fingerprint_data=fingerprint_data)
+    steps.close()
+    PostProcessor.process(meta_obj, info_dict, input_name, processed_title, current_logs, custom_groups, logger_stub, batch_enhancement=batch_enhancement, fingerprint_data=fingerprint_data, steps=steps)
     return meta_obj
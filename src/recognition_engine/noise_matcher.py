@@ -0,0 +1,33 @@
+import regex as re
+from typing import List, Tuple
+from .constants import NOISE_WORDS
+
+class NoiseMatcher:
+    """
+    NOISE_WORDS 干扰词剥离器 (预清洗 / 内核 STEP 2.5 / 残差提纯共用)
+    - 所有干扰词正则在模块加载时一次性编译
+    - 合并后的总闸正则只扫描一遍标题：未命中任何干扰词时直接返回
+    - 命中时按 NOISE_WORDS 顺序逐条剥离，保证与逐条 search + sub 的结果完全一致
+      (前一条剥离出的空格会为后一条制造新的 \\b 边界，例如 HEVC10bitV2 中的 V2，
+       因此不能用一次合并替换代替)
+    """
+    PATTERNS = tuple(re.compile(nw, flags=re.I) for nw in NOISE_WORDS)
+    # 全局已开启 IGNORECASE，去掉各条内嵌的 (?i) 后再合并，避免行内全局标志出现在表达式中段
+    ANY_RE = re.compile("|".join(f"(?:{nw.replace('(?i)', '')})" for nw in NOISE_WORDS), flags=re.I)
+
+    @staticmethod
+    def strip(text: str, repl: str = " ") -> Tuple[str, List[Tuple[str, List[str]]]]:
+        """
+        剥离全部干扰词。
+        返回 (处理后文本, 命中记录)，命中记录按 NOISE_WORDS 顺序排列，
+        每项为 (干扰词正则, [该正则依次命中的原文片段])。
+        """
+        hits = []
+        if not text or not NoiseMatcher.ANY_RE.search(text):
+            return text, hits
+
+        for pat in NoiseMatcher.PATTERNS:
+            spans = []
+            text = pat.sub(lambda m: spans.append(m.group(0)) or repl, text)
+            if spans: hits.append((pat.pattern, spans))
+        return text, hits
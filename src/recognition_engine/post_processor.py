@@ -1,9 +1,11 @@
 import regex as re
 from typing import List, Optional, Any
 from .constants import MediaType, PLATFORM_RE
+from .audit_log import audit_enabled, emit, new_log
 from .data_models import MetaBase
 from .tag_extractor import TagExtractor
 from .title_cleaner import TitleCleaner
+from .tracing import StepSpans
 
 def to_str(val: Any) -> Optional[str]:
     if not val: return None
@@ -11,7 +13,7 @@ def to_str(val: Any) -> Optional[str]:
 
 class PostProcessor:
     @staticmethod
-    def process(meta_obj: MetaBase, info_dict: dict, input_name: str, processed_title: str, current_logs: List[str], custom_groups: List[str], logger_stub: Any, batch_enhancement: bool = False, fingerprint_data: dict = None):
+    def process(meta_obj: MetaBase, info_dict: dict, input_name: str, processed_title: str, current_logs: List[str], custom_groups: List[str], logger_stub: Any, batch_enhancement: bool = False, fingerprint_data: dict = None, steps: Optional[StepSpans] = None):
         """
         Handles Steps 4 to 7 of the recognition process:
         - Conflict Resolution
@@ -20,9 +22,13 @@ class PostProcessor:
         - Final Type Determination
         """
         if info_dict is None: info_dict = {}
+        verbose = audit_enabled(current_logs)
+        # 由 core_recognize 传入时，异常路径上的收尾由调用方负责
+        if steps is None: steps = StepSpans("kernel")
         # --- STEP 4: 属性冲突校验 ---
-        current_logs.append(f"┃")
-        v_logs = []
+        steps.next("step4_conflict")
+        emit(current_logs, "┃")
+        v_logs = new_log(verbose)
         meta_obj.is_batch = False
         meta_obj.end_episode = None
 
@@ -31,7 +37,7 @@ class PostProcessor:
         if not meta_obj.begin_episode:
             raw_ep = info_dict.get("episode_number")
             # [Debug] 记录关键变量状态
-            v_logs.append(f"[Debug] raw_ep={raw_ep}, type={type(raw_ep).__name__ if raw_ep is not None else 'None'}")
+            emit(v_logs, "[Debug] raw_ep={}, type={}", raw_ep, type(raw_ep).__name__ if raw_ep is not None else 'None')
             
             if isinstance(raw_ep, list): 
                 # Anitopy 识别到了多个数字，执行安全检查
@@ -49,7 +55,7 @@ class PostProcessor:
                                 meta_obj.begin_episode = s
                                 meta_obj.end_episode = e
                                 meta_obj.is_batch = True
-                                v_logs.append(f"命中合集校验: E{s}-E{e}")
+                                emit(v_logs, "命中合集校验: E{}-E{}", s, e)
                     except: pass
                 if not meta_obj.is_batch:
                     raw_ep = raw_ep[0]
@@ -68,7 +74,7 @@ class PostProcessor:
             if ep_match:
                 rescued_ep = int(ep_match.group(1))
                 meta_obj.begin_episode = rescued_ep
-                v_logs.append(f"┣ [纠偏] 从误判组名 '{rg}' 中回捞集数: E{rescued_ep}")
+                emit(v_logs, "┣ [纠偏] 从误判组名 '{}' 中回捞集数: E{}", rg, rescued_ep)
 
         if not meta_obj.begin_episode:
             val, debug4_fallback = TagExtractor.extract_episode(processed_title, processed_title)
@@ -77,7 +83,7 @@ class PostProcessor:
 
         if not meta_obj.begin_season and info_dict.get("anime_season"):
             meta_obj.begin_season = int(info_dict.get("anime_season")[0] if isinstance(info_dict.get("anime_season"), list) else info_dict.get("anime_season"))
-            v_logs.append(f"同步内核发现的季号: S{meta_obj.begin_season}")
+            emit(v_logs, "同步内核发现的季号: S{}", meta_obj.begin_season)
         
         # Call logger_stub only if it has the method
         if hasattr(logger_stub, "debug_out"):
@@ -95,20 +101,21 @@ class PostProcessor:
                  meta_obj.begin_episode = s
                  meta_obj.end_episode = e
                  current_logs.extend(b_logs)
-                 current_logs.append(f"┣ [BatchHelper] 增强模式覆盖生效: E{s}-E{e}")
+                 emit(current_logs, "┣ [BatchHelper] 增强模式覆盖生效: E{}-E{}", s, e)
                  # Override Type to TV if it was MOVIE
                  if meta_obj.type == MediaType.MOVIE:
                      meta_obj.type = MediaType.TV
                      if not meta_obj.begin_season: meta_obj.begin_season = 1
 
         # --- STEP 5: 标题剥离提纯 ---
-        current_logs.append(f"┃")
+        steps.next("step5_title")
+        emit(current_logs, "┃")
         
         if fingerprint_data:
             meta_obj.cn_name = fingerprint_data.get("title")
             meta_obj.en_name = fingerprint_data.get("original_name") or fingerprint_data.get("original_title")
-            current_logs.append(f"┃ [DEBUG][STEP 5]: 记忆命中，跳过标题拆分")
-            current_logs.append(f"┣ [Fingerprint] 锁定标题: {meta_obj.cn_name}")
+            emit(current_logs, "┃ [DEBUG][STEP 5]: 记忆命中，跳过标题拆分")
+            emit(current_logs, "┣ [Fingerprint] 锁定标题: {}", meta_obj.cn_name)
         else:
             raw_name = info_dict.get("anime_title") or processed_title.split('.')[0]
             
@@ -116,7 +123,7 @@ class PostProcessor:
             is_invalid_title = len(clean_check) < 2
             
             if meta_obj.resource_team and meta_obj.resource_team in raw_name:
-                current_logs.append(f"┣ [清洗] 从标题中剔除已识别制作组: {meta_obj.resource_team}")
+                emit(current_logs, "┣ [清洗] 从标题中剔除已识别制作组: {}", meta_obj.resource_team)
                 raw_name = raw_name.replace(meta_obj.resource_team, " ")
             
             if custom_groups:
@@ -143,7 +150,7 @@ class PostProcessor:
                         match = re.search(pattern, raw_name)
                         if match:
                             full_match = match.group(0)
-                            current_logs.append(f"┣ [清洗] 从剧名中强制剔除制作组及其关联块: {full_match.strip()}")
+                            emit(current_logs, "┣ [清洗] 从剧名中强制剔除制作组及其关联块: {}", full_match.strip())
                             raw_name = raw_name.replace(full_match, " ")
                             matched = True
                             # 继续循环，可能剧名里还粘着其他组名（虽然少见）
@@ -174,7 +181,7 @@ class PostProcessor:
                     is_group_credible = True
 
             if is_invalid_title or is_tech_garbage or is_suspicious:
-                current_logs.append(f"┣ [警告] 内核提取标题 '{raw_name}' 判定为不可信，启动深度回捞")
+                emit(current_logs, "┣ [警告] 内核提取标题 '{}' 判定为不可信，启动深度回捞", raw_name)
                 brackets = re.findall(r'[\[【](.+?)[\]】]', processed_title)
                 potential_titles = []
                 
@@ -214,22 +221,22 @@ class PostProcessor:
                 
                 if potential_titles:
                     raw_name = potential_titles[0]
-                    current_logs.append(f"┣ [修正] 成功回捞到标题: {raw_name}")
+                    emit(current_logs, "┣ [修正] 成功回捞到标题: {}", raw_name)
             
             # [Fix] 获取 Release Version 并传入清洗器
             rel_ver = info_dict.get("release_version")
-            residual_title, debug5_clean = TitleCleaner.residual_clean(raw_name, meta_obj.year, meta_obj.begin_episode, version=rel_ver)
-            cn_simp, cn_orig, en, debug5_dual = TitleCleaner.extract_dual_title(residual_title, split_mode=batch_enhancement)
+            residual_title, debug5_clean = TitleCleaner.residual_clean(raw_name, meta_obj.year, meta_obj.begin_episode, version=rel_ver, verbose=verbose, lazy=True)
+            cn_simp, cn_orig, en, debug5_dual = TitleCleaner.extract_dual_title(residual_title, split_mode=batch_enhancement, verbose=verbose, lazy=True)
             meta_obj.cn_name, meta_obj.original_cn_name, meta_obj.en_name = cn_simp, cn_orig, en
             
             # [AI] 如果正则没分出英文名，尝试使用 AI 提取的原名
             if not meta_obj.en_name and info_dict.get("temp_original_title"):
                 meta_obj.en_name = info_dict.get("temp_original_title")
-                debug5_dual.append(f"[AI] 补充原名: {meta_obj.en_name}")
+                emit(debug5_dual, "[AI] 补充原名: {}", meta_obj.en_name)
 
             if not meta_obj.cn_name and not meta_obj.en_name: 
                 meta_obj.en_name = residual_title
-                debug5_dual.append(f"[Fix] 保持原始残差标题: {residual_title}")
+                emit(debug5_dual, "[Fix] 保持原始残差标题: {}", residual_title)
 
             if hasattr(logger_stub, "debug_out"):
                 logger_stub.debug_out("STEP 5: 标题残差剥离与拆分", debug5_clean + debug5_dual)
@@ -237,65 +244,46 @@ class PostProcessor:
                 current_logs.extend(debug5_clean + debug5_dual)
 
         # --- STEP 6: 规格属性全量同步 ---
-        current_logs.append(f"┃")
-        debug6 = []
+        steps.next("step6_specs")
+        emit(current_logs, "┃")
+        debug6 = new_log(verbose)
         
         # [Strategy] 优先策略：匹配制作组库（内置 + 自定义）
         matched_from_lib = False
         
         # [Fix] 如果 STEP 2.5 已经识别到制作组（包括联合制作组），跳过此步骤
         if meta_obj.resource_team:
-            debug6.append(f"┣ [制作组] 继承自预处理: {meta_obj.resource_team}")
+            emit(debug6, "┣ [制作组] 继承自预处理: {}", meta_obj.resource_team)
         else:
             from .builtin_group_loader import BuiltinGroupLoader
-            from .constants import NOT_GROUPS
-            import zhconv
             
             # 合并内置制作组和自定义制作组
             builtin_groups = BuiltinGroupLoader.get_builtin_groups()
-            all_groups = set(builtin_groups)
+            cleaned_custom_groups = BuiltinGroupLoader.clean_custom_groups(custom_groups)
             
-            # 添加自定义制作组
-            if custom_groups:
-                for g in custom_groups:
-                    g_clean = re.sub(r"^\[(?:REMOTE|私有|社区|内置)\]", "", g).strip()
-                    if g_clean and len(g_clean) >= 2:
-                        all_groups.add(g_clean)
-            
-            # 排序：长词优先匹配，防止短词拦截长词
-            sorted_groups = sorted(all_groups, key=len, reverse=True)
-            
-            for g in sorted_groups:
-                # [Crucial] 平台词与技术规格排他性检查
-                if re.search(PLATFORM_RE, g) or re.search(rf"(?i)^({NOT_GROUPS})$", g):
+            # 排序：长词优先匹配，防止短词拦截长词 (顺序、排他检查与简繁边界正则均已预计算)
+            folded_input, folded_title = input_name.casefold(), processed_title.casefold()
+            for g, group_pattern, needles in BuiltinGroupLoader.match_order(cleaned_custom_groups):
+                # [Optimize] casefold 子串预筛：原始/简体/繁体三个版本都不出现时不可能命中边界正则
+                if not any(n in folded_input or n in folded_title for n in needles):
                     continue
                 
-                # 转换为简体和繁体
-                g_simp = zhconv.convert(g, "zh-hans")
-                g_trad = zhconv.convert(g, "zh-hant")
-                
-                # [Upgrade] 严格边界匹配逻辑：
-                # 同时支持原始、简体、繁体三个版本的匹配，并应用 CJK 边界保护
-                p_esc, s_esc, t_esc = re.escape(g), re.escape(g_simp), re.escape(g_trad)
-                boundary_chars = r"a-zA-Z0-9\u4e00-\u9fa5\u3040-\u309f\u30a0-\u30ff"
-                group_pattern = rf"(?i)(?<![{boundary_chars}])({p_esc}|{s_esc}|{t_esc})(?![{boundary_chars}])"
-                
                 # [Fix] 同时匹配原始名和预处理名
-                if re.search(group_pattern, input_name) or re.search(group_pattern, processed_title):
+                if group_pattern.search(input_name) or group_pattern.search(processed_title):
                     meta_obj.resource_team = g
                     
                     # 判断来源
                     source = "内置库" if g in builtin_groups else "自定义库"
-                    debug6.append(f"┣ [制作组] 匹配{source}: {g}")
+                    emit(debug6, "┣ [制作组] 匹配{}: {}", source, g)
                     matched_from_lib = True
                     break
             
             if not matched_from_lib:
-                debug6.append(f"┣ [制作组] 未匹配到制作组库")
+                emit(debug6, "┣ [制作组] 未匹配到制作组库")
         
         # [Sync] 来源同步
         if meta_obj.resource_type:
-            debug6.append(f"┣ [介质来源] 继承自预处理: {meta_obj.resource_type}")
+            emit(debug6, "┣ [介质来源] 继承自预处理: {}", meta_obj.resource_type)
         else:
             source_val, d6_s = TagExtractor.extract_source(input_name)
             if source_val:
@@ -303,11 +291,11 @@ class PostProcessor:
                 debug6.extend(d6_s)
             else:
                 meta_obj.resource_type = to_str(info_dict.get("source"))
-                if meta_obj.resource_type: debug6.append(f"┣ [介质来源] 同步自内核: {meta_obj.resource_type}")
+                if meta_obj.resource_type: emit(debug6, "┣ [介质来源] 同步自内核: {}", meta_obj.resource_type)
 
         # [Sync] 分辨率同步
         if meta_obj.resource_pix:
-            debug6.append(f"┣ [分辨率] 继承自预处理: {meta_obj.resource_pix}")
+            emit(debug6, "┣ [分辨率] 继承自预处理: {}", meta_obj.resource_pix)
         else:
             res_val, d6_r = TagExtractor.extract_resolution(input_name)
             if res_val:
@@ -315,11 +303,11 @@ class PostProcessor:
                 debug6.extend(d6_r)
             else:
                 meta_obj.resource_pix = to_str(info_dict.get("video_resolution"))
-                if meta_obj.resource_pix: debug6.append(f"┣ [分辨率] 同步自内核: {meta_obj.resource_pix}")
+                if meta_obj.resource_pix: emit(debug6, "┣ [分辨率] 同步自内核: {}", meta_obj.resource_pix)
         
         # [Sync] 视频编码同步
         if meta_obj.video_encode:
-            debug6.append(f"┣ [视频编码] 继承自预处理: {meta_obj.video_encode}")
+            emit(debug6, "┣ [视频编码] 继承自预处理: {}", meta_obj.video_encode)
         else:
             v_code, d6_v = TagExtractor.extract_video_encode(input_name)
             if v_code:
@@ -327,11 +315,11 @@ class PostProcessor:
                 debug6.extend(d6_v)
             else:
                 meta_obj.video_encode = to_str(info_dict.get("video_term") or info_dict.get("video_codec"))
-                if meta_obj.video_encode: debug6.append(f"┣ [视频编码] 同步自内核: {meta_obj.video_encode}")
+                if meta_obj.video_encode: emit(debug6, "┣ [视频编码] 同步自内核: {}", meta_obj.video_encode)
 
         # [Sync] 音频编码同步
         if meta_obj.audio_encode:
-            debug6.append(f"┣ [音频编码] 继承自预处理: {meta_obj.audio_encode}")
+            emit(debug6, "┣ [音频编码] 继承自预处理: {}", meta_obj.audio_encode)
         else:
             a_code, d6_a = TagExtractor.extract_audio_encode(input_name)
             if a_code:
@@ -339,24 +327,24 @@ class PostProcessor:
                 debug6.extend(d6_a)
             else:
                 meta_obj.audio_encode = to_str(info_dict.get("audio_term") or info_dict.get("audio_codec"))
-                if meta_obj.audio_encode: debug6.append(f"┣ [音频编码] 同步自内核: {meta_obj.audio_encode}")
+                if meta_obj.audio_encode: emit(debug6, "┣ [音频编码] 同步自内核: {}", meta_obj.audio_encode)
         
         # [Sync] 动态范围与字幕
         if meta_obj.video_effect:
-            debug6.append(f"┣ [视频特效] 继承自预处理: {meta_obj.video_effect}")
+            emit(debug6, "┣ [视频特效] 继承自预处理: {}", meta_obj.video_effect)
         else:
             meta_obj.video_effect, d6_e = TagExtractor.extract_dynamic_range(input_name)
             if d6_e: debug6.extend(d6_e)
 
         if meta_obj.subtitle_lang:
-            debug6.append(f"┣ [字幕语言] 继承自预处理: {meta_obj.subtitle_lang}")
+            emit(debug6, "┣ [字幕语言] 继承自预处理: {}", meta_obj.subtitle_lang)
         else:
             meta_obj.subtitle_lang, d6_sub = TagExtractor.extract_subtitle_lang(input_name)
             if d6_sub: debug6.extend(d6_sub)
 
         # [Sync] 发布平台同步
         if meta_obj.resource_platform:
-            debug6.append(f"┣ [发布平台] 继承自预处理: {meta_obj.resource_platform}")
+            emit(debug6, "┣ [发布平台] 继承自预处理: {}", meta_obj.resource_platform)
         else:
             platform_val, d6_plat = TagExtractor.extract_platform(input_name)
             if platform_val:
@@ -367,7 +355,7 @@ class PostProcessor:
         from .constants import NOT_GROUPS
         if meta_obj.resource_team:
             if re.search(f"(?i)^({NOT_GROUPS})$", meta_obj.resource_team.strip()):
-                debug6.append(f"┣ [Team-Check] 最终拦截：发现组名非法({meta_obj.resource_team})，执行静默清除")
+                emit(debug6, "┣ [Team-Check] 最终拦截：发现组名非法({})，执行静默清除", meta_obj.resource_team)
                 meta_obj.resource_team = None
 
         if hasattr(logger_stub, "debug_out"):
@@ -376,19 +364,20 @@ class PostProcessor:
             current_logs.extend(debug6)
 
         # --- STEP 7: 最终判定 ---
-        current_logs.append(f"┃")
-        current_logs.append(f"┃ [DEBUG][STEP 7]: 类型判定")
+        steps.next("step7_type")
+        emit(current_logs, "┃")
+        emit(current_logs, "┃ [DEBUG][STEP 7]: 类型判定")
         
-        current_logs.append(f"┣ [类型判定] 当前状态: 季号={meta_obj.begin_season}, 集数={meta_obj.begin_episode}, 类型={meta_obj.type.value.upper()}")
+        emit(current_logs, "┣ [类型判定] 当前状态: 季号={}, 集数={}, 类型={}", meta_obj.begin_season, meta_obj.begin_episode, meta_obj.type.value.upper())
         
         if fingerprint_data and fingerprint_data.get("type"):
             cached_type = fingerprint_data.get("type")
             meta_obj.type = MediaType.MOVIE if cached_type == "movie" else MediaType.TV
-            current_logs.append(f"┣ [类型判定] 智能记忆已命中(type={cached_type})，直接采用记忆类型: {meta_obj.type.value.upper()}")
+            emit(current_logs, "┣ [类型判定] 智能记忆已命中(type={})，直接采用记忆类型: {}", cached_type, meta_obj.type.value.upper())
         elif meta_obj.forced_tmdbid: 
-            current_logs.append(f"┣ [类型判定] 已锁定 TMDB ID，跳过自动类型判断")
+            emit(current_logs, "┣ [类型判定] 已锁定 TMDB ID，跳过自动类型判断")
         elif meta_obj.type == MediaType.AUTO:
-            current_logs.append(f"┣ [类型判定] 类型为 AUTO，将由匹配结果自动确定")
+            emit(current_logs, "┣ [类型判定] 类型为 AUTO，将由匹配结果自动确定")
         else:
             is_forced_movie = False
             
@@ -409,36 +398,38 @@ class PostProcessor:
                     break
             
             if movie_keyword_found:
-                current_logs.append(f"┣ [类型判定] 原始文件名包含电影关键词 '{movie_keyword_found}'，强制判定为 Movie 模式")
+                emit(current_logs, "┣ [类型判定] 原始文件名包含电影关键词 '{}'，强制判定为 Movie 模式", movie_keyword_found)
                 meta_obj.type = MediaType.MOVIE
                 is_forced_movie = True
                 # 清除可能误判的集数
                 if meta_obj.begin_episode:
-                    current_logs.append(f"┣ [类型判定] 清除误判的集数 E{meta_obj.begin_episode}")
+                    emit(current_logs, "┣ [类型判定] 清除误判的集数 E{}", meta_obj.begin_episode)
                     meta_obj.begin_episode = None
                 # [Fix] 清除可能误判的季号 (如 X 被误判为罗马数字 10)
                 if meta_obj.begin_season:
-                    current_logs.append(f"┣ [类型判定] 清除误判的季号 S{meta_obj.begin_season} (电影不应有季号)")
+                    emit(current_logs, "┣ [类型判定] 清除误判的季号 S{} (电影不应有季号)", meta_obj.begin_season)
                     meta_obj.begin_season = None
             # [Fix] 如果集数是一个年份 (如 2019)，则判定为 Movie，并清空集数
             elif meta_obj.begin_episode and isinstance(meta_obj.begin_episode, (int, float)) and meta_obj.begin_episode > 1900:
-                current_logs.append(f"┣ [类型判定] 集数 E{meta_obj.begin_episode} 判定为年份，修正为 Movie 模式")
+                emit(current_logs, "┣ [类型判定] 集数 E{} 判定为年份，修正为 Movie 模式", meta_obj.begin_episode)
                 meta_obj.begin_episode = None
                 meta_obj.type = MediaType.MOVIE
                 is_forced_movie = True
             elif meta_obj.begin_season is not None or meta_obj.begin_episode is not None:
-                current_logs.append(f"┣ [类型判定] 检测到季号/集数 (S{meta_obj.begin_season}/E{meta_obj.begin_episode})，判定为 TV 类型")
+                emit(current_logs, "┣ [类型判定] 检测到季号/集数 (S{}/E{})，判定为 TV 类型", meta_obj.begin_season, meta_obj.begin_episode)
                 meta_obj.type = MediaType.TV
                 if meta_obj.begin_season is None: meta_obj.begin_season = 1
             else: 
-                current_logs.append(f"┣ [类型判定] 未检测到季号/集数，判定为 Movie 类型")
+                emit(current_logs, "┣ [类型判定] 未检测到季号/集数，判定为 Movie 类型")
                 meta_obj.type = MediaType.MOVIE
             
             # [Fix] 如果提取到了季号，且未被强制判定为 Movie，则视为 TV
             if meta_obj.begin_season and not is_forced_movie:
-                current_logs.append(f"┣ [类型判定] 确认季号存在，最终类型: TV")
+                emit(current_logs, "┣ [类型判定] 确认季号存在，最终类型: TV")
                 meta_obj.type = MediaType.TV
             else:
                 if is_forced_movie:
-                    current_logs.append(f"┣ [类型判定] 电影关键词优先级更高，保持 Movie 类型")
-                current_logs.append(f"┣ [类型判定] 最终类型: {meta_obj.type.value.upper()}")
\ No newline at end of file
+                    emit(current_logs, "┣ [类型判定] 电影关键词优先级更高，保持 Movie 类型")
+                emit(current_logs, "┣ [类型判定] 最终类型: {}", meta_obj.type.value.upper())
+
+        steps.close()
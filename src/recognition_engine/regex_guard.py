@@ -0,0 +1,168 @@
+"""
+正则执行守卫
+- 用户规则 (custom_words / special_rules) 与引擎中易回溯的模式 (孤儿括号、字幕块、规格屏蔽) 统一经由 RegexGuard 执行
+- 借助 regex 模块的 timeout 参数限制单次执行时长，超时抛出 TimeoutError，由调用方跳过该规则并写入审计日志
+- 按来源 (custom_words / special_rules / kernel / other) 累计调用次数 / 耗时 / 超时次数 / 单次最大耗时，供 /metrics 输出；
+  标签集合固定，计数只增不减
+- 引擎内置模式 (ENGINE_PATTERNS，代码中的固定 ID) 单独常驻统计，以 pattern 标签输出到 /metrics
+- 另按模式 ID 保留有界 (LRU) 的明细，供 slowest() 排障 (管理端点 /debug/regex)；用户规则的 ID 为规则文本的短哈希，不暴露规则原文
+- 统计句柄 (PatternStats) 在规则编译/加载时经 RegexGuard.stats() 取得一次，ID 与来源随句柄确定；
+  每次执行只更新句柄自身的计数行与所属来源的合计行，热路径不加锁、不哈希
+  (计数不加锁，多线程并发时可能少计个别调用，仅用于观测)
+- 耗时按 TIMING_SAMPLE 抽样计时 (累计秒数为估算值，单次最大值取自抽样)，超时次数不抽样
+
+AM_REGEX_TIMEOUT 为单次执行上限 (秒)，设为 0 关闭超时 (仍然计时)。
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import regex as re
+
+logger = logging.getLogger("recognition_engine.regex_guard")
+
+REGEX_TIMEOUT = float(os.environ.get("AM_REGEX_TIMEOUT", "0.5"))
+
+
+# /metrics 输出的固定来源标签
+SOURCES = ("custom_words", "special_rules", "kernel", "other")
+# 引擎内置的受守卫模式 ID (kernel.py 中的规格屏蔽与孤儿括号清理)，集合固定，可安全作为指标标签
+ENGINE_PATTERNS = tuple(f"kernel.shield.{attr}" for attr in (
+    "resource_pix", "video_encode", "audio_encode", "resource_type", "video_effect", "resource_platform", "subtitle", "alias",
+)) + ("kernel.orphan_bracket",)
+# 按模式 ID 保留的明细条数上限 (LRU)
+MAX_PATTERN_STATS = 512
+# 计时抽样间隔 (2 的幂)：每个模式每 N 次调用计时一次，调用与超时次数仍逐次精确计数
+TIMING_SAMPLE = 8
+_SAMPLE_MASK = TIMING_SAMPLE - 1
+
+
+def source_of(pattern_id: str) -> str:
+    """模式 ID 的来源前缀 (custom_words:xxx / kernel.shield.xxx)，未知前缀归入 other"""
+    source = pattern_id.split(":", 1)[0].split(".", 1)[0]
+    return source if source in SOURCES else "other"
+
+
+# 统计行: [调用次数, 累计秒数, 超时次数, 单次最大秒数]
+# source -> 统计行 (不淘汰，供 /metrics)
+_TOTALS: Dict[str, List[float]] = {source: [0, 0.0, 0, 0.0] for source in SOURCES}
+
+
+class PatternStats:
+    """单个受守卫模式的统计句柄：row 为自身统计行，total 为所属来源的合计行"""
+    __slots__ = ("pattern_id", "source", "row", "total")
+
+    def __init__(self, pattern_id: str):
+        self.pattern_id = pattern_id
+        self.source = source_of(pattern_id)
+        self.row = [0, 0.0, 0, 0.0]
+        self.total = _TOTALS[self.source]
+
+
+class RegexGuard:
+    """带超时与耗时统计的正则执行入口，pattern 可为字符串或已编译对象，pattern_id 可为字符串或 PatternStats"""
+    timeout = REGEX_TIMEOUT if REGEX_TIMEOUT > 0 else None
+    _totals = _TOTALS
+    # 引擎模式 ID -> 句柄 (集合固定，不淘汰，供 /metrics)
+    _engine: Dict[str, PatternStats] = {pid: PatternStats(pid) for pid in ENGINE_PATTERNS}
+    # pattern_id -> 句柄 (LRU，超过 MAX_PATTERN_STATS 淘汰最久未取用的；被淘汰的句柄仍计入来源合计)
+    _stats: "OrderedDict[str, PatternStats]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def rule_id(source: str, rule: str) -> str:
+        """用户规则的模式 ID：来源 + 规则文本的短哈希 (规则原文可能含私有信息，不进入统计与指标)"""
+        return f"{source}:{hashlib.sha1(rule.encode('utf-8')).hexdigest()[:12]}"
+
+    @classmethod
+    def stats(cls, pattern_id: str) -> PatternStats:
+        """取得模式 ID 的统计句柄 (编译/加载规则时调用一次，随编译结果保存)"""
+        handle = cls._engine.get(pattern_id)
+        if handle is not None: return handle
+        with cls._lock:
+            handle = cls._stats.get(pattern_id)
+            if handle is None:
+                handle = cls._stats[pattern_id] = PatternStats(pattern_id)
+                if len(cls._stats) > MAX_PATTERN_STATS: cls._stats.popitem(last=False)
+            else:
+                cls._stats.move_to_end(pattern_id)
+            return handle
+
+    @classmethod
+    def rule_stats(cls, source: str, rule: str) -> PatternStats:
+        """用户规则的统计句柄"""
+        return cls.stats(cls.rule_id(source, rule))
+
+    @classmethod
+    def _run(cls, pattern_id: Any, method: str, pattern: Any, *args, flags: int = 0, **kwargs):
+        stats = pattern_id if pattern_id.__class__ is PatternStats else cls.stats(pattern_id)
+        if pattern.__class__ is str: pattern = re.compile(pattern, flags)
+        func = getattr(pattern, method)
+        row, total = stats.row, stats.total
+        row[0] += 1
+        total[0] += 1
+        try:
+            if row[0] & _SAMPLE_MASK:
+                return func(*args, timeout=cls.timeout, **kwargs)
+            # 抽样计时：耗时按抽样间隔放大计入累计秒数，单次最大值取抽样中的最大者
+            start = time.perf_counter()
+            try:
+                return func(*args, timeout=cls.timeout, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                row[1] += elapsed * TIMING_SAMPLE
+                total[1] += elapsed * TIMING_SAMPLE
+                if elapsed > row[3]: row[3] = elapsed
+                if elapsed > total[3]: total[3] = elapsed
+        except TimeoutError:
+            row[2] += 1
+            total[2] += 1
+            subject = next((a for a in reversed(args) if isinstance(a, str)), "")
+            logger.warning(f"⚠️ [RegexGuard] 正则执行超时 ({cls.timeout}s)，已跳过: {stats.pattern_id} | 输入: {subject[:120]}")
+            raise
+
+    @classmethod
+    def search(cls, pattern: Any, string: str, pattern_id: Any, flags: int = 0):
+        return cls._run(pattern_id, "search", pattern, string, flags=flags)
+
+    @classmethod
+    def sub(cls, pattern: Any, repl: Any, string: str, pattern_id: Any, count: int = 0, flags: int = 0) -> str:
+        return cls._run(pattern_id, "sub", pattern, repl, string, flags=flags, count=count)
+
+    @classmethod
+    def subn(cls, pattern: Any, repl: Any, string: str, pattern_id: Any, count: int = 0, flags: int = 0) -> Tuple[str, int]:
+        return cls._run(pattern_id, "subn", pattern, repl, string, flags=flags, count=count)
+
+    @classmethod
+    def slowest(cls, limit: int = 20, source: str = None) -> List[Tuple[str, int, float, int, float]]:
+        """
+        按累计耗时倒序返回 (pattern_id, 调用次数, 累计秒数, 超时次数, 单次最大秒数)，仅含 LRU 中仍保留的模式。
+        source 非空时只返回该来源的模式 (如 custom_words)。
+        """
+        with cls._lock:
+            handles = list(cls._stats.values())
+        rows = [(h.pattern_id, int(h.row[0]), h.row[1], int(h.row[2]), h.row[3]) for h in handles
+                if source is None or h.source == source]
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[:limit]
+
+    @classmethod
+    def totals(cls) -> List[Tuple[str, int, float, int, float]]:
+        """按来源返回 (source, 调用次数, 累计秒数, 超时次数, 单次最大秒数)，来源集合固定"""
+        return [(source, int(r[0]), r[1], int(r[2]), r[3]) for source, r in cls._totals.items()]
+
+    @classmethod
+    def engine_stats(cls) -> List[Tuple[str, int, float, int, float]]:
+        """按引擎模式 ID 返回 (pattern_id, 调用次数, 累计秒数, 超时次数, 单次最大秒数)，ID 集合固定为 ENGINE_PATTERNS"""
+        return [(pid, int(h.row[0]), h.row[1], int(h.row[2]), h.row[3]) for pid, h in cls._engine.items()]
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            for handle in cls._stats.values(): handle.row[:] = [0, 0.0, 0, 0.0]
+            for handle in cls._engine.values(): handle.row[:] = [0, 0.0, 0, 0.0]
+            for row in cls._totals.values(): row[:] = [0, 0.0, 0, 0.0]
@@ -1,5 +1,7 @@
 import regex as re
 from typing import Optional, Tuple, List, Dict, Any
+from .audit_log import emit, new_log
+from .regex_guard import PatternStats, RegexGuard
 
 class SpecialEpisodeHandler:
     """
@@ -24,6 +26,8 @@ class SpecialEpisodeHandler:
     
     # 外部规则缓存
     _external_rules: List[tuple] = []
+    # 规则正则 -> RegexGuard 统计句柄 (加载时确定，extract 时不再哈希)
+    _rule_stats: Dict[str, PatternStats] = {}
 
     @classmethod
     def load_external_rules(cls, rules: List[str]):
@@ -66,6 +70,7 @@ class SpecialEpisodeHandler:
                 continue
         
         cls._external_rules = parsed
+        cls._rule_stats = {pattern: RegexGuard.rule_stats("special_rules", pattern) for pattern, _, _ in parsed}
 
     @classmethod
     def get_all_rules(cls) -> List[tuple]:
@@ -89,17 +94,24 @@ class SpecialEpisodeHandler:
         return result
 
     @staticmethod
-    def extract(filename: str) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[str], List[str], Dict[str, Any]]:
+    def extract(filename: str, verbose: bool = True) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[str], List[str], Dict[str, Any]]:
         """
         提取标题和集数
         :param filename: 原始文件名
+        :param verbose: False 时日志为 NullLog，不生成审计事件
         :return: (字幕组, 标题, 集数, 集数原文, 日志, 额外元数据)
         """
-        logs = []
+        logs = new_log(verbose)
         extra_meta = {}
         
+        rule_stats = SpecialEpisodeHandler._rule_stats
         for pattern, meta_dict, desc in SpecialEpisodeHandler.get_all_rules():
-            match = re.search(pattern, filename, re.IGNORECASE)
+            stats = rule_stats.get(pattern) or RegexGuard.rule_id("special_rules", pattern)
+            try:
+                match = RegexGuard.search(pattern, filename, stats, flags=re.IGNORECASE)
+            except TimeoutError:
+                emit(logs, "[规则][特权] ⚠️ 规则执行超时，已跳过: {}", desc or pattern)
+                continue
             if match:
                 try:
                     group_name = None
@@ -152,16 +164,16 @@ class SpecialEpisodeHandler:
                     if "type" in extra_meta:
                         rule_desc += f" (类型: {extra_meta['type']})"
                     
-                    logs.append(f"[规则][特权] {rule_desc}命中")
+                    emit(logs, "[规则][特权] {}命中", rule_desc)
                     if group_name:
-                        logs.append(f"┣ 字幕组: {group_name}")
-                    logs.append(f"┣ 标题: {title}")
+                        emit(logs, "┣ 字幕组: {}", group_name)
+                    emit(logs, "┣ 标题: {}", title)
                     if "s" in extra_meta:
-                        logs.append(f"┣ 季数: {extra_meta['s']}")
+                        emit(logs, "┣ 季数: {}", extra_meta['s'])
                     if episode is not None:
-                        logs.append(f"┣ 集数: {episode}")
+                        emit(logs, "┣ 集数: {}", episode)
                     else:
-                        logs.append(f"┣ 集数: 未锁定 (仅标题提取)")
+                        emit(logs, "┣ 集数: 未锁定 (仅标题提取)")
                     
                     return group_name, title, episode, ep_str, logs, extra_meta
                 except (ValueError, IndexError):
@@ -1,7 +1,59 @@
+import os
 import regex as re
-import zhconv
-from typing import Optional, List, Tuple, Dict, Any
-from .constants import NOISE_WORDS, SEASON_PATTERNS, PIX_RE, VIDEO_RE, AUDIO_RE, SOURCE_RE, EFFECT_RE, PLATFORM_RE, DYNAMIC_RANGE_RE
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, List, Tuple, Dict, Any, Sequence
+from .audit_log import emit, new_log, render_logs
+from .constants import SEASON_PATTERNS, PIX_RE, VIDEO_RE, AUDIO_RE, SOURCE_RE, EFFECT_RE, PLATFORM_RE, DYNAMIC_RANGE_RE
+from .noise_matcher import NoiseMatcher
+from .regex_guard import PatternStats, RegexGuard
+
+@dataclass(frozen=True)
+class CustomWordOp:
+    """
+    预编译后的单条自定义识别词。
+    kind: offset(集数偏移) / extract(强制元数据提取) / replace(正则替换) / block(简单屏蔽) / invalid(解析失败)
+    """
+    kind: str
+    word: str
+    source_tag: str
+    pattern: Any = None
+    target: str = ""
+    formula: str = ""
+    meta_items: Tuple[Tuple[str, str, Optional[int], Optional[str]], ...] = ()
+    error: str = ""
+    # RegexGuard 统计句柄，构建时按规则文本确定一次 (执行时不再哈希)
+    stats: Optional[PatternStats] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.stats is None and self.pattern is not None:
+            object.__setattr__(self, "stats", RegexGuard.rule_stats("custom_words", self.word))
+
+    @property
+    def pattern_id(self) -> str:
+        """RegexGuard 统计用的模式 ID"""
+        return self.stats.pattern_id if self.stats is not None else RegexGuard.rule_id("custom_words", self.word)
+
+@lru_cache(maxsize=64)
+def _compile_custom_words(rules: Tuple[str, ...]) -> Tuple[CustomWordOp, ...]:
+    ops = []
+    for rule_line in rules:
+        if not rule_line or rule_line.startswith("#"): continue
+
+        # 判定规则来源
+        is_remote = rule_line.startswith("[REMOTE]")
+        source_tag = "[社区]" if is_remote else "[私有]"
+        actual_line = rule_line[8:] if is_remote else rule_line
+
+        # [New] 支持组合规则 (&&)
+        for word in actual_line.split("&&"):
+            word = word.strip()
+            if not word: continue
+            try:
+                ops.append(TitleCleaner._compile_custom_word(word, source_tag))
+            except Exception as e:
+                ops.append(CustomWordOp("invalid", word, source_tag, error=str(e)))
+    return tuple(ops)
 
 class TitleCleaner:
     @staticmethod
@@ -35,112 +87,144 @@ class TitleCleaner:
             return base_val
 
     @staticmethod
-    def pre_clean(filename: str, custom_words: List[str] = [], force_filename: bool = False) -> Tuple[str, Dict[str, str], List[str]]:
+    def compile_custom_words(custom_words: Sequence[Any]) -> Tuple[CustomWordOp, ...]:
+        """
+        将自定义识别词列表编译为有序的操作序列 (带缓存)。
+        已编译的序列原样返回，可由调用方提前编译后复用。
+        """
+        if not custom_words: return ()
+        if isinstance(custom_words, tuple) and isinstance(custom_words[0], CustomWordOp):
+            return custom_words
+        return _compile_custom_words(tuple(custom_words))
+
+    @staticmethod
+    def _compile_custom_word(word: str, source_tag: str) -> CustomWordOp:
+        """解析单条识别词 (不含 && 组合)，预编译其中的正则"""
+        # 1. 集数偏移定位器
+        if "<>" in word and ">>" in word:
+            locator_part, formula = word.split(">>", 1)
+            start_tag, end_tag = locator_part.split("<>", 1)
+            start_tag, end_tag, formula = start_tag.strip(), end_tag.strip(), formula.strip()
+            pat = rf"({re.escape(start_tag)})\s*(\d+)\s*({re.escape(end_tag)})"
+            return CustomWordOp("offset", word, source_tag, re.compile(pat, flags=re.I), formula=formula)
+
+        # 2. 替换规则: A => B
+        if " => " in word:
+            pattern, target = word.split(" => ", 1)
+            pattern, target = pattern.strip(), target.strip()
+            compiled = re.compile(pattern, flags=re.I)
+
+            # 2.1 强制元数据提取: {[...]}
+            if target.startswith("{["):
+                meta_items = []
+                for item in target[2:-2].split(";"):
+                    if "=" not in item: continue
+                    k, v = item.split("=", 1)
+                    k, v = k.strip().lower(), v.strip()
+                    grp_idx, formula_part = None, None
+                    # 处理公式逻辑: 支持 {[e=\1@+12]} 风格
+                    if k == "e" and "\\" in v and "@" in v:
+                        grp_ref = re.search(r"\\(\d+)", v)
+                        if grp_ref:
+                            grp_idx = int(grp_ref.group(1))
+                            formula_part = v.split("@", 1)[1]
+                    meta_items.append((k, v, grp_idx, formula_part))
+                return CustomWordOp("extract", word, source_tag, compiled, target=target, meta_items=tuple(meta_items))
+
+            # 2.2 普通正则替换
+            return CustomWordOp("replace", word, source_tag, compiled, target=target)
+
+        # 3. 简单屏蔽词
+        return CustomWordOp("block", word, source_tag, re.compile(word, flags=re.I))
+
+    @staticmethod
+    def _apply_custom_words(ops: Tuple[CustomWordOp, ...], temp: str, pure_filename: str, forced_meta: Dict[str, str], debug_logs: List[str]) -> str:
+        """按顺序执行已编译的识别词，每条正则对当前标题只执行一次"""
+        for op in ops:
+            try:
+                kind = op.kind
+                if kind == "invalid":
+                    raise ValueError(op.error)
+
+                pattern, pid = op.pattern, op.stats
+                if kind == "offset":
+                    match = RegexGuard.search(pattern, temp, pid)
+                    if match:
+                        original_num = match.group(2)
+                        new_num = TitleCleaner._calc_episode(original_num, op.formula)
+                        new_str = f"{match.group(1)}{new_num}{match.group(3)}"
+                        temp = temp.replace(match.group(0), new_str)
+                        emit(debug_logs, "[规则]{} 集数偏移: {} -> {}", op.source_tag, original_num, new_num)
+
+                elif kind == "extract":
+                    # [NEW] 路径鲁棒性增强: 标题未命中时尝试以文件名锚定
+                    match = RegexGuard.search(pattern, temp, pid)
+                    if not match and pure_filename:
+                        match = RegexGuard.search(pattern, pure_filename, pid)
+                        if match: emit(debug_logs, "[规则]{} 通过文件名锚定匹配到规则: {}", op.source_tag, pattern.pattern)
+                    if match:
+                        emit(debug_logs, "[规则]{} 命中提取规则: {}", op.source_tag, op.word)
+                        for k, v, grp_idx, formula_part in op.meta_items:
+                            if grp_idx is not None and grp_idx <= len(match.groups()):
+                                v = TitleCleaner._calc_episode(match.group(grp_idx), "@" + formula_part)
+                            forced_meta[k] = v
+
+                elif kind == "replace":
+                    # [Optimization] 防止重复叠加: 如果目标字符串已经包含了 target，且 pattern 只是 target 的一部分，则跳过
+                    if op.target in temp and pattern.pattern in op.target:
+                        if not RegexGuard.search(pattern, temp, pid) and pure_filename and RegexGuard.search(pattern, pure_filename, pid):
+                            emit(debug_logs, "[规则]{} 通过文件名锚定匹配到规则: {}", op.source_tag, pattern.pattern)
+                        continue
+                    try:
+                        new_temp, hits = RegexGuard.subn(pattern, op.target, temp, pid)
+                    except TimeoutError:
+                        raise
+                    except Exception:
+                        # 替换模板异常只会在命中后抛出，先补齐命中审计再交由外层记录
+                        emit(debug_logs, "[规则]{} 执行正则替换: {} -> {}", op.source_tag, pattern.pattern, op.target)
+                        raise
+                    if not hits:
+                        if not (pure_filename and RegexGuard.search(pattern, pure_filename, pid)): continue
+                        emit(debug_logs, "[规则]{} 通过文件名锚定匹配到规则: {}", op.source_tag, pattern.pattern)
+                    emit(debug_logs, "[规则]{} 执行正则替换: {} -> {}", op.source_tag, pattern.pattern, op.target)
+                    temp = new_temp
+
+                else:
+                    new_temp, hits = RegexGuard.subn(pattern, " ", temp, pid)
+                    if hits or RegexGuard.search(pattern, pure_filename, pid):
+                        emit(debug_logs, "[规则]{} 应用自定义识别词: {}", op.source_tag, op.word)
+                        temp = new_temp
+
+            except TimeoutError:
+                emit(debug_logs, "[规则] ⚠️ 规则执行超时，已跳过: {}", op.word)
+            except Exception as e:
+                emit(debug_logs, "[规则] 规则执行异常: {} -> {}", op.word, str(e))
+        return temp
+
+    @staticmethod
+    def pre_clean(filename: str, custom_words: Sequence[Any] = (), force_filename: bool = False, verbose: bool = True, lazy: bool = False) -> Tuple[str, Dict[str, str], List[str]]:
         """
         进入内核前的预处理：执行自定义规则、强制元数据提取、基础噪音消除。
+        custom_words 可以是原始规则列表，也可以是 compile_custom_words 的编译结果。
+        verbose=False 时返回 NullLog，审计事件不会被创建。
+        lazy=True 时日志保留为未渲染的 LogEvent，由调用方 (内核) 统一 render_logs；默认返回字符串列表。
         """
-        import os
-        debug_logs = []
-        debug_logs.append(f"原始文件名: {filename}")
+        debug_logs = new_log(verbose)
+        emit(debug_logs, "原始文件名: {}", filename)
         temp = filename
         
         # [NEW] 单文件模式增强：将路径分隔符替换为下划线，防止干扰分词
         if force_filename:
             if "/" in temp or "\\" in temp:
                 temp = temp.replace("/", "_").replace("\\", "_")
-                debug_logs.append(f"[PreClean] 探测到单文件模式，已对路径分隔符进行脱敏替换")
+                emit(debug_logs, "[PreClean] 探测到单文件模式，已对路径分隔符进行脱敏替换")
         
         pure_filename = os.path.basename(filename)
         forced_meta = {}
 
         if custom_words:
-            for rule_line in custom_words:
-                if not rule_line or rule_line.startswith("#"): continue
-                
-                # 判定规则来源
-                is_remote = rule_line.startswith("[REMOTE]")
-                source_tag = "[社区]" if is_remote else "[私有]"
-                actual_line = rule_line[8:] if is_remote else rule_line
-                
-                # [New] 支持组合规则 (&&)
-                sub_rules = actual_line.split("&&")
-                
-                for word in sub_rules:
-                    word = word.strip()
-                    if not word: continue
-                    
-                    import logging
-                    # 使用 root logger 确保无视级别设置强制输出
-                    # logging.info(f"  [Regex Check] {word[:50]}...") 
-                    
-                    try:
-                        # 1. 集数偏移定位器
-                        if "<>" in word and ">>" in word:
-                            locator_part, formula = word.split(">>", 1)
-                            start_tag, end_tag = locator_part.split("<>", 1)
-                            start_tag, end_tag, formula = start_tag.strip(), end_tag.strip(), formula.strip()
-                            pat = f"({re.escape(start_tag)})\s*(\d+)\s*({re.escape(end_tag)})"
-                            match = re.search(pat, temp, flags=re.I)
-                            if match:
-                                original_num = match.group(2)
-                                new_num = TitleCleaner._calc_episode(original_num, formula)
-                                new_str = f"{match.group(1)}{new_num}{match.group(3)}"
-                                temp = temp.replace(match.group(0), new_str)
-                                debug_logs.append(f"[规则]{source_tag} 集数偏移: {original_num} -> {new_num}")
-                            continue
-
-                        # 2. 替换规则: A => B
-                        if " => " in word:
-                            pattern, target = word.split(" => ", 1)
-                            pattern, target = pattern.strip(), target.strip()
-                            
-                            # [NEW] 路径鲁棒性增强
-                            target_is_matched = bool(re.search(pattern, temp, flags=re.I))
-                            if not target_is_matched and pure_filename:
-                                if re.search(pattern, pure_filename, flags=re.I):
-                                    target_is_matched = True
-                                    debug_logs.append(f"[规则]{source_tag} 通过文件名锚定匹配到规则: {pattern}")
-
-                            if target_is_matched:
-                                # 2.1 强制元数据提取: {[...]}
-                                if target.startswith("{["):
-                                    # ... (保持原样)
-                                    match = re.search(pattern, temp, flags=re.I) or re.search(pattern, pure_filename, flags=re.I)
-                                    if match:
-                                        debug_logs.append(f"[规则]{source_tag} 命中提取规则: {word}")
-                                        inner = target[2:-2]
-                                        for item in inner.split(";"):
-                                            if "=" in item:
-                                                k, v = item.split("=", 1)
-                                                k, v = k.strip().lower(), v.strip()
-                                                # 处理公式逻辑: 支持 {[e=\1@+12]} 风格
-                                                if k == "e" and "\\" in v and "@" in v:
-                                                    grp_ref = re.search(r"\\(\d+)", v)
-                                                    if grp_ref:
-                                                        grp_idx = int(grp_ref.group(1))
-                                                        if grp_idx <= len(match.groups()):
-                                                            base_val = match.group(grp_idx)
-                                                            formula_part = v.split("@", 1)[1]
-                                                            v = TitleCleaner._calc_episode(base_val, "@" + formula_part)
-                                                forced_meta[k] = v
-                                
-                                # 2.2 普通正则替换
-                                else:
-                                    # [Optimization] 防止重复叠加: 如果目标字符串已经包含了 target，且 pattern 只是 target 的一部分，则跳过
-                                    if target in temp and pattern in target:
-                                        pass
-                                    else:
-                                        debug_logs.append(f"[规则]{source_tag} 执行正则替换: {pattern} -> {target}")
-                                        temp = re.sub(pattern, target, temp, flags=re.I)
-                        
-                        # 3. 简单屏蔽词
-                        else:
-                            if re.search(word.strip(), temp, flags=re.I) or re.search(word.strip(), pure_filename, flags=re.I):
-                                debug_logs.append(f"[规则]{source_tag} 应用自定义识别词: {word.strip()}")
-                                temp = re.sub(word.strip(), " ", temp, flags=re.I)
-                                
-                    except Exception as e:
-                        debug_logs.append(f"[规则] 规则执行异常: {word} -> {str(e)}")
+            ops = TitleCleaner.compile_custom_words(custom_words)
+            temp = TitleCleaner._apply_custom_words(ops, temp, pure_filename, forced_meta, debug_logs)
 
         temp = re.sub(r"\[\s*\]|\(\s*\)|\{\s*\}", " ", temp)
         
@@ -149,7 +233,7 @@ class TitleCleaner:
         embedded_meta_match = re.search(r"\{\[(.*?)\]\}", temp)
         if embedded_meta_match:
             meta_str = embedded_meta_match.group(1)
-            debug_logs.append(f"[PreClean] 提取到嵌入式元数据: {meta_str}")
+            emit(debug_logs, "[PreClean] 提取到嵌入式元数据: {}", meta_str)
             for item in meta_str.split(";"):
                 if "=" in item:
                     k, v = item.split("=", 1)
@@ -159,10 +243,9 @@ class TitleCleaner:
 
         # [NEW] 在预处理阶段提前应用通用干扰词清洗，防止干扰内核
         # 比如 "10月新番" 如果不清洗，会被 Anitopy 误认为是标题
-        for nw in NOISE_WORDS:
-            if re.search(nw, temp, flags=re.I):
-                debug_logs.append(f"[规则][内置] 清除干扰词: {nw}")
-                temp = re.sub(nw, " ", temp, flags=re.I)
+        temp, noise_hits = NoiseMatcher.strip(temp)
+        for nw, _ in noise_hits:
+            emit(debug_logs, "[规则][内置] 清除干扰词: {}", nw)
         
         # [NEW] 强制清洗装饰性符号 (★, ☆, ■, ◆, ●, etc.)
         temp = re.sub(r"[★☆■□◆◇●○•]", " ", temp)
@@ -190,14 +273,14 @@ class TitleCleaner:
             temp = re.sub(shell_pattern, " ", temp)
                 
         final_cleaned = re.sub(r"\s+", " ", temp).strip()
-        debug_logs.append(f"清洗后结果: {final_cleaned}")
-        return final_cleaned, forced_meta, debug_logs
+        emit(debug_logs, "清洗后结果: {}", final_cleaned)
+        return final_cleaned, forced_meta, debug_logs if lazy else render_logs(debug_logs)
 
     @staticmethod
-    def residual_clean(raw_title: str, year: str = None, episode: int = None, version: int = None) -> Tuple[str, List[str]]:
-        """[DEBUG] 执行残差剥离提纯"""
+    def residual_clean(raw_title: str, year: str = None, episode: int = None, version: int = None, verbose: bool = True, lazy: bool = False) -> Tuple[str, List[str]]:
+        """[DEBUG] 执行残差剥离提纯 (lazy 同 pre_clean)"""
         temp = raw_title
-        debug_logs = []
+        debug_logs = new_log(verbose)
         
         patterns = [
             (PIX_RE, "分辨率"), (VIDEO_RE, "视频编码"), (AUDIO_RE, "音频编码"),
@@ -211,17 +294,15 @@ class TitleCleaner:
             if matches:
                 for m in matches:
                     val = m if isinstance(m, str) else "".join(m)
-                    debug_logs.append(f"[规则][内置] 识别并剥离 {name}: {val}")
+                    emit(debug_logs, "[规则][内置] 识别并剥离 {}: {}", name, val)
                 temp = re.sub(pat, " ", temp, flags=re.I)
         
-        for nw in NOISE_WORDS:
-            if re.search(nw, temp, flags=re.I):
-                match = re.search(nw, temp, flags=re.I)
-                debug_logs.append(f"[规则][内置] 移除预设干扰词: {match.group(0)}")
-                temp = re.sub(nw, " ", temp, flags=re.I)
+        temp, noise_hits = NoiseMatcher.strip(temp)
+        for _, spans in noise_hits:
+            emit(debug_logs, "[规则][内置] 移除预设干扰词: {}", spans[0])
 
         if year and str(year) in temp:
-            debug_logs.append(f"[清洗] 剥离标题中残留的年份: {year}")
+            emit(debug_logs, "[清洗] 剥离标题中残留的年份: {}", year)
             temp = temp.replace(str(year), " ")
             
         # [New] 版本号清洗增强
@@ -229,7 +310,7 @@ class TitleCleaner:
             # 剥离 V2/V3 等版本号 (支持带空格/连字符的情况)
             ver_pat = rf"(?i)(?:\b|[-_. ])[vV]{version}(?:\b|[-_. ])|(?i)\bver{version}\b"
             if re.search(ver_pat, temp):
-                debug_logs.append(f"[清洗] 剥离标题中残留的版本号: V{version}")
+                emit(debug_logs, "[清洗] 剥离标题中残留的版本号: V{}", version)
                 temp = re.sub(ver_pat, " ", temp)
 
         # [New] 针对你反馈的 "ray MV" 这种常见残骸进行剥离
@@ -237,14 +318,14 @@ class TitleCleaner:
         extra_garbage = r"(?i)\s+(?:ray\s+MV|MV|Web|DL|TV|BD|DVD|Special)\b$"
         if re.search(extra_garbage, temp.strip()):
             match = re.search(extra_garbage, temp.strip())
-            debug_logs.append(f"[清洗] 剥离标题末尾技术残骸: {match.group(0)}")
+            emit(debug_logs, "[清洗] 剥离标题末尾技术残骸: {}", match.group(0))
             temp = re.sub(extra_garbage, " ", temp.strip())
 
         if episode is not None:
             # 增强型集数剥离：支持 E/EP/Episode 等前缀
             ep_pat = rf"(?i)(?:EP|Episode|E|#|第|集|话|話|巻|卷)\s*0*{episode}\b|\b0*{episode}\b"
             if re.search(ep_pat, temp):
-                debug_logs.append(f"[清洗] 剥离标题中残留的集数标志: {episode}")
+                emit(debug_logs, "[清洗] 剥离标题中残留的集数标志: {}", episode)
                 temp = re.sub(ep_pat, " ", temp)
 
         # [修正] 通用集数模式剥离 (防止残留如 '第01话' 即使 episode没传进来)
@@ -258,7 +339,7 @@ class TitleCleaner:
                 # 如果是纯数字，且很短(1-2位)，可能是标题的一部分（如 12岁），跳过
                 if val.isdigit() and len(val) < 3: continue
                 # 如果包含明确的前缀后缀 (第..话)，或者长度适中，视为集数噪音
-                debug_logs.append(f"[清洗] 剥离通用集数模式: {val}")
+                emit(debug_logs, "[清洗] 剥离通用集数模式: {}", val)
                 temp = temp.replace(val, " ")
 
         # [NEW] 残留字幕/质量标签二次清洗
@@ -276,12 +357,12 @@ class TitleCleaner:
         for tag in residual_tags:
             if re.search(tag, temp):
                 temp = re.sub(tag, " ", temp)
-                debug_logs.append(f"[清洗] 剥离残留标签: {tag}")
+                emit(debug_logs, "[清洗] 剥离残留标签: {}", tag)
 
         for sp in SEASON_PATTERNS:
             match = re.search(sp, temp, flags=re.I)
             if match:
-                debug_logs.append(f"[清洗] 剥离标题中残留的季号描述: {match.group(0)}")
+                emit(debug_logs, "[清洗] 剥离标题中残留的季号描述: {}", match.group(0))
                 temp = re.sub(sp, " ", temp, flags=re.I)
         
         # [NEW] 剥离标题末尾的制作组/站点残骸 (例如 -ADE, @ADWeb)
@@ -289,16 +370,22 @@ class TitleCleaner:
         tail_garbage_pat = r"(@[a-zA-Z0-9]+|-([A-Z0-9]{1,3}))$"
         if re.search(tail_garbage_pat, temp.strip()):
             match = re.search(tail_garbage_pat, temp.strip())
-            debug_logs.append(f"[清洗] 剥离标题末尾站点/组标签: {match.group(0)}")
+            emit(debug_logs, "[清洗] 剥离标题末尾站点/组标签: {}", match.group(0))
             temp = re.sub(tail_garbage_pat, " ", temp.strip())
             
         final = re.sub(r"[\[\]\(\)\-\._/]+", " ", temp).strip()
-        return re.sub(r"\s+", " ", final), debug_logs
+        return re.sub(r"\s+", " ", final), debug_logs if lazy else render_logs(debug_logs)
+
+    @staticmethod
+    def extract_dual_title(residual_title: str, split_mode: bool = False, verbose: bool = True, lazy: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
+        """[DEBUG] 执行中英分离 (lazy 同 pre_clean)"""
+        cn_simp, cn_orig, en_name, debug_logs = TitleCleaner._split_dual_title(residual_title, split_mode, verbose)
+        return cn_simp, cn_orig, en_name, debug_logs if lazy else render_logs(debug_logs)
 
     @staticmethod
-    def extract_dual_title(residual_title: str, split_mode: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
-        """[DEBUG] 执行中英分离"""
-        debug_logs = []
+    def _split_dual_title(residual_title: str, split_mode: bool, verbose: bool) -> Tuple[Optional[str], Optional[str], Optional[str], List[Any]]:
+        import zhconv
+        debug_logs = new_log(verbose)
         if not residual_title: return None, None, None, debug_logs
         
         # [Fix] 在大量清理符号前，先尝试探测显式的双语分隔符
@@ -311,7 +398,7 @@ class TitleCleaner:
             if len(p1) >= 2 and len(p2) >= 2:
                 cn_orig = p1
                 cn_simp = zhconv.convert(p1, "zh-hans")
-                debug_logs.append(f"[拆分] 发现显式分隔符 '{sep}', 拆分为: {cn_simp} / {p2}")
+                emit(debug_logs, "[拆分] 发现显式分隔符 '{}', 拆分为: {} / {}", sep, cn_simp, p2)
                 return cn_simp, cn_orig, p2, debug_logs
         elif "_" in residual_title:
             # 探测模式：[CJK]_ [Latin]
@@ -321,14 +408,14 @@ class TitleCleaner:
                 if len(p1) >= 2 and len(p2) >= 2:
                     cn_orig = p1
                     cn_simp = zhconv.convert(p1, "zh-hans")
-                    debug_logs.append(f"[拆分] 发现紧凑型下划线分隔符, 拆分为: {cn_simp} / {p2}")
+                    emit(debug_logs, "[拆分] 发现紧凑型下划线分隔符, 拆分为: {} / {}", cn_simp, p2)
                     return cn_simp, cn_orig, p2, debug_logs
 
         # [Fix] 扩展符号清理，包含东亚括号 【】
         # [Optimize] 增加对开头残留连接符 (如 &) 的清理
         title = re.sub(r"^[&x\+\s\-_/]+", "", residual_title).strip()
         title = re.sub(r"[\[\]\-\._/【】]+", " ", title).strip()
-        debug_logs.append(f"[拆分] 待拆分标题: {title}")
+        emit(debug_logs, "[拆分] 待拆分标题: {}", title)
         
         # 兼容旧逻辑：如果还残留 / (虽然上面的 re.sub 已经基本洗掉了，但保留作为兜底)
         if "/" in title:
@@ -336,7 +423,7 @@ class TitleCleaner:
             p1 = parts[0].strip()
             cn_orig = p1
             cn_simp = zhconv.convert(p1, "zh-hans")
-            debug_logs.append(f"[拆分] 发现分隔符 '/', 拆分为: {cn_simp} / {parts[1].strip()}")
+            emit(debug_logs, "[拆分] 发现分隔符 '/', 拆分为: {} / {}", cn_simp, parts[1].strip())
             return cn_simp, cn_orig, parts[1].strip(), debug_logs
 
         # [Fix] 扩展 CJK 范围：增加平假名(\u3040-\u309f)和片假名(\u30a0-\u30ff)
@@ -370,10 +457,10 @@ class TitleCleaner:
             has_real_cjk = re.search(r"[\u4e00-\u9fa5\u3040-\u309f\u30a0-\u30ff]", cn_simp)
             
             if is_invalid_chars or not has_real_cjk or len(cn_simp) < 1:
-                debug_logs.append(f"[拆分] 丢弃无效/纯符号/无语义中文名: {cn_simp}")
+                emit(debug_logs, "[拆分] 丢弃无效/纯符号/无语义中文名: {}", cn_simp)
                 cn_simp, cn_orig = None, None
 
-        if cn_simp: debug_logs.append(f"[拆分] 提取到中文剧名块: {cn_simp}")
+        if cn_simp: emit(debug_logs, "[拆分] 提取到中文剧名块: {}", cn_simp)
         
         # [Optimization] 允许合并多个英文特征块，提高对复杂标题的覆盖能力
         en_name = " ".join([m.strip() for m in en_match]) if en_match else None
@@ -383,13 +470,13 @@ class TitleCleaner:
             if len(en_name) < 2: en_name = None
             # 2. 如果英文名全大写且很短，很有可能是残留的制作组碎屑
             elif (en_name.isupper() and len(en_name) < 6):
-                debug_logs.append(f"[拆分] 丢弃疑似制作组残骸的英文名: {en_name}")
+                emit(debug_logs, "[拆分] 丢弃疑似制作组残骸的英文名: {}", en_name)
                 en_name = None
             # 3. 如果英文名末尾还残留了 E01/01 这种模式 (可能由 Anitopy 误吞)，再次强制切除
             else:
                 en_name = re.sub(r"(?i)\s+(?:EP|E|S|#)?\d+$", "", en_name).strip()
 
         if en_name and cn_simp and en_name.lower() in cn_simp.lower(): en_name = None
-        if en_name: debug_logs.append(f"[拆分] 提取到英文特征块: {en_name}")
+        if en_name: emit(debug_logs, "[拆分] 提取到英文特征块: {}", en_name)
                 
         return cn_simp, cn_orig, en_name, debug_logs
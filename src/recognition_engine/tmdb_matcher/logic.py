@@ -1,7 +1,6 @@
 import regex as re
 import asyncio
 from typing import List, Optional, Dict, Any, Tuple
-from difflib import SequenceMatcher
 
 class TMDBMatcher:
     """
@@ -83,7 +82,7 @@ class TMDBMatcher:
         return q_list[:3]
 
     @staticmethod
-    def calculate_match_score(item: Dict[str, Any], targets: List[str], cn_name: str, en_name: str, idx: int, anime_priority: bool, is_from_segment: bool = False, target_year: Optional[str] = None) -> Tuple[float, List[str]]:
+    def calculate_match_score(item: Dict[str, Any], targets: List[str], cn_name: str, en_name: str, idx: int, anime_priority: bool, is_from_segment: bool = False, target_year: Optional[str] = None, with_trace: bool = True) -> Tuple[float, List[str]]:
         """
         核心对撞算法：计算候选人分值，并记录详细的对撞轨迹
         
@@ -96,7 +95,9 @@ class TMDBMatcher:
             anime_priority: 是否优先动画
             is_from_segment: 是否来自分词搜索（用于惩罚机制）
             target_year: 目标年份（用于年份打分）
+            with_trace: 是否生成打分追踪文本 (trace / best_match_info / summary)，关闭时三者为空
         """
+        from difflib import SequenceMatcher
         c_name = item.get("title") or item.get("name")
         c_oname = item.get("original_title") or item.get("original_name")
         candidate_titles = []
@@ -130,11 +131,12 @@ class TMDBMatcher:
                 else: 
                     score = sim
                 
-                trace.append(f"┃   │   - [{t_label}] vs '{t}' -> {reason}({score:.1f}分)")
+                if with_trace:
+                    trace.append(f"┃   │   - [{t_label}] vs '{t}' -> {reason}({score:.1f}分)")
                 
                 if score > best_sim:
                     best_sim = score
-                    best_match_info = f"{reason}命中 '{t}'"
+                    if with_trace: best_match_info = f"{reason}命中 '{t}'"
 
         final_score = best_sim
         bonus_log = []
@@ -183,5 +185,5 @@ class TMDBMatcher:
                         bonus_log.append("年份微差(+10)")
                 except: pass
         
-        summary = f"最终分: {final_score:.1f} | {', '.join(bonus_log)}"
+        summary = f"最终分: {final_score:.1f} | {', '.join(bonus_log)}" if with_trace else ""
         return final_score, trace, best_match_info, summary
@@ -0,0 +1,280 @@
+"""
+请求级链路追踪 (OpenTelemetry 兼容)
+- off  (默认): span() 直接返回共享的空操作对象，调用方无需判断开关
+- otel: 委托给 opentelemetry-api 的全局 Tracer，SDK 与 Exporter 由部署方自行配置
+- json: 进程内记录，根 span 结束时把整条链路作为一行 JSON 追加写入 AM_TRACE_FILE，无需采集端
+
+引擎与服务层只依赖本模块的 span / start_span / current_span / traced / StepSpans，
+不直接接触 opentelemetry，未安装时 otel 模式自动回落到 off。
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger("recognition_engine.tracing")
+
+TRACE_MODES = ("off", "otel", "json")
+# json 模式下同时未结束的链路上限，超出时丢弃最早开始的链路 (根 span 迟迟不结束时防止缓冲区无限增长)
+MAX_PENDING_TRACES = 256
+
+
+class _NoopSpan:
+    """关闭追踪时使用的空 span，同时充当上下文管理器"""
+    __slots__ = ()
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): return False
+    def set_attribute(self, key: str, value: Any): pass
+    def set_attributes(self, attributes: Dict[str, Any]): pass
+    def end(self): pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# json 模式下的当前 span (随 asyncio Task 自动传播)
+_CURRENT: ContextVar[Optional["_JsonSpan"]] = ContextVar("am_trace_span", default=None)
+
+
+class _JsonSpan:
+    """json 模式的 span：字段命名与 OTLP 保持一致，便于日后直接导入"""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_time", "_t0", "duration_ms", "status", "_token")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        parent = _CURRENT.get()
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_time = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms = None
+        self.status = "ok"
+        self._token = None
+        if parent is None: Tracing._open(self.trace_id)
+
+    def __enter__(self):
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        if self._token is not None:
+            _CURRENT.reset(self._token)
+            self._token = None
+        self.end()
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def end(self):
+        if self.duration_ms is not None: return
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        Tracing._record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Tracing:
+    """追踪开关与 json 模式的链路缓冲区"""
+    mode = "off"
+    dump_path = "data/traces.jsonl"
+    _tracer = None
+    _pending: Dict[str, List[_JsonSpan]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, mode: Optional[str] = None, dump_path: Optional[str] = None):
+        mode = str(mode or "off").strip().lower()
+        if mode not in TRACE_MODES: mode = "off"
+        if mode == "otel" and otel_trace is None:
+            logger.warning("⚠️ [Tracing] 未安装 opentelemetry-api，追踪已关闭")
+            mode = "off"
+        cls.mode = mode
+        if dump_path: cls.dump_path = dump_path
+        cls._tracer = otel_trace.get_tracer("anime_matcher") if mode == "otel" else None
+        with cls._lock:
+            cls._pending.clear()
+
+    @classmethod
+    def _open(cls, trace_id: str):
+        """根 span 开始时登记链路，只有已登记的链路才收集子 span"""
+        with cls._lock:
+            cls._pending[trace_id] = []
+            while len(cls._pending) > MAX_PENDING_TRACES:
+                del cls._pending[next(iter(cls._pending))]
+
+    @classmethod
+    def _record(cls, span: _JsonSpan):
+        with cls._lock:
+            spans = cls._pending.get(span.trace_id)
+            # 根 span 已结束 (已落盘) 或链路已被淘汰：丢弃，不再作为孤立链路残留
+            if spans is None: return
+            spans.append(span)
+            if span.parent_id is not None: return
+            # 根 span 结束：整条链路落盘
+            del cls._pending[span.trace_id]
+        cls._dump(span, spans)
+
+    @classmethod
+    def _dump(cls, root: _JsonSpan, spans: List[_JsonSpan]):
+        record = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "start_time": root.start_time,
+            "duration_ms": root.duration_ms,
+            "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.start_time)],
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        try:
+            folder = os.path.dirname(cls.dump_path)
+            if folder: os.makedirs(folder, exist_ok=True)
+            with cls._lock, open(cls.dump_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"⚠️ [Tracing] 链路写入失败: {e}")
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """以上下文管理器形式开启 span，并设为当前 span (子调用自动挂到其下)"""
+    mode = Tracing.mode
+    if mode == "off": return NOOP_SPAN
+    if mode == "json": return _JsonSpan(name, attributes)
+    return Tracing._tracer.start_as_current_span(name, attributes=attributes)
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    开启一个需手动 end() 的 span (不改变当前 span)，用于无法包成 with 块的顺序步骤。
+    json 模式下只作为子 span：没有当前 span (预热、进程池工作进程) 时不记录，避免产生孤立链路。
+    """
+    mode = Tracing.mode
+    if mode == "off": return NOOP_SPAN
+    if mode == "json": return _JsonSpan(name, attributes) if _CURRENT.get() is not None else NOOP_SPAN
+    return Tracing._tracer.start_span(name, attributes=attributes)
+
+
+def current_span():
+    """当前 span，未开启追踪时返回空 span，可放心调用 set_attribute"""
+    mode = Tracing.mode
+    if mode == "off": return NOOP_SPAN
+    if mode == "json": return _CURRENT.get() or NOOP_SPAN
+    return otel_trace.get_current_span()
+
+
+def traced(name: str) -> Callable:
+    """函数装饰器：整个调用包在一个 span 中 (仅用于同步函数)"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mode = Tracing.mode
+            # json 模式下同 start_span：不在链路内时不开启新链路
+            if mode == "off" or (mode == "json" and _CURRENT.get() is None): return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StepProfiler:
+    """
+    逐步累计耗时与内存分配峰值 (基准测试用)，通过 StepSpans.profiler 挂载。
+    步骤是顺序执行的，因此可以在每一步开始时重置 tracemalloc 峰值。
+    """
+
+    def __init__(self):
+        # step -> [次数, 累计秒数, 累计分配峰值字节]
+        self.stats: Dict[str, List[float]] = {}
+        self._step = None
+        self._t0 = 0.0
+        self._mem0 = 0
+
+    def start(self, step: str):
+        self._step = step
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        if self._step is None: return
+        elapsed = time.perf_counter() - self._t0
+        peak = tracemalloc.get_traced_memory()[1] - self._mem0 if tracemalloc.is_tracing() else 0
+        row = self.stats.setdefault(self._step, [0, 0.0, 0])
+        row[0] += 1
+        row[1] += elapsed
+        row[2] += peak
+        self._step = None
+
+
+class StepSpans:
+    """
+    顺序步骤追踪：next() 结束上一步并开启下一步，close() 结束最后一步。
+    用于内核 STEP 1~7 这类线性流程，无需为每一步重新缩进代码块。
+    以 with 使用时退出即 close()，某一步抛出异常也会结束其 span 并标记错误。
+    """
+    __slots__ = ("prefix", "_current")
+    # 挂载 StepProfiler 后逐步统计耗时与分配 (与 AM_TRACING 无关)
+    profiler: Optional[StepProfiler] = None
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._current = None
+
+    def next(self, step: str, attributes: Optional[Dict[str, Any]] = None):
+        profiler = StepSpans.profiler
+        if profiler is not None:
+            profiler.stop()
+            profiler.start(f"{self.prefix}.{step}")
+        if self._current is not None: self._current.end()
+        self._current = start_span(f"{self.prefix}.{step}", attributes) if Tracing.mode != "off" else None
+
+    def set_attribute(self, key: str, value: Any):
+        if self._current is not None: self._current.set_attribute(key, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        current = self._current
+        if exc is not None and current is not None:
+            current.set_attribute("error", f"{exc_type.__name__}: {exc}")
+            if isinstance(current, _JsonSpan): current.status = "error"
+        self.close()
+        return False
+
+    def close(self):
+        if StepSpans.profiler is not None: StepSpans.profiler.stop()
+        if self._current is not None:
+            self._current.end()
+            self._current = None
+
+
+Tracing.configure(os.environ.get("AM_TRACING"), os.environ.get("AM_TRACE_FILE"))
@@ -3,6 +3,22 @@ import os
 # 数据库文件路径 (存放在映射的 data 目录下)
 DATABASE_PATH = os.environ.get("AM_DATABASE_PATH", "data/matcher_storage.db")
 
+# SQLite 写锁等待上限 (秒)：存储读写在请求路径上同步执行，多 worker 争用写锁时最多阻塞这么久，
+# 超时即放弃本次缓存读写 (缓存未命中 / 不写入)，不影响识别结果
+STORAGE_BUSY_TIMEOUT = float(os.environ.get("AM_STORAGE_BUSY_TIMEOUT", "0.2"))
+
 # 过期配置
 CACHE_EXPIRY_DAYS = 14
 MEMORY_EXPIRY_DAYS = 90
+
+# 多进程部署: uvicorn worker 数 (python -m recognition_service.main 启动时生效)
+WORKERS = max(1, int(os.environ.get("AM_WORKERS", "1") or 1))
+
+# 上游请求协调 (单飞 + 限流)
+# auto: 多 worker 时经由共享 SQLite 跨进程协调，单 worker 时仅在进程内协调
+UPSTREAM_COORDINATION = os.environ.get("AM_UPSTREAM_COORDINATION", "auto").strip().lower()
+# 跨进程单飞的结果共享窗口 (秒)：窗口内相同请求直接复用领头 worker 的响应
+UPSTREAM_SHARE_TTL = float(os.environ.get("AM_UPSTREAM_SHARE_TTL", "10"))
+# 每秒请求上限 (所有 worker 合计)，0 表示不限
+TMDB_RATE_LIMIT = float(os.environ.get("AM_TMDB_RATE_LIMIT", "0"))
+BANGUMI_RATE_LIMIT = float(os.environ.get("AM_BANGUMI_RATE_LIMIT", "0"))
@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 import os
 import time
 import logging
+from recognition_engine.audit_log import NullLog, normalize_log_level
 
 logger = logging.getLogger("recognition_service.context")
 
@@ -23,6 +24,9 @@ class RecognitionContext:
     - all_noise / all_groups / all_render / all_privilege: 规则列表
     - use_fingerprint: 智能指纹开关
     - batch_enhance: 合集增强
+    - log_level: 审计日志级别 off / summary / full，None 表示未指定
+    - include: 响应中需要返回的可选区块 (raw_meta / tmdb_match / logs)，None 表示全部返回；
+      未包含 logs 时未指定的 log_level 取 off，显式指定 summary / full 则抛出 ValueError
     """
     # === 输入 ===
     filename: str = ""
@@ -40,6 +44,10 @@ class RecognitionContext:
     force_filename: bool = False
     batch_enhance: bool = False
     use_fingerprint: bool = True
+    # 审计日志级别: full 完整审计 / summary 仅里程碑与结论 / off 不生成日志；None 为未指定 (按 full 处理)
+    log_level: Optional[str] = None
+    # 响应裁剪: None 表示返回全部可选区块
+    include: Optional[List[str]] = None
 
     # 方案 B: 扩展参数
     anime_priority: bool = True
@@ -62,6 +70,7 @@ class RecognitionContext:
     logs: List[str] = field(default_factory=list)
     perf_stats: List[str] = field(default_factory=list)
     start_time: float = field(default_factory=time.time)
+    _trace_logs: Any = None
 
     # === 数据提供者 (延迟初始化) ===
     _tmdb_client: Any = None
@@ -76,6 +85,36 @@ class RecognitionContext:
     # with_cloud 控制是否执行云端匹配
     with_cloud: bool = False
 
+    def __post_init__(self):
+        explicit = self.log_level is not None
+        self.log_level = normalize_log_level(self.log_level)
+        if self.include is not None:
+            self.include = [str(x).strip().lower() for x in self.include]
+            # 调用方不需要 logs 时，整条链路都不必生成审计日志
+            if "logs" not in self.include:
+                # [Fix] 显式要求生成日志却又不返回日志是自相矛盾的请求，直接拒绝而不是悄悄改成 off
+                if explicit and self.log_level != "off":
+                    raise ValueError(f"log_level={self.log_level} 需要 include 包含 logs")
+                self.log_level = "off"
+        if self.log_level == "off":
+            self.logs = NullLog()
+        # 细节追踪 (内核 STEP、数据源请求、候选对撞) 仅在 full 级别写入 logs
+        self._trace_logs = self.logs if self.log_level == "full" else NullLog()
+
+    @property
+    def trace_logs(self) -> List[str]:
+        """传给内核与数据源的日志容器，非 full 级别时为 NullLog"""
+        return self._trace_logs
+
+    def wants(self, section: str) -> bool:
+        """调用方是否请求了某个可选响应区块 (raw_meta / tmdb_match / logs)"""
+        return self.include is None or section in self.include
+
+    @property
+    def log_enabled(self) -> bool:
+        """是否需要记录流水线里程碑日志 (summary / full)"""
+        return self.log_level != "off"
+
     @property
     def tmdb_client(self):
         if self._tmdb_client is None:
@@ -144,5 +183,7 @@ class RecognitionContext:
             forced_type=clean_param(req.tmdb_type),
             bangumi_token=clean_param(req.bangumi_token),
             bangumi_proxy=clean_param(req.bangumi_proxy),
+            log_level=getattr(req, "log_level", None),
+            include=getattr(req, "include", None),
         )
         return ctx
@@ -1,18 +1,22 @@
-import httpx
 import asyncio
 import datetime
 import os
 from typing import List, Optional, Dict, Any, Tuple
 from recognition_engine.bgm_matcher.logic import BangumiMatcher
 from recognition_engine.tmdb_matcher.logic import TMDBMatcher
+from recognition_engine.audit_log import audit_enabled
+from recognition_engine.tracing import span
 from ..tmdb.client import TMDBProvider as TMDBClient
+from ...metrics import UPSTREAM_REQUESTS, UPSTREAM_LATENCY
+from ...upstream import UpstreamCoordinator, UpstreamResponse
 
 class BangumiProvider:
     """
     Bangumi 独立数据提供者 (L2)
     已解耦：不依赖外部 ConfigManager 或 MetaCacheManager
     """
-    BASE_URL = "https://api.bgm.tv"
+    # 可通过 BANGUMI_API_BASE 指向本地桩服务 (压测 / 离线基准)
+    BASE_URL = os.environ.get("BANGUMI_API_BASE", "https://api.bgm.tv").rstrip("/")
 
     def __init__(self, token: str = None, proxy: str = None):
         self.token = token or os.environ.get("BANGUMI_TOKEN")
@@ -28,25 +32,42 @@ class BangumiProvider:
             if hasattr(logs, "log"): logs.log(msg)
             elif isinstance(logs, list): logs.append(msg)
 
-        # 日志参数拼接
-        query_str = f"?{'&'.join([f'{k}={v}' for k, v in params.items()])}" if params else ""
-        payload_str = f" | Body: {json}" if json else ""
-        _log(f"┃ [BGM] ☁️ {method} {url}{query_str}{payload_str}")
-        
-        if self.proxy:
-            _log(f"┃ [Proxy] 🛡️ 启用代理加速: {self.proxy}")
-
-        async with httpx.AsyncClient(timeout=15, proxy=self.proxy) as client:
-            try:
-                if method == "GET":
-                    resp = await client.get(url, headers=self._get_headers(), params=params)
-                else:
-                    resp = await client.post(url, headers=self._get_headers(), json=json)
-                
-                if resp.status_code == 200: return resp.json()
-                _log(f"┃   ❌ BGM HTTP {resp.status_code}")
-            except Exception as e:
-                _log(f"┃   ❌ BGM Network Error: {e}")
+        if audit_enabled(logs):
+            # 日志参数拼接
+            query_str = f"?{'&'.join([f'{k}={v}' for k, v in params.items()])}" if params else ""
+            payload_str = f" | Body: {json}" if json else ""
+            _log(f"┃ [BGM] ☁️ {method} {url}{query_str}{payload_str}")
+            
+            if self.proxy:
+                _log(f"┃ [Proxy] 🛡️ 启用代理加速: {self.proxy}")
+
+        async def _request() -> UpstreamResponse:
+            import httpx  # 延迟导入：仅解析本地文件的调用方 (CLI / GUI) 不必加载 httpx
+            async with httpx.AsyncClient(timeout=15, proxy=self.proxy) as client:
+                try:
+                    with UPSTREAM_LATENCY.time("bangumi"):
+                        if method == "GET":
+                            resp = await client.get(url, headers=self._get_headers(), params=params)
+                        else:
+                            resp = await client.post(url, headers=self._get_headers(), json=json)
+                except Exception:
+                    UPSTREAM_REQUESTS.inc("bangumi", "error")
+                    raise
+            UPSTREAM_REQUESTS.inc("bangumi", str(resp.status_code))
+            return UpstreamResponse(resp.status_code, resp.content)
+
+        try:
+            query = (json or {}).get("keyword") or (params or {}).get("keyword") or ""
+            # [Optimize] 经由 UpstreamCoordinator 单飞 + 限流，并发的相同请求 (含多 worker) 只发出一次
+            key = UpstreamCoordinator.make_key("bangumi", method, url, params, json, credential=self.token or "")
+            with span("bangumi.fetch", {"http.method": method, "http.route": url.replace(self.BASE_URL, ""), "query": str(query)}) as sp:
+                resp = await UpstreamCoordinator.call("bangumi", key, _request)
+                sp.set_attribute("http.status_code", resp.status_code)
+            
+            if resp.status_code == 200: return resp.json()
+            _log(f"┃   ❌ BGM HTTP {resp.status_code}")
+        except Exception as e:
+            _log(f"┃   ❌ BGM Network Error: {e}")
         return None
 
     async def get_subject_details(self, subject_id: int, logs: Any = None, include_cast: bool = False) -> Optional[Dict]:
@@ -196,14 +217,15 @@ class BangumiProvider:
             return None
 
         scored_pool.sort(key=lambda x: x["score"], reverse=True)
-        for idx, entry in enumerate(scored_pool[:5]):
-            item = entry["item"]
-            c_name = item.get('title') or item.get('name')
-            c_year = (item.get('release_date') or item.get('first_air_date') or '')[:4]
-            _log(f"┣ [TMDB#{idx+1}] ID:{item['id']} | {c_name} ({c_year})")
-            for t_line in entry["trace"]: _log(t_line)
-            _log(f"┃   ├─ 最终分: {entry['score']:.1f} | 依据: {entry['win_lang']}")
-            _log(f"┃   └─ 构成: {entry['reason']}")
+        if audit_enabled(logs):
+            for idx, entry in enumerate(scored_pool[:5]):
+                item = entry["item"]
+                c_name = item.get('title') or item.get('name')
+                c_year = (item.get('release_date') or item.get('first_air_date') or '')[:4]
+                _log(f"┣ [TMDB#{idx+1}] ID:{item['id']} | {c_name} ({c_year})")
+                for t_line in entry["trace"]: _log(t_line)
+                _log(f"┃   ├─ 最终分: {entry['score']:.1f} | 依据: {entry['win_lang']}")
+                _log(f"┃   └─ 构成: {entry['reason']}")
 
         best = scored_pool[0]
         threshold = 70
@@ -1,16 +1,20 @@
-import httpx
 import asyncio
 import re
 import os
 from typing import List, Optional, Dict, Any, Tuple
 from recognition_engine.tmdb_matcher.logic import TMDBMatcher
+from recognition_engine.audit_log import audit_enabled
+from recognition_engine.tracing import span
 from ...storage_manager import storage
+from ...metrics import UPSTREAM_REQUESTS, UPSTREAM_LATENCY
+from ...upstream import UpstreamCoordinator, UpstreamResponse
 
 class TMDBProvider:
     """
     TMDB 统一数据中心 (L2)
     """
-    BASE_URL = "https://api.themoviedb.org/3"
+    # 可通过 TMDB_API_BASE 指向本地桩服务 (压测 / 离线基准)
+    BASE_URL = os.environ.get("TMDB_API_BASE", "https://api.themoviedb.org/3").rstrip("/")
 
     def __init__(self, api_key: str = None, proxy: str = None):
         # 优先级：构造函数参数 > 环境变量
@@ -43,32 +47,48 @@ class TMDBProvider:
         params["language"] = params.get("language", "zh-CN")
         
         full_url = f"{self.BASE_URL}{endpoint}"
-        # 脱敏日志 URL
-        log_params = {k: ("****" if k == "api_key" else v) for k, v in params.items()}
-        query_str = "&".join([f"{k}={v}" for k, v in log_params.items()])
-        _log(f"┃ [TMDB] ☁️ GET {full_url}?{query_str}")
-        
-        if self.proxy:
-            _log(f"┃ [Proxy] 🛡️ 启用代理加速")
+        if audit_enabled(logs):
+            # 脱敏日志 URL
+            log_params = {k: ("****" if k == "api_key" else v) for k, v in params.items()}
+            query_str = "&".join([f"{k}={v}" for k, v in log_params.items()])
+            _log(f"┃ [TMDB] ☁️ GET {full_url}?{query_str}")
+            
+            if self.proxy:
+                _log(f"┃ [Proxy] 🛡️ 启用代理加速")
 
-        async with httpx.AsyncClient(timeout=15, proxy=self.proxy) as client:
-            try:
-                resp = await client.get(full_url, params=params)
-                if resp.status_code == 200: return resp.json(), True
-                
-                # 记录详细错误信息
-                error_msg = f"┃   ❌ TMDB HTTP {resp.status_code}"
+        async def _request() -> UpstreamResponse:
+            import httpx  # 延迟导入：仅解析本地文件的调用方 (CLI / GUI) 不必加载 httpx
+            async with httpx.AsyncClient(timeout=15, proxy=self.proxy) as client:
                 try:
-                    err_json = resp.json()
-                    if "status_message" in err_json:
-                        error_msg += f" - {err_json['status_message']}"
-                except: pass
-                
-                _log(error_msg)
-                return None, True
-            except Exception as e: 
-                _log(f"┃   ❌ TMDB Network Error: {e} (Proxy: {self.proxy or 'None'})")
-                return None, False
+                    with UPSTREAM_LATENCY.time("tmdb"):
+                        resp = await client.get(full_url, params=params)
+                except Exception:
+                    UPSTREAM_REQUESTS.inc("tmdb", "error")
+                    raise
+            UPSTREAM_REQUESTS.inc("tmdb", str(resp.status_code))
+            return UpstreamResponse(resp.status_code, resp.content)
+
+        try:
+            # [Optimize] 经由 UpstreamCoordinator 单飞 + 限流，并发的相同请求 (含多 worker) 只发出一次
+            key = UpstreamCoordinator.make_key("tmdb", "GET", full_url, params)
+            with span("tmdb.fetch", {"http.route": endpoint, "query": str(params.get("query", ""))}) as sp:
+                resp = await UpstreamCoordinator.call("tmdb", key, _request)
+                sp.set_attribute("http.status_code", resp.status_code)
+            if resp.status_code == 200: return resp.json(), True
+            
+            # 记录详细错误信息
+            error_msg = f"┃   ❌ TMDB HTTP {resp.status_code}"
+            try:
+                err_json = resp.json()
+                if "status_message" in err_json:
+                    error_msg += f" - {err_json['status_message']}"
+            except: pass
+            
+            _log(error_msg)
+            return None, True
+        except Exception as e: 
+            _log(f"┃   ❌ TMDB Network Error: {e} (Proxy: {self.proxy or 'None'})")
+            return None, False
 
     @staticmethod
     def _proxy_img(path: Optional[str]) -> Optional[str]:
@@ -179,12 +199,21 @@ class TMDBProvider:
         storage.set_metadata(cache_key, "tmdb_discover", resp_data)
         return resp_data
 
-    async def get_details(self, tmdb_id: str, media_type: str, logs: Any = None) -> Optional[Dict]:
+    async def get_details(self, tmdb_id: str, media_type: str, logs: Any = None, include_credits: bool = True) -> Optional[Dict]:
+        """
+        获取条目详情。include_credits=False 时不请求演职员表 (cast 为空)，
+        并单独缓存，避免精简结果覆盖完整详情缓存。
+        """
         cache_key = f"detail:v3:{media_type}:{tmdb_id}"
         cached = storage.get_metadata(cache_key, "tmdb_detail")
         if cached: return cached
+        if not include_credits:
+            cache_key = f"detail:v3:lite:{media_type}:{tmdb_id}"
+            cached = storage.get_metadata(cache_key, "tmdb_detail")
+            if cached: return cached
 
-        data, _ = await self._fetch(f"/{media_type}/{tmdb_id}", {"append_to_response": "credits"}, logs=logs)
+        params = {"append_to_response": "credits"} if include_credits else {}
+        data, _ = await self._fetch(f"/{media_type}/{tmdb_id}", params, logs=logs)
         if not data: return None
         
         cast_list = []
@@ -306,7 +335,7 @@ class TMDBProvider:
                     temp_scored = []
                     for c_idx, item in enumerate(merged_candidates[:5]):
                         is_from_segment = item.get("_is_from_segment", False)
-                        score, _, _, _ = TMDBMatcher.calculate_match_score(item, targets, cn_name or "", en_name or "", c_idx, anime_priority, is_from_segment, target_year=year)
+                        score, _, _, _ = TMDBMatcher.calculate_match_score(item, targets, cn_name or "", en_name or "", c_idx, anime_priority, is_from_segment, target_year=year, with_trace=False)
                         temp_scored.append(score)
                     
                     if temp_scored and max(temp_scored) >= 95:
@@ -353,6 +382,7 @@ class TMDBProvider:
         def _log(msg):
             if hasattr(logs, "log"): logs.log(msg)
             elif isinstance(logs, list): logs.append(msg)
+        verbose = audit_enabled(logs)
 
         if not merged_candidates:
             _log(f"┃ ❌ TMDB 定向搜索均无结果")
@@ -365,15 +395,15 @@ class TMDBProvider:
         for idx, item in enumerate(merged_candidates[:10]):
             is_from_segment = item.get("_is_from_segment", False)
             score, trace, best_match_info, summary = TMDBMatcher.calculate_match_score(
-                item, targets, cn_name or "", en_name or "", idx, anime_priority, is_from_segment, target_year=year
+                item, targets, cn_name or "", en_name or "", idx, anime_priority, is_from_segment, target_year=year, with_trace=verbose
             )
-            c_name = item.get("title") or item.get("name")
-            c_year = (item.get("release_date") or item.get("first_air_date") or "")[:4]
-            
-            _log(f"┣ [#{idx+1}] ID:{item.get('id')} | {c_name} ({c_year})")
-            for t_line in trace: _log(t_line)
-            _log(f"┃   ├─ 最佳匹配: {best_match_info}")
-            _log(f"┃   └─ {summary}")
+            if verbose:
+                c_name = item.get("title") or item.get("name")
+                c_year = (item.get("release_date") or item.get("first_air_date") or "")[:4]
+                _log(f"┣ [#{idx+1}] ID:{item.get('id')} | {c_name} ({c_year})")
+                for t_line in trace: _log(t_line)
+                _log(f"┃   ├─ 最佳匹配: {best_match_info}")
+                _log(f"┃   └─ {summary}")
             
             scored_pool.append({"item": item, "score": score})
         
@@ -428,7 +458,7 @@ class TMDBProvider:
                     temp_scored = []
                     for c_idx, item in enumerate(merged_candidates[:5]):
                         is_from_segment = item.get("_is_from_segment", False)
-                        score, _, _, _ = TMDBMatcher.calculate_match_score(item, targets, cn_name or "", en_name or "", c_idx, anime_priority, is_from_segment, target_year=year)
+                        score, _, _, _ = TMDBMatcher.calculate_match_score(item, targets, cn_name or "", en_name or "", c_idx, anime_priority, is_from_segment, target_year=year, with_trace=False)
                         temp_scored.append(score)
                     
                     if temp_scored and max(temp_scored) >= 95:
@@ -476,6 +506,7 @@ class TMDBProvider:
         def _log(msg):
             if hasattr(logs, "log"): logs.log(msg)
             elif isinstance(logs, list): logs.append(msg)
+        verbose = audit_enabled(logs)
 
         if not merged_candidates:
             _log(f"┃ ❌ TMDB 多类型搜索均无结果")
@@ -488,16 +519,16 @@ class TMDBProvider:
         for idx, item in enumerate(merged_candidates[:10]):
             is_from_segment = item.get("_is_from_segment", False)
             score, trace, best_match_info, summary = TMDBMatcher.calculate_match_score(
-                item, targets, cn_name or "", en_name or "", idx, anime_priority, is_from_segment, target_year=year
+                item, targets, cn_name or "", en_name or "", idx, anime_priority, is_from_segment, target_year=year, with_trace=verbose
             )
-            c_name = item.get("title") or item.get("name")
-            c_year = (item.get("release_date") or item.get("first_air_date") or "")[:4]
-            c_type = item.get("media_type", "unknown")
-            
-            _log(f"┣ [#{idx+1}] ID:{item.get('id')} | {c_name} ({c_year}) [{c_type.upper()}]")
-            for t_line in trace: _log(t_line)
-            _log(f"┃   ├─ 最佳匹配: {best_match_info}")
-            _log(f"┃   └─ {summary}")
+            if verbose:
+                c_name = item.get("title") or item.get("name")
+                c_year = (item.get("release_date") or item.get("first_air_date") or "")[:4]
+                c_type = item.get("media_type", "unknown")
+                _log(f"┣ [#{idx+1}] ID:{item.get('id')} | {c_name} ({c_year}) [{c_type.upper()}]")
+                for t_line in trace: _log(t_line)
+                _log(f"┃   ├─ 最佳匹配: {best_match_info}")
+                _log(f"┃   └─ {summary}")
             
             scored_pool.append({"item": item, "score": score})
         
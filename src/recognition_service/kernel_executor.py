@@ -0,0 +1,193 @@
+"""
+L1 内核执行器
+core_recognize 是纯 CPU 计算，在事件循环内同步执行时会阻塞其它请求的网络 I/O，且整个服务只能用满一个核。
+
+- inline  (默认): 与以往一致，在事件循环线程内直接调用
+- process: 交给预热好的进程池执行 (AM_KERNEL_WORKERS 个进程，默认 CPU 核数)；
+           每个工作进程启动时导入内核并跑一次样例文件名，内置制作组索引与各类正则只加载/编译一次
+
+进程模式下内核返回的 MetaBase 与审计日志经 pickle 回传；特权规则随任务下发，工作进程内仅在规则变化时重新加载。
+工作进程内的 RegexGuard 统计与内核 STEP 追踪不会回传主进程。
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from recognition_engine.data_models import MetaBase
+from .metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger("recognition_service.kernel_executor")
+
+EXECUTOR_MODE = os.environ.get("AM_KERNEL_EXECUTOR", "inline").strip().lower()
+POOL_WORKERS = int(os.environ.get("AM_KERNEL_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# 预热用样例：覆盖制作组、集数、规格标签、字幕语言等主要分支
+_WARMUP_NAMES = (
+    "[ANi] 葬送的芙莉莲 - 02 [1080P][Baha][WEB-DL][AAC AVC][CHT].mp4",
+    "[Nekomoe kissaten&LoliHouse] Sousou no Frieren - 28 [WebRip 1080p HEVC-10bit AAC ASSx2].mkv",
+)
+
+POOL_SIZE = Gauge(
+    "anime_matcher_kernel_pool_workers", "内核进程池工作进程数 (inline 模式为 0)"
+)
+POOL_PENDING = Gauge(
+    "anime_matcher_kernel_pool_pending", "已提交到内核进程池、尚未完成的解析任务数"
+)
+POOL_WAIT = Histogram(
+    "anime_matcher_kernel_pool_task_duration_seconds", "内核进程池任务耗时 (含排队与序列化)"
+)
+POOL_TASKS = Counter(
+    "anime_matcher_kernel_pool_tasks_total", "内核进程池任务数", ["outcome"]
+)
+
+
+# 工作进程内最近一次加载的特权规则 (仅在工作进程中使用)
+_loaded_rules: Optional[Tuple[str, ...]] = None
+
+
+def _init_worker():
+    """工作进程初始化：导入内核并跑样例，完成内置索引加载与正则编译"""
+    from recognition_engine.audit_log import NullLog
+    from recognition_engine.kernel import core_recognize
+
+    for name in _WARMUP_NAMES:
+        core_recognize(name, [], [], name, NullLog())
+
+
+def _warm_task() -> int:
+    """预热探针：能执行即说明该工作进程已完成 _init_worker；短暂停留让同一轮的任务分散到不同进程"""
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _recognize_in_worker(kwargs: Dict[str, Any], privilege_rules: List[str], collect_logs: bool) -> Tuple[MetaBase, List[str]]:
+    """工作进程入口：加载本次请求的特权规则后执行内核，返回 (MetaBase, 审计日志)"""
+    from recognition_engine.audit_log import NullLog
+    from recognition_engine.kernel import core_recognize
+    from recognition_engine.special_episode_handler import SpecialEpisodeHandler
+
+    # 工作进程被多个请求轮流复用，以本请求的规则覆盖 (空列表即清空)；
+    # 规则与上次相同 (常见情况) 时跳过重新解析
+    global _loaded_rules
+    rules = tuple(privilege_rules or ())
+    if rules != _loaded_rules:
+        SpecialEpisodeHandler.load_external_rules(list(rules))
+        _loaded_rules = rules
+    logs: List[str] = [] if collect_logs else NullLog()
+    meta = core_recognize(current_logs=logs, **kwargs)
+    return meta, list(logs)
+
+
+def _shutdown_pool(pool: ProcessPoolExecutor):
+    """关闭进程池并等待工作进程退出；cancel_futures 需要 Python 3.9+，3.8 上排队任务会先执行完"""
+    if sys.version_info >= (3, 9):
+        pool.shutdown(wait=True, cancel_futures=True)
+    else:
+        pool.shutdown(wait=True)
+
+
+class KernelExecutor:
+    """按 AM_KERNEL_EXECUTOR 选择内核执行方式，进程池在首次使用 (或服务启动) 时创建"""
+    mode = EXECUTOR_MODE if EXECUTOR_MODE in ("inline", "process") else "inline"
+    workers = max(1, POOL_WORKERS)
+    _pool: Optional[ProcessPoolExecutor] = None
+    # [Fix] 后台预热线程与首个请求可能同时创建进程池
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls) -> Optional[ProcessPoolExecutor]:
+        """创建并预热进程池 (inline 模式下不做任何事)"""
+        if cls.mode != "process": return None
+        pool = cls._pool
+        if pool is not None: return pool
+        with cls._lock:
+            if cls._pool is not None: return cls._pool
+            # spawn：不继承事件循环与 HTTP 客户端等父进程状态
+            pool = cls._pool = ProcessPoolExecutor(
+                max_workers=cls.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            POOL_SIZE.set(cls.workers)
+            logger.info(f"🧵 [KernelExecutor] 内核进程池已启动: {cls.workers} 个工作进程")
+            return pool
+
+    @classmethod
+    def warmup(cls, timeout: float = 120.0):
+        """
+        阻塞直到所有工作进程完成初始化 (用于服务启动阶段)。
+        [Fix] 每轮为每个工作进程提交一个探针，直到所有工作进程都执行过探针 (按 pid 计)；
+        探针只能在 _init_worker 完成后执行，因此全部返回即说明每个进程都已预热。
+        """
+        pool = cls.start()
+        if pool is None: return
+        deadline = time.monotonic() + timeout
+        seen = set()
+        while len(seen) < cls.workers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"内核进程池预热超时: {len(seen)}/{cls.workers} 个工作进程就绪")
+            futures = [pool.submit(_warm_task) for _ in range(cls.workers)]
+            for f in futures: seen.add(f.result(timeout=max(remaining, 0.1)))
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            pool, cls._pool = cls._pool, None
+        if pool is not None:
+            _shutdown_pool(pool)
+            POOL_SIZE.set(0)
+
+    @classmethod
+    def _discard(cls, pool: ProcessPoolExecutor):
+        """
+        [Fix] 丢弃已损坏的进程池：只在它仍是当前进程池时摘除 (并发请求可能已经重建)，
+        回收退出进程的 shutdown(wait=True) 放到默认线程池执行，不阻塞事件循环。
+        """
+        with cls._lock:
+            if cls._pool is pool:
+                cls._pool = None
+                POOL_SIZE.set(0)
+        asyncio.get_running_loop().run_in_executor(None, _shutdown_pool, pool)
+
+    @classmethod
+    async def recognize(cls, privilege_rules: List[str], current_logs: List[str], **kwargs) -> MetaBase:
+        """
+        执行 core_recognize。
+        kwargs 与 core_recognize 的参数一致 (不含 current_logs)；
+        进程模式下日志在任务完成后一次性写回 current_logs。
+        """
+        from recognition_engine.audit_log import audit_enabled
+        from recognition_engine.kernel import core_recognize
+
+        pool = cls.start()
+        if pool is None:
+            return core_recognize(current_logs=current_logs, **kwargs)
+
+        start = time.perf_counter()
+        POOL_PENDING.inc()
+        try:
+            future = pool.submit(_recognize_in_worker, kwargs, privilege_rules, audit_enabled(current_logs))
+            meta, logs = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # 工作进程异常退出：重建进程池，本次请求回退到进程内执行
+            POOL_TASKS.inc("broken")
+            logger.warning("⚠️ [KernelExecutor] 内核进程池已损坏，重建后本次请求回退到进程内执行")
+            cls._discard(pool)
+            return core_recognize(current_logs=current_logs, **kwargs)
+        except Exception:
+            POOL_TASKS.inc("error")
+            raise
+        finally:
+            POOL_PENDING.dec()
+            POOL_WAIT.observe(time.perf_counter() - start)
+        POOL_TASKS.inc("success")
+        current_logs.extend(logs)
+        return meta
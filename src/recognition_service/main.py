@@ -1,11 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from .context import RecognitionContext
 from .recognizer import RecognitionWorkflow
+from .responses import FastJSONResponse, make_response
+from .metrics import REGISTRY
+from .profiler import ADMIN_TOKEN, SamplingProfiler
+from .kernel_executor import KernelExecutor
+from .prewarm import Prewarm
+from .config import WORKERS
+from contextlib import asynccontextmanager
+import hmac
 import uvicorn
 
-app = FastAPI(title="ANIMEProMatcher Kernel Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动预热：内置制作组、anitopy、zhconv、正则、SQLite、内核进程池与合成识别，完成后 /health 才 ready
+    await Prewarm.start()
+    yield
+    KernelExecutor.shutdown()
+
+
+app = FastAPI(title="ANIMEProMatcher Kernel Service", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 
 class RecognitionRequest(BaseModel):
@@ -29,10 +47,12 @@ class RecognitionRequest(BaseModel):
     tmdb_type: Optional[str] = Field(default=None, description="【已知类型提示】movie 或 tv，配合 tmdb_id 使用")
     bangumi_token: Optional[str] = Field(default=None, description="Bangumi 个人授权令牌")
     bangumi_proxy: Optional[str] = Field(default=None, description="Bangumi 代理地址")
+    log_level: Optional[Literal["off", "summary", "full"]] = Field(default=None, description="审计日志级别: off 不返回日志 / summary 仅流程里程碑与结论 / full 完整审计；不传为 full，include 未包含 logs 时不传为 off")
+    include: Optional[List[Literal["raw_meta", "tmdb_match", "logs"]]] = Field(default=None, description="需要返回的可选区块 (raw_meta / tmdb_match / logs)，不传则全部返回；final_result 始终返回。未包含 logs 时不可同时指定 log_level=summary/full (422)")
 
 
-@app.post("/recognize", summary="核心识别接口")
-async def recognize(req: RecognitionRequest):
+@app.post("/recognize", summary="核心识别接口", response_class=FastJSONResponse)
+async def recognize(req: RecognitionRequest, request: Request):
     """
     执行全链路识别流程：
     1. 指纹判定 (智能记忆)
@@ -48,12 +68,18 @@ async def recognize(req: RecognitionRequest):
     - raw_meta: L1 内核原始提取结果
     - tmdb_match: L2 云端匹配数据
     - logs: 全链路审计日志
+    (raw_meta / tmdb_match / logs 可通过 include 参数按需返回)
     """
     try:
         ctx = RecognitionContext.from_request(req)
+    except ValueError as e:
+        # 参数组合冲突 (如 log_level=full 但 include 不含 logs)
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
         workflow = RecognitionWorkflow(ctx)
         result = await workflow.run()
-        return result
+        # data_packet 已是纯 dict，直接序列化并按需压缩，绕过 jsonable_encoder
+        return make_response(result, request)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -62,8 +88,62 @@ async def recognize(req: RecognitionRequest):
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    """
+    预热完成前返回 503 (ready=false)，startup_ms 为各预热组件耗时。
+    有组件预热失败时仍返回 200 (失败组件在首次使用时重试或放行)，但 status 为 degraded 并列出 startup_errors。
+    """
+    status = "warming" if not Prewarm.ready else ("degraded" if Prewarm.errors else "healthy")
+    payload = {"status": status, "ready": Prewarm.ready, "startup_ms": dict(Prewarm.timings)}
+    if Prewarm.errors: payload["startup_errors"] = dict(Prewarm.errors)
+    return FastJSONResponse(payload, status_code=200 if Prewarm.ready else 503)
+
+
+def _require_admin(request: Request):
+    """管理端点鉴权：未配置 AM_ADMIN_TOKEN 时 404，令牌不符时 403 (常量时间比较)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token") or ""
+    if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.get("/debug/profile", summary="采样剖析 (管理员)", response_class=PlainTextResponse)
+async def debug_profile(request: Request, seconds: float = 10.0, interval_ms: float = 5.0):
+    """
+    对在线流量进行 seconds 秒的栈采样，返回 collapsed stack 文本 (flamegraph 兼容)。
+    需配置环境变量 AM_ADMIN_TOKEN，并通过请求头 X-Admin-Token 传入。
+    """
+    _require_admin(request)
+    dump = await SamplingProfiler.run(seconds, interval_ms)
+    if dump is None:
+        raise HTTPException(status_code=409, detail="已有采样任务在运行")
+    return PlainTextResponse(dump)
+
+
+@app.get("/debug/regex", summary="最慢的受守卫正则 (管理员)")
+async def debug_regex(request: Request, limit: int = 20, source: Optional[str] = None):
+    """
+    按累计耗时倒序返回受守卫正则明细 (RegexGuard.slowest)，source 可选 custom_words / special_rules / kernel / other。
+    用户规则以规则文本的短哈希标识，不含规则原文；鉴权同 /debug/profile。
+    """
+    _require_admin(request)
+    from recognition_engine.regex_guard import RegexGuard
+
+    rows = RegexGuard.slowest(max(1, min(limit, 200)), source)
+    return FastJSONResponse({"patterns": [
+        {"pattern_id": pid, "calls": calls, "seconds": round(seconds, 6), "timeouts": timeouts, "max_seconds": round(max_s, 6)}
+        for pid, calls, seconds, timeouts, max_s in rows
+    ]})
+
+
+@app.get("/metrics", summary="Prometheus 指标", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if WORKERS > 1:
+        # 多 worker 需以导入字符串启动，由 uvicorn 主进程管理各 worker 进程
+        uvicorn.run("recognition_service.main:app", host="0.0.0.0", port=8000, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,263 @@
+"""
+Prometheus 指标 (文本暴露格式 0.0.4)
+无第三方依赖的轻量实现：Counter / Gauge / Histogram，由 GET /metrics 统一输出。
+各模块在模块级声明指标后直接调用 inc / observe，不需要额外初始化。
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# 默认延迟分桶 (秒)：覆盖本地解析的毫秒级到云端匹配的十秒级
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """指标注册表：保存所有指标与采集回调，负责输出文本格式"""
+
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """注册采集回调：在输出时被调用，返回已格式化的暴露文本行 (用于在抓取时才读取的统计)"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            try:
+                lines.extend(collector())
+            except Exception:
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        # 无标签指标从 0 开始输出，避免抓取端看到"指标缺失"
+        if not self.labelnames and self.kind in ("counter", "gauge"): self._values[()] = 0.0
+        if registry is not None: registry.register(self)
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际传入 {labels}")
+        return tuple(str(v) for v in labels)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track(self, *labels: str):
+        """进入时 +1，退出时 -1 (用于在途请求数)"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS, registry: MetricsRegistry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [各分桶计数..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """记录代码块耗时 (秒)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        inf_label = 'le="+Inf"'
+        for key, series in items:
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += series[i]
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_label)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(series[-1])}")
+        return lines
+
+
+# ========== 识别服务指标 ==========
+
+STAGE_LATENCY = Histogram(
+    "anime_matcher_stage_duration_seconds", "识别流水线各阶段耗时", ["stage"]
+)
+REQUEST_LATENCY = Histogram(
+    "anime_matcher_request_duration_seconds", "单次识别全链路耗时"
+)
+REQUESTS_TOTAL = Counter(
+    "anime_matcher_requests_total", "识别请求数", ["outcome"]
+)
+IN_FLIGHT = Gauge(
+    "anime_matcher_requests_in_flight", "正在处理中的识别请求数"
+)
+FINGERPRINT_LOOKUPS = Counter(
+    "anime_matcher_fingerprint_lookups_total", "智能记忆指纹查询", ["result"]
+)
+CACHE_LOOKUPS = Counter(
+    "anime_matcher_cache_lookups_total", "本地元数据缓存查询", ["namespace", "result"]
+)
+UPSTREAM_REQUESTS = Counter(
+    "anime_matcher_upstream_requests_total", "外部数据源请求", ["provider", "status"]
+)
+UPSTREAM_LATENCY = Histogram(
+    "anime_matcher_upstream_request_duration_seconds", "外部数据源请求耗时", ["provider"]
+)
+
+
+# ========== 引擎统计 (抓取时读取) ==========
+
+def _collect_regex_stats() -> List[str]:
+    """
+    输出 RegexGuard 统计：按来源聚合 (source 标签) 与引擎内置模式明细 (pattern 标签)。
+    两组标签集合都是固定的；用户规则只计入来源聚合，其明细经管理端点 /debug/regex 查看。
+    """
+    from recognition_engine.regex_guard import RegexGuard
+
+    lines = []
+    for label, rows, prefix in (("source", RegexGuard.totals(), "anime_matcher_regex"),
+                                ("pattern", RegexGuard.engine_stats(), "anime_matcher_regex_pattern")):
+        series = (
+            (f"{prefix}_seconds_total", "counter", "受守卫正则累计执行耗时", 2),
+            (f"{prefix}_calls_total", "counter", "受守卫正则执行次数", 1),
+            (f"{prefix}_timeouts_total", "counter", "受守卫正则超时跳过次数", 3),
+            (f"{prefix}_max_seconds", "gauge", "受守卫正则单次最大耗时", 4),
+        )
+        for name, kind, doc, idx in series:
+            lines.append(f"# HELP {name} {doc} (按 {label})")
+            lines.append(f"# TYPE {name} {kind}")
+            for row in rows:
+                lines.append(f"{name}{_format_labels([label], [row[0]])} {_format_value(row[idx])}")
+    return lines
+
+
+REGISTRY.register_collector(_collect_regex_stats)
+
+
+def _collect_anitopy_stats() -> List[str]:
+    """输出 anitopy 解析缓存的命中统计与看门狗快速失败次数"""
+    from recognition_engine.anitopy_wrapper import AnitopyWrapper, ParseIncidents
+
+    stats = AnitopyWrapper.cache_stats()
+    series = (
+        ("anime_matcher_anitopy_cache_hits_total", "counter", "anitopy 解析缓存命中次数", "hits"),
+        ("anime_matcher_anitopy_cache_misses_total", "counter", "anitopy 解析缓存未命中次数", "misses"),
+        ("anime_matcher_anitopy_cache_evictions_total", "counter", "anitopy 解析缓存淘汰条目数", "evictions"),
+        ("anime_matcher_anitopy_cache_entries", "gauge", "anitopy 解析缓存当前条目数", "size"),
+        ("anime_matcher_anitopy_cache_hit_ratio", "gauge", "anitopy 解析缓存累计命中率", "hit_ratio"),
+    )
+    lines = []
+    for name, kind, doc, field in series:
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {_format_value(stats[field])}")
+    name = "anime_matcher_anitopy_parse_failures_total"
+    lines.append(f"# HELP {name} anitopy 解析快速失败次数 (budget: 看门狗超限, crash: 异常)")
+    lines.append(f"# TYPE {name} counter")
+    for reason, count in sorted(ParseIncidents.counts.items()):
+        lines.append(f"{name}{_format_labels(['reason'], [reason])} {_format_value(count)}")
+    return lines
+
+
+REGISTRY.register_collector(_collect_anitopy_stats)
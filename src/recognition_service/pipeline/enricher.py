@@ -5,6 +5,9 @@ EnrichmentStage - L2.5 元数据字段补全
 import time
 from ..context import RecognitionContext
 
+# final_result 中取自 tmdb_data、且详情接口可以补全的字段 (见 renderer.py)
+FINAL_RESULT_FIELDS = ("poster_path", "vote_average")
+
 
 class EnrichmentStage:
     """L2.5 字段补全：将云端数据融合到 meta 和 tmdb_data"""
@@ -30,9 +33,14 @@ class EnrichmentStage:
                         ctx.tmdb_data[f] = cached[f]
 
         # 联网补全展示资料 (如果缓存也没有)
-        if not ctx.tmdb_data.get("poster_path") or not ctx.tmdb_data.get("overview"):
+        # [Fix] 是否联网由 final_result 实际使用的字段决定，不随 include 变化；
+        # overview / cast 只出现在 tmdb_match 中，仅在调用方请求该区块时额外补全 (含演职员表)
+        want_match = ctx.wants("tmdb_match")
+        missing = any(ctx.tmdb_data.get(f) in (None, "") for f in FINAL_RESULT_FIELDS) \
+            or (want_match and not ctx.tmdb_data.get("overview"))
+        if missing:
             try:
-                online_details = await ctx.tmdb_client.get_details(m_id, m_type, [])
+                online_details = await ctx.tmdb_client.get_details(m_id, m_type, [], include_credits=want_match)
                 if online_details:
                     for f in ["poster_path", "backdrop_path", "overview", "vote_average",
                                "genres", "tagline", "cast"]:
@@ -43,13 +43,13 @@ class MatcherStage:
             if meta.forced_tmdbid:
                 ctx.log(f"┃ [匹配] 🚀 发现锁定 ID: {meta.forced_tmdbid}，正在联网获取...")
                 m_type_str = "movie" if ctx.forced_type == "movie" else "tv"
-                details = await ctx.tmdb_client.get_details(meta.forced_tmdbid, m_type_str, ctx.logs)
+                details = await ctx.tmdb_client.get_details(meta.forced_tmdbid, m_type_str, ctx.trace_logs)
                 if details:
                     ctx.tmdb_data = details
                 else:
                     # 尝试另一种类型
                     alt_type = "tv" if m_type_str == "movie" else "movie"
-                    details = await ctx.tmdb_client.get_details(meta.forced_tmdbid, alt_type, ctx.logs)
+                    details = await ctx.tmdb_client.get_details(meta.forced_tmdbid, alt_type, ctx.trace_logs)
                     if details:
                         ctx.tmdb_data = details
                         ctx.log(f"┃ [匹配] ✅ 类型自动判定为: {alt_type.upper()}")
@@ -93,13 +93,13 @@ class MatcherStage:
                         if source == "tmdb":
                             if is_auto_type:
                                 ctx.tmdb_data = await ctx.tmdb_client.smart_search_multi(
-                                    cn, en, meta.year, ctx.logs,
+                                    cn, en, meta.year, ctx.trace_logs,
                                     anime_priority=ctx.anime_priority,
                                     original_cn_name=original_cn
                                 )
                             else:
                                 ctx.tmdb_data = await ctx.tmdb_client.smart_search(
-                                    cn, en, meta.year, m_type_str, ctx.logs,
+                                    cn, en, meta.year, m_type_str, ctx.trace_logs,
                                     anime_priority=ctx.anime_priority,
                                     original_cn_name=original_cn
                                 )
@@ -111,7 +111,7 @@ class MatcherStage:
                             for q in queries:
                                 if ctx.tmdb_data: break
                                 bgm_subject = await ctx.bangumi_client.search_subject(
-                                    q, ctx.logs,
+                                    q, ctx.trace_logs,
                                     current_episode=meta.begin_episode,
                                     expected_type=m_type_str
                                 )
@@ -120,7 +120,7 @@ class MatcherStage:
                                     ctx.tmdb_data = await ctx.bangumi_client.map_to_tmdb(
                                         bgm_subject,
                                         ctx.api_key or os.environ.get("TMDB_API_KEY", ""),
-                                        ctx.logs,
+                                        ctx.trace_logs,
                                         tmdb_proxy=ctx.tmdb_proxy
                                     )
 
@@ -7,8 +7,10 @@ import os
 import time
 from typing import Optional
 from ..context import RecognitionContext
-from recognition_engine.kernel import core_recognize
+from ..metrics import FINGERPRINT_LOOKUPS
+from ..kernel_executor import KernelExecutor
 from recognition_engine.special_episode_handler import SpecialEpisodeHandler
+from recognition_engine.tracing import current_span
 
 
 def _is_chinese(text: str) -> bool:
@@ -37,20 +39,23 @@ class ParserStage:
             ctx.log(f"┣ [临时规则] 已加载 {len(ctx.all_privilege)} 条临时特权规则")
 
         # --- 配置审计 ---
-        p_anime = "ON" if ctx.anime_priority else "OFF"
-        p_batch = "ON" if ctx.batch_enhance else "OFF"
-        p_fp = "ON" if ctx.use_fingerprint else "OFF"
-        p_bgm = "ON" if ctx.bangumi_priority else "OFF"
-        p_failover = "ON" if ctx.bangumi_failover else "OFF"
-        p_force_file = "ON" if ctx.force_filename else "OFF"
-
-        ctx.log(f"🚀 --- [ANIME 深度审计流水线启动] ---")
-        ctx.log(f"┃ [待处理条目]: {ctx.filename}")
-        ctx.log(f"┃ [配置] 策略状态: 动漫优化[{p_anime}] | 合集增强[{p_batch}] | 智能记忆[{p_fp}] | BGM数据源优先[{p_bgm}] | BGM故障转移[{p_failover}] | 强制单文件[{p_force_file}]")
+        if ctx.log_enabled:
+            p_anime = "ON" if ctx.anime_priority else "OFF"
+            p_batch = "ON" if ctx.batch_enhance else "OFF"
+            p_fp = "ON" if ctx.use_fingerprint else "OFF"
+            p_bgm = "ON" if ctx.bangumi_priority else "OFF"
+            p_failover = "ON" if ctx.bangumi_failover else "OFF"
+            p_force_file = "ON" if ctx.force_filename else "OFF"
+
+            ctx.log(f"🚀 --- [ANIME 深度审计流水线启动] ---")
+            ctx.log(f"┃ [待处理条目]: {ctx.filename}")
+            ctx.log(f"┃ [配置] 策略状态: 动漫优化[{p_anime}] | 合集增强[{p_batch}] | 智能记忆[{p_fp}] | BGM数据源优先[{p_bgm}] | BGM故障转移[{p_failover}] | 强制单文件[{p_force_file}]")
 
         # --- 指纹预匹配 (智能记忆) ---
         if ctx.use_fingerprint and not ctx.tmdb_data:
             fp_match = await ctx.cache_dao.get_fingerprint_match(ctx.filename, ctx.logs)
+            FINGERPRINT_LOOKUPS.inc("hit" if fp_match else "miss")
+            current_span().set_attribute("fingerprint.hit", bool(fp_match))
             if fp_match:
                 ctx.tmdb_data = {
                     "id": fp_match["id"],
@@ -60,19 +65,22 @@ class ParserStage:
                 ctx.log(f"┃ [智能记忆] ⚡ 记忆加速启动，将跳过冗余内核解析步骤")
 
         # --- L1 内核解析 ---
-        kernel_logs = []
-        ctx.meta = core_recognize(
+        # 非 full 级别传入 NullLog，内核将跳过审计字符串的拼接
+        # [NEW] AM_KERNEL_EXECUTOR=process 时交由进程池执行，事件循环不再被解析阻塞
+        kernel_logs = [] if ctx.log_level == "full" else ctx.trace_logs
+        ctx.meta = await KernelExecutor.recognize(
+            privilege_rules=ctx.all_privilege,
+            current_logs=kernel_logs,
             input_name=ctx.filename,
             custom_words=ctx.all_noise,
             custom_groups=ctx.all_groups,
             original_input=ctx.original_filename,
-            current_logs=kernel_logs,
             batch_enhancement=ctx.batch_enhance,
             force_filename=ctx.force_filename
         )
 
         # 同步内核日志
-        for l in kernel_logs: ctx.log(l)
+        ctx.logs.extend(kernel_logs)
 
         # --- 处理参数覆盖 ---
         ParserStage._apply_forced_params(ctx)
@@ -0,0 +1,127 @@
+"""
+启动预热
+部署后第一个请求会依次触发内置制作组加载、anitopy 关键字表构建、zhconv 字典加载、各模块正则编译、
+SQLite 连接与建表，造成冷启动尖峰。服务启动时 (FastAPI lifespan) 提前完成这些工作并跑几条合成识别，
+全部完成后 /health 才返回 ready。
+
+AM_PREWARM:
+- background (默认): 服务立即开始监听，预热在后台线程执行，完成前 /health 返回 503
+                    (请求可能与预热并发触发同一组件的首次初始化，SQLite 建连由 StorageManager 加锁串行)
+- blocking:          预热完成后才开始监听
+- off:               不预热，/health 直接 ready
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger("recognition_service.prewarm")
+
+PREWARM_MODE = os.environ.get("AM_PREWARM", "background").strip().lower()
+
+# 合成识别样例：覆盖制作组、集数、规格标签、繁体标题与合集等主要分支
+SYNTHETIC_NAMES = (
+    "[ANi] 葬送的芙莉莲 - 02 [1080P][Baha][WEB-DL][AAC AVC][CHT].mp4",
+    "[Nekomoe kissaten&LoliHouse] Sousou no Frieren - 28 [WebRip 1080p HEVC-10bit AAC ASSx2].mkv",
+    "[喵萌奶茶屋&VCB-Studio] 進擊的巨人 第三季 [01-12][Ma10p_1080p][x265_flac].mkv",
+    "Spy.x.Family.S02E05.1080p.WEB-DL.H264.AAC.mkv",
+)
+
+
+def _load_builtin_groups():
+    from recognition_engine.builtin_group_loader import BuiltinGroupLoader
+    BuiltinGroupLoader.compiled_entries()
+
+
+def _build_anitopy():
+    from recognition_engine.anitopy_wrapper import AnitopyWrapper
+    AnitopyWrapper.parse(SYNTHETIC_NAMES[0])
+
+
+def _load_zhconv():
+    import zhconv
+    zhconv.convert("進擊的巨人", "zh-hans")
+
+
+def _load_cn2an():
+    import cn2an
+    cn2an.cn2an("十二", "smart")
+
+
+def _compile_engine():
+    # 导入内核及其依赖模块即完成模块级正则的编译
+    import recognition_engine.kernel  # noqa: F401
+    import recognition_engine.post_processor  # noqa: F401
+
+
+def _open_storage():
+    from .storage_manager import storage
+    storage._ensure_connection()
+
+
+def _start_kernel_pool():
+    from .kernel_executor import KernelExecutor
+    KernelExecutor.warmup()
+
+
+def _synthetic_recognitions():
+    from recognition_engine.audit_log import NullLog
+    from recognition_engine.kernel import core_recognize
+    for name in SYNTHETIC_NAMES:
+        core_recognize(name, [], [], name, NullLog())
+
+
+COMPONENTS: List[Tuple[str, Callable[[], None]]] = [
+    ("builtin_groups", _load_builtin_groups),
+    ("anitopy", _build_anitopy),
+    ("zhconv", _load_zhconv),
+    ("cn2an", _load_cn2an),
+    ("engine_regex", _compile_engine),
+    ("storage", _open_storage),
+    ("kernel_pool", _start_kernel_pool),
+    ("synthetic", _synthetic_recognitions),
+]
+
+
+class Prewarm:
+    """启动预热状态：ready 标记与各组件耗时 (ms)"""
+    ready = False
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+
+    @classmethod
+    def run(cls) -> Dict[str, float]:
+        """同步执行全部预热组件，单个组件失败只记录不中断"""
+        total = time.perf_counter()
+        logger.info("🔥 [Prewarm] 启动预热开始")
+        for name, func in COMPONENTS:
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                cls.errors[name] = str(e)
+                logger.warning(f"┣ ⚠️ [Prewarm] {name} 预热失败: {e}")
+            cls.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+            logger.info(f"┣ [Prewarm] {name}: {cls.timings[name]}ms")
+        cls.timings["total"] = round((time.perf_counter() - total) * 1000, 1)
+        # 组件失败不阻止 ready (失败组件在首次使用时重试或放行)，/health 以 status=degraded 暴露
+        cls.ready = True
+        if cls.errors:
+            logger.warning(f"┗ ⚠️ [Prewarm] 预热完成 (降级: {', '.join(cls.errors)} 失败)，总耗时 {cls.timings['total']}ms")
+        else:
+            logger.info(f"┗ ✅ [Prewarm] 预热完成，总耗时 {cls.timings['total']}ms")
+        return cls.timings
+
+    @classmethod
+    async def start(cls):
+        """按 AM_PREWARM 执行预热：blocking 等待完成；background 返回后台任务"""
+        if PREWARM_MODE == "off":
+            cls.ready = True
+            return None
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(None, cls.run)
+        if PREWARM_MODE == "blocking":
+            await task
+            return None
+        return task
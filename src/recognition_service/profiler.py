@@ -0,0 +1,146 @@
+"""
+运行时剖析
+- SamplingProfiler: 后台线程定时抓取所有线程的调用栈，输出 collapsed stack 文本
+  (每行 "帧1;帧2;...;帧N 次数"，可直接交给 flamegraph.pl / speedscope / inferno)
+- RequestProfiler: AM_PROFILE_REQUESTS=1 时对单次识别启用 cProfile，
+  把耗时最高的函数与 perf_stats 一起附加到响应的 profile 区块。
+  cProfile 挂在事件循环线程上，跨 await 期间其它请求的开销同样会被计入，
+  因此结果标注为 scope=event_loop 并给出重叠请求数；进程池模式下内核不在本进程执行，不会出现在热点中
+
+两者都只用于排障，默认关闭；采样模式对在线流量的额外开销只有采样线程本身。
+"""
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# /debug/profile 的访问令牌，未配置时端点关闭
+ADMIN_TOKEN = os.environ.get("AM_ADMIN_TOKEN") or None
+MAX_PROFILE_SECONDS = 120.0
+
+
+def _short_path(path: str) -> str:
+    """去掉 site-packages / src 前缀，帧名更短也便于跨机器对比"""
+    for marker in ("site-packages" + os.sep, "src" + os.sep, "lib" + os.sep):
+        idx = path.rfind(marker)
+        if idx != -1: return path[idx + len(marker):]
+    return os.path.basename(path)
+
+
+class SamplingProfiler:
+    """进程级采样剖析器，同一时间只允许一个采样任务"""
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _frame_label(code) -> str:
+        return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+    @classmethod
+    def _collect(cls, stop: threading.Event, interval: float, stacks: Counter):
+        own_id = threading.get_ident()
+        labels: Dict[Any, str] = {}
+        while not stop.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id: continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None: label = labels[code] = cls._frame_label(code)
+                    parts.append(label)
+                    frame = frame.f_back
+                parts.reverse()
+                stacks[";".join(parts)] += 1
+
+    @classmethod
+    async def run(cls, seconds: float, interval_ms: float = 5.0) -> Optional[str]:
+        """采样 seconds 秒后返回 collapsed stack 文本；已有采样任务在运行时返回 None"""
+        if not cls._lock.acquire(blocking=False): return None
+        try:
+            stacks: Counter = Counter()
+            stop = threading.Event()
+            worker = threading.Thread(
+                target=cls._collect, args=(stop, max(interval_ms, 1.0) / 1000, stacks),
+                name="am-sampling-profiler", daemon=True
+            )
+            worker.start()
+            await asyncio.sleep(min(max(seconds, 0.1), MAX_PROFILE_SECONDS))
+            stop.set()
+            await asyncio.get_running_loop().run_in_executor(None, worker.join)
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            cls._lock.release()
+
+
+class RequestProfiler:
+    """单请求 cProfile (AM_PROFILE_REQUESTS=1)，并发请求时只剖析其中一个"""
+    ENABLED = os.environ.get("AM_PROFILE_REQUESTS", "").strip().lower() in ("1", "true", "yes", "on")
+    TOP_N = int(os.environ.get("AM_PROFILE_TOP_N", "15"))
+    _active = False
+    # 正在执行的识别请求数，以及剖析窗口内与之重叠的其它请求数
+    _in_flight = 0
+    _overlap = 0
+
+    @classmethod
+    @contextmanager
+    def profile(cls):
+        """
+        yield 一个 dict：退出时填入 hot_functions 及其作用域说明。
+        未开启或已有请求在剖析时 yield None，调用方据此跳过。
+        """
+        if not cls.ENABLED:
+            yield None
+            return
+        cls._in_flight += 1
+        try:
+            if cls._active:
+                cls._overlap += 1
+                yield None
+                return
+            cls._active = True
+            # 窗口开始时已在执行的其它请求
+            cls._overlap = cls._in_flight - 1
+            holder: Dict[str, Any] = {}
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            try:
+                profiler.enable()
+                yield holder
+            finally:
+                profiler.disable()
+                cls._active = False
+                holder["profiled_ms"] = int((time.perf_counter() - start) * 1000)
+                holder["scope"] = "event_loop"
+                holder["overlapping_requests"] = cls._overlap
+                holder["kernel_profiled"] = cls._kernel_in_process()
+                holder["hot_functions"] = cls.top_functions(profiler, cls.TOP_N)
+        finally:
+            cls._in_flight -= 1
+
+    @staticmethod
+    def _kernel_in_process() -> bool:
+        """进程池模式下 L1 内核在工作进程中执行，cProfile 看不到"""
+        from .kernel_executor import EXECUTOR_MODE
+        return EXECUTOR_MODE != "process"
+
+    @staticmethod
+    def top_functions(profiler: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+        """按自身耗时 (tottime) 排序的前 N 个函数"""
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:limit]
+        out = []
+        for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in rows:
+            location = f"{_short_path(filename)}:{lineno}" if filename != "~" else "builtin"
+            out.append({
+                "function": f"{func} ({location})",
+                "calls": ncalls,
+                "self_ms": round(tottime * 1000, 3),
+                "total_ms": round(cumtime * 1000, 3),
+            })
+        return out
@@ -7,6 +7,9 @@ from typing import Tuple, Dict, Any, List
 from .context import RecognitionContext
 from .pipeline import ParserStage, MatcherStage, EnrichmentStage, MaintenanceStage
 from .renderer import ResultRenderer
+from .metrics import STAGE_LATENCY, REQUEST_LATENCY, REQUESTS_TOTAL, IN_FLIGHT
+from .profiler import RequestProfiler
+from recognition_engine.tracing import span
 
 logger = logging.getLogger("recognition_service.recognizer")
 
@@ -20,20 +23,40 @@ class RecognitionWorkflow:
         self.ctx = ctx
 
     async def run(self) -> Dict[str, Any]:
+        root = span("recognize", {"filename": self.ctx.filename, "with_cloud": bool(self.ctx.with_cloud), "log_level": self.ctx.log_level})
+        with IN_FLIGHT.track(), REQUEST_LATENCY.time(), root:
+            try:
+                with RequestProfiler.profile() as profile:
+                    result = await self._run_stages()
+            except Exception:
+                REQUESTS_TOTAL.inc("error")
+                raise
+        REQUESTS_TOTAL.inc("success")
+        if profile is not None:
+            # [NEW] AM_PROFILE_REQUESTS: 附带阶段耗时与热点函数
+            result["profile"] = {"perf_stats": list(self.ctx.perf_stats), **profile}
+        return result
+
+    async def _run_stages(self) -> Dict[str, Any]:
         # 1. 基础解析阶段 (Kernel + Rules)
-        await ParserStage.run(self.ctx)
+        with STAGE_LATENCY.time("parser"), span("stage.parser"):
+            await ParserStage.run(self.ctx)
 
         # 2. 元数据匹配阶段 (Fingerprint + Cloud)
-        await MatcherStage.run(self.ctx)
+        with STAGE_LATENCY.time("matcher"), span("stage.matcher"):
+            await MatcherStage.run(self.ctx)
 
         # 3. 深度字段补全阶段 (Enrichment)
-        await EnrichmentStage.run(self.ctx)
+        with STAGE_LATENCY.time("enrichment"), span("stage.enrichment"):
+            await EnrichmentStage.run(self.ctx)
 
         # 4. 后处理与维护阶段 (Fingerprint Sync + Cache Update)
-        await MaintenanceStage.run(self.ctx)
+        with STAGE_LATENCY.time("maintenance"), span("stage.maintenance"):
+            await MaintenanceStage.run(self.ctx)
 
         # 5. 渲染与汇报阶段
-        return await ResultRenderer.apply_to_context(self.ctx)
+        with STAGE_LATENCY.time("renderer"), span("stage.renderer"):
+            return await ResultRenderer.apply_to_context(self.ctx)
 
 
 class MovieRecognizer:
@@ -15,7 +15,12 @@ class RenderReporter:
     def report(ctx: RecognitionContext, data_packet: dict) -> dict:
         """
         最终结论汇报。直接写入 ctx.logs，返回完整的 data_packet。
+        log_level=off 时跳过汇报文本的构建。
         """
+        if not ctx.log_enabled:
+            data_packet["logs"] = []
+            return data_packet
+
         # 1. 性能统计
         ctx.log(f"⏱️ [性能审计]: 全链路耗时 {int(ctx.duration * 1000)}ms ({' | '.join(ctx.perf_stats)})")
 
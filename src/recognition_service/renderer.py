@@ -25,11 +25,9 @@ class ResultRenderer:
         render_start = time.time()
         if ctx.all_render:
             ctx.log("┃ [DEBUG][Step 8: 自定义渲染词处理]: 启动子流程审计")
-            r_logs = []
             data_packet = await RenderEngine.apply_rules(
-                data_packet, ctx.filename, ctx.all_render, r_logs, ctx.api_key
+                data_packet, ctx.filename, ctx.all_render, ctx.trace_logs, ctx.api_key
             )
-            for l in r_logs: ctx.log(l)
             ctx.log("┃ ✅ 渲染流程结束")
 
         ctx.add_perf("规则渲染", render_start)
@@ -40,7 +38,12 @@ class ResultRenderer:
             f["processed_name"] = ctx.filename.split('/')[-1].rsplit('.', 1)[0]
 
         # 4. 汇总汇报与审计 (Reporting)
-        return RenderReporter.report(ctx, data_packet)
+        data_packet = RenderReporter.report(ctx, data_packet)
+
+        # 5. 响应裁剪：移除调用方未请求的可选区块
+        for section in ("raw_meta", "tmdb_match", "logs"):
+            if not ctx.wants(section): data_packet.pop(section, None)
+        return data_packet
 
     @staticmethod
     def _prepare_data_packet(ctx: RecognitionContext) -> Dict[str, Any]:
@@ -92,10 +95,12 @@ class ResultRenderer:
             "duration": f"{ctx.duration:.1f}s",
         }
 
-        # 构建元数据快照 (raw_meta)
-        raw_meta_clean = vars(meta).copy()
-        if 'type' in raw_meta_clean and hasattr(raw_meta_clean['type'], 'value'):
-            raw_meta_clean['type'] = raw_meta_clean['type'].value
+        # 构建元数据快照 (raw_meta)：渲染规则依赖它，否则仅在调用方请求时构建
+        raw_meta_clean = None
+        if ctx.wants("raw_meta") or ctx.all_render:
+            raw_meta_clean = vars(meta).copy()
+            if 'type' in raw_meta_clean and hasattr(raw_meta_clean['type'], 'value'):
+                raw_meta_clean['type'] = raw_meta_clean['type'].value
 
         return {
             "success": True,
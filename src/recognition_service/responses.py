@@ -0,0 +1,81 @@
+"""
+高性能 JSON 响应
+- 识别结果 (data_packet) 在流水线中已经构建为纯 dict，直接交给 orjson 序列化，绕过 FastAPI 的 jsonable_encoder
+- 响应体超过阈值时按 Accept-Encoding 协商 br / gzip 压缩
+- orjson / brotli 均为可选依赖，缺失时分别回落到标准库 json 与 gzip
+"""
+import gzip
+import json
+import os
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 小于该字节数的响应不压缩 (压缩收益抵不过 CPU 开销)
+COMPRESS_MIN_SIZE = int(os.environ.get("AM_COMPRESS_MIN_SIZE", "1024"))
+
+
+def _default(obj: Any) -> Any:
+    """orjson 无法识别的对象 (Enum 以外的自定义类型等) 统一转字符串，与 jsonable_encoder 的兜底行为一致"""
+    if hasattr(obj, "value"): return obj.value
+    if isinstance(obj, (set, frozenset, tuple)): return list(obj)
+    return str(obj)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 序列化的 JSONResponse，可直接作为 response_class 使用"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token: continue
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"): continue
+        accepted.add(token)
+    if brotli is not None and "br" in accepted: return "br"
+    if "gzip" in accepted: return "gzip"
+    return None
+
+
+def make_response(content: Any, request: Optional[Request] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    构建识别结果响应：序列化一次，必要时按客户端能力压缩。
+    """
+    response = FastJSONResponse(content, status_code=status_code)
+    body = response.body
+    if request is None or len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding == "br":
+        response.body = brotli.compress(body, quality=4)
+    elif encoding == "gzip":
+        response.body = gzip.compress(body, compresslevel=6)
+    else:
+        return response
+
+    response.headers["Content-Encoding"] = encoding
+    response.headers["Content-Length"] = str(len(response.body))
+    return response
@@ -3,14 +3,25 @@ import json
 import logging
 import os
 import re
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from .config import DATABASE_PATH, CACHE_EXPIRY_DAYS, MEMORY_EXPIRY_DAYS
+from .config import DATABASE_PATH, CACHE_EXPIRY_DAYS, MEMORY_EXPIRY_DAYS, STORAGE_BUSY_TIMEOUT
+from .metrics import CACHE_LOOKUPS
+from recognition_engine.tracing import traced, current_span
 
 logger = logging.getLogger("recognition_service.storage")
 
+
+def _record_lookup(source: str, result: str):
+    """缓存查询结果同时计入指标与当前 span"""
+    CACHE_LOOKUPS.inc(source, result)
+    current_span().set_attributes({"cache.hit": result == "hit", "cache.result": result})
+
 class StorageManager:
     _instance = None
+    # [Fix] 后台预热线程与请求可能同时触发首次连接，初始化需串行，避免重复建连或覆盖共享连接
+    _init_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -24,14 +35,24 @@ class StorageManager:
         if self.initialized:
             return True
 
+        with self._init_lock:
+            if self.initialized:
+                return True
+            return self._connect()
+
+    def _connect(self) -> bool:
         try:
             db_dir = os.path.dirname(os.path.abspath(DATABASE_PATH))
             if not os.path.exists(db_dir):
                 os.makedirs(db_dir, exist_ok=True)
                 logger.info(f"创建存储目录: {db_dir}")
 
-            self.conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+            # [Fix] 多 worker 共用同一数据库文件：WAL 允许读写并发 (读不等待写)；
+            # 读写在事件循环内同步执行，写锁等待压到 AM_STORAGE_BUSY_TIMEOUT，超时由各方法放行 (视为未命中 / 跳过写入)
+            self.conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, timeout=STORAGE_BUSY_TIMEOUT)
             self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
             self._create_tables()
             self.initialized = True
             return True
@@ -39,6 +60,14 @@ class StorageManager:
             logger.error(f"无法初始化本地存储: {e}")
             return False
 
+    def _write_failed(self, e: Exception):
+        """缓存写入失败 (多为写锁争用超时)：回滚未提交的事务后放行"""
+        logger.debug(f"缓存写入已跳过: {e}")
+        try:
+            self.conn.rollback()
+        except sqlite3.Error:
+            pass
+
     def _create_tables(self):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -71,7 +100,9 @@ class StorageManager:
 
     # ========== 元数据缓存 ==========
 
+    @traced("storage.get_metadata")
     def get_metadata(self, key: str, source: str) -> Optional[Dict]:
+        current_span().set_attributes({"cache.namespace": source, "cache.key": key})
         if not self._ensure_connection(): return None
         try:
             cursor = self.conn.cursor()
@@ -80,13 +111,19 @@ class StorageManager:
             if row:
                 updated_at = datetime.strptime(row['updated_at'], '%Y-%m-%d %H:%M:%S')
                 if datetime.now() - updated_at > timedelta(days=CACHE_EXPIRY_DAYS):
+                    _record_lookup(source, "expired")
                     return None
+                _record_lookup(source, "hit")
                 return json.loads(row['data'])
         except Exception:
+            _record_lookup(source, "error")
             return None
+        _record_lookup(source, "miss")
         return None
 
+    @traced("storage.set_metadata")
     def set_metadata(self, key: str, source: str, data: dict):
+        current_span().set_attributes({"cache.namespace": source, "cache.key": key})
         if not self._ensure_connection(): return
         try:
             cursor = self.conn.cursor()
@@ -95,11 +132,12 @@ class StorageManager:
                 (key, source, json.dumps(data, ensure_ascii=False))
             )
             self.conn.commit()
-        except Exception:
-            pass
+        except Exception as e:
+            self._write_failed(e)
 
     # ========== 旧版标题记忆 (向后兼容) ==========
 
+    @traced("storage.get_memory")
     def get_memory(self, pattern_key: str) -> Optional[Dict]:
         if not self._ensure_connection(): return None
         try:
@@ -115,6 +153,7 @@ class StorageManager:
             return None
         return None
 
+    @traced("storage.set_memory")
     def set_memory(self, pattern_key: str, tmdb_id: str, media_type: str, season: int):
         if not self._ensure_connection(): return
         try:
@@ -124,8 +163,8 @@ class StorageManager:
                 (pattern_key, tmdb_id, media_type, season)
             )
             self.conn.commit()
-        except Exception:
-            pass
+        except Exception as e:
+            self._write_failed(e)
 
     # ========== 文件名指纹记忆 (对齐主项目) ==========
 
@@ -174,6 +213,7 @@ class StorageManager:
 
         return has_title_content and not is_filename_short
 
+    @traced("storage.get_fingerprint_match")
     def get_fingerprint_match(self, filename: str, logs: List[str] = None) -> Optional[Dict[str, Any]]:
         """根据文件名指纹查找系列匹配"""
         if not self._ensure_connection(): return None
@@ -186,6 +226,7 @@ class StorageManager:
                 updated_at = datetime.strptime(row['updated_at'], '%Y-%m-%d %H:%M:%S')
                 if datetime.now() - updated_at > timedelta(days=MEMORY_EXPIRY_DAYS):
                     return None
+                current_span().set_attribute("cache.hit", True)
                 if logs is not None:
                     logs.append(f"┃ [智能记忆] ⚡ 命中加速: {row['title']} (ID: {row['tmdb_id']})")
                 return {"id": row['tmdb_id'], "type": row['media_type'], "title": row['title'], "source": "fingerprint_match"}
@@ -193,6 +234,7 @@ class StorageManager:
             return None
         return None
 
+    @traced("storage.save_fingerprint")
     def save_fingerprint(self, filename: str, tmdb_data: Dict[str, Any], logs: List[str] = None):
         """保存指纹"""
         if not self._ensure_connection(): return
@@ -217,6 +259,7 @@ class StorageManager:
             if logs is not None:
                 logs.append(f"┃ [智能记忆] 💾 更新记忆特征: ID:{tmdb_id} | 标题:{title}")
         except Exception as e:
+            self._write_failed(e)
             if logs is not None:
                 logs.append(f"┃ [智能记忆] ❌ 更新失败: {e}")
 
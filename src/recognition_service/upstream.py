@@ -0,0 +1,262 @@
+"""
+上游请求协调 (TMDB / Bangumi)
+- 单飞：相同请求 (数据源 + 方法 + URL + 参数 + 凭据) 并发时只真正发出一次，其余请求等待并复用响应
+  - 进程内：以 asyncio.Future 合并
+  - 跨进程 (多 worker)：借助共享 SQLite 的 upstream_flight 租约表选出领头 worker，
+    响应写入 upstream_response，在 AM_UPSTREAM_SHARE_TTL 秒内供其它 worker 直接复用
+- 限流：令牌桶 (AM_TMDB_RATE_LIMIT / AM_BANGUMI_RATE_LIMIT，每秒请求数)，
+  多 worker 时桶状态保存在 SQLite，N 个 worker 合计不超过上限
+
+协调所用的 SQLite 操作在专用线程上执行 (锁等待不阻塞事件循环)，出错时直接放行请求，协调失败不影响识别本身。
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import (
+    DATABASE_PATH, WORKERS, UPSTREAM_COORDINATION, UPSTREAM_SHARE_TTL, TMDB_RATE_LIMIT, BANGUMI_RATE_LIMIT
+)
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger("recognition_service.upstream")
+
+# 领头请求的租约 (秒)：超时未释放视为领头 worker 已失联，其它 worker 可接管 (略大于 HTTP 超时 15s)
+FLIGHT_LEASE = 20.0
+POLL_INTERVAL = 0.05
+
+UPSTREAM_COALESCED = Counter(
+    "anime_matcher_upstream_coalesced_total", "被单飞合并、未实际发出的上游请求", ["provider", "scope"]
+)
+UPSTREAM_THROTTLE = Histogram(
+    "anime_matcher_upstream_throttle_seconds", "上游限流等待耗时", ["provider"]
+)
+
+
+@dataclass
+class UpstreamResponse:
+    """可在协程间与进程间共享的上游响应 (状态码 + 原始响应体)"""
+    status_code: int
+    content: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+RequestFn = Callable[[], Awaitable[UpstreamResponse]]
+
+
+class _SharedStore:
+    """跨 worker 协调表，与存储共用数据库文件 (独立连接，WAL + busy_timeout)"""
+
+    def __init__(self, path: str):
+        db_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(db_dir, exist_ok=True)
+        # 协调操作都在 UpstreamCoordinator 的专用单线程上执行，锁等待上限 1s，超时即放行
+        self.conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS upstream_flight (key TEXT PRIMARY KEY, owner TEXT, started_at REAL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS upstream_response (key TEXT PRIMARY KEY, status INTEGER, body BLOB, created_at REAL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS upstream_rate (provider TEXT PRIMARY KEY, tokens REAL, updated_at REAL)")
+        self._writes = 0
+
+    def get_response(self, key: str) -> Optional[UpstreamResponse]:
+        row = self.conn.execute(
+            "SELECT status, body FROM upstream_response WHERE key = ? AND created_at >= ?",
+            (key, time.time() - UPSTREAM_SHARE_TTL)
+        ).fetchone()
+        return UpstreamResponse(row[0], bytes(row[1])) if row else None
+
+    def put_response(self, key: str, resp: UpstreamResponse):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO upstream_response (key, status, body, created_at) VALUES (?, ?, ?, ?)",
+            (key, resp.status_code, resp.content, now)
+        )
+        self._writes += 1
+        if self._writes % 200 == 0:
+            self.conn.execute("DELETE FROM upstream_response WHERE created_at < ?", (now - UPSTREAM_SHARE_TTL,))
+
+    def try_acquire(self, key: str, owner: str) -> bool:
+        now = time.time()
+        cur = self.conn.execute("INSERT OR IGNORE INTO upstream_flight (key, owner, started_at) VALUES (?, ?, ?)", (key, owner, now))
+        if cur.rowcount: return True
+        # 租约过期则接管
+        cur = self.conn.execute(
+            "UPDATE upstream_flight SET owner = ?, started_at = ? WHERE key = ? AND started_at < ?",
+            (owner, now, key, now - FLIGHT_LEASE)
+        )
+        return bool(cur.rowcount)
+
+    def release(self, key: str, owner: str):
+        self.conn.execute("DELETE FROM upstream_flight WHERE key = ? AND owner = ?", (key, owner))
+
+    def take_token(self, provider: str, rate: float) -> float:
+        """取一个令牌：成功返回 0，否则返回建议等待秒数"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT tokens, updated_at FROM upstream_rate WHERE provider = ?", (provider,)).fetchone()
+            wait = _refill_and_take(row, now, rate)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO upstream_rate (provider, tokens, updated_at) VALUES (?, ?, ?)",
+                (provider, wait[1], now)
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return wait[0]
+
+
+def _refill_and_take(state: Optional[tuple], now: float, rate: float) -> tuple:
+    """令牌桶：按经过时间补充 (容量为 1 秒的配额)，返回 (等待秒数, 剩余令牌)"""
+    burst = max(1.0, rate)
+    tokens = burst if state is None else min(burst, state[0] + (now - state[1]) * rate)
+    if tokens >= 1: return 0.0, tokens - 1
+    return (1 - tokens) / rate, tokens
+
+
+class UpstreamCoordinator:
+    """上游请求的单飞与限流入口，数据源客户端把实际请求包装成 RequestFn 交给 call()"""
+    # single: 仅进程内单飞；shared: 经由 SQLite 跨进程协调；off: 关闭单飞 (限流仍按配置生效)
+    mode = UPSTREAM_COORDINATION if UPSTREAM_COORDINATION in ("single", "shared", "off") else ("shared" if WORKERS > 1 else "single")
+    rates: Dict[str, float] = {"tmdb": TMDB_RATE_LIMIT, "bangumi": BANGUMI_RATE_LIMIT}
+    owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    _inflight: Dict[str, asyncio.Future] = {}
+    _buckets: Dict[str, tuple] = {}
+    _store: Optional[_SharedStore] = None
+    _store_failed = False
+    # 共享表的同步 SQLite 调用都放到这个单线程执行器：锁等待不阻塞事件循环，
+    # 单线程也保证共用连接上的事务 (BEGIN IMMEDIATE) 不会交错
+    _store_executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def make_key(provider: str, method: str, url: str, params: Optional[Dict] = None, body: Any = None, credential: str = "") -> str:
+        raw = json.dumps([provider, method, url, params or {}, body, credential], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def _run_store(cls, fn: Callable, *args) -> Any:
+        """在专用线程上执行一次共享表操作"""
+        if cls._store_executor is None:
+            cls._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upstream-store")
+        return await asyncio.get_running_loop().run_in_executor(cls._store_executor, functools.partial(fn, *args))
+
+    @classmethod
+    def _open_store(cls) -> Optional[_SharedStore]:
+        if cls._store is None and not cls._store_failed:
+            try:
+                cls._store = _SharedStore(DATABASE_PATH)
+            except sqlite3.Error as e:
+                cls._store_failed = True
+                logger.warning(f"⚠️ [Upstream] 无法初始化跨进程协调表，退化为进程内协调: {e}")
+        return cls._store
+
+    @classmethod
+    async def _get_store(cls) -> Optional[_SharedStore]:
+        if cls._store is not None or cls._store_failed: return cls._store
+        # 建表同样可能等待写锁，放到专用线程 (单线程内串行，不会重复初始化)
+        return await cls._run_store(cls._open_store)
+
+    @classmethod
+    async def call(cls, provider: str, key: str, request: RequestFn) -> UpstreamResponse:
+        if cls.mode == "off": return await cls._throttled(provider, request)
+
+        pending = cls._inflight.get(key)
+        if pending is not None:
+            UPSTREAM_COALESCED.inc(provider, "local")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            if cls.mode == "shared":
+                resp = await cls._shared_call(provider, key, request)
+            else:
+                resp = await cls._throttled(provider, request)
+            future.set_result(resp)
+            return resp
+        except BaseException as e:
+            # 领头请求被取消时，等待者按网络错误处理而不是被连带取消
+            future.set_exception(e if isinstance(e, Exception) else ConnectionError("上游请求已取消"))
+            future.exception()
+            raise
+        finally:
+            cls._inflight.pop(key, None)
+
+    @classmethod
+    async def _shared_call(cls, provider: str, key: str, request: RequestFn) -> UpstreamResponse:
+        store = await cls._get_store()
+        if store is None: return await cls._throttled(provider, request)
+        run = cls._run_store
+
+        deadline = time.monotonic() + FLIGHT_LEASE
+        try:
+            while True:
+                cached = await run(store.get_response, key)
+                if cached is not None:
+                    UPSTREAM_COALESCED.inc(provider, "shared")
+                    return cached
+                if await run(store.try_acquire, key, cls.owner): break
+                if time.monotonic() > deadline: return await cls._throttled(provider, request)
+                await asyncio.sleep(POLL_INTERVAL)
+            # 抢到租约前领头者可能刚好写入了响应
+            cached = await run(store.get_response, key)
+        except sqlite3.Error as e:
+            logger.debug(f"[Upstream] 跨进程协调失败，直接请求: {e}")
+            return await cls._throttled(provider, request)
+
+        try:
+            if cached is not None:
+                UPSTREAM_COALESCED.inc(provider, "shared")
+                return cached
+            resp = await cls._throttled(provider, request)
+            # 5xx / 429 不共享，等待中的 worker 各自重试
+            if resp.status_code < 500 and resp.status_code != 429:
+                try:
+                    await run(store.put_response, key, resp)
+                except sqlite3.Error as e:
+                    logger.debug(f"[Upstream] 共享响应写入失败: {e}")
+            return resp
+        finally:
+            try:
+                await run(store.release, key, cls.owner)
+            except sqlite3.Error:
+                pass
+
+    @classmethod
+    async def _take_token(cls, provider: str, rate: float) -> float:
+        if cls.mode == "shared":
+            store = await cls._get_store()
+            if store is not None:
+                try:
+                    return await cls._run_store(store.take_token, provider, rate)
+                except sqlite3.Error as e:
+                    logger.debug(f"[Upstream] 共享令牌桶不可用，使用进程内令牌桶: {e}")
+        now = time.time()
+        wait, tokens = _refill_and_take(cls._buckets.get(provider), now, rate)
+        cls._buckets[provider] = (tokens, now)
+        return wait
+
+    @classmethod
+    async def _throttled(cls, provider: str, request: RequestFn) -> UpstreamResponse:
+        rate = cls.rates.get(provider) or 0
+        if rate > 0:
+            waited = 0.0
+            while True:
+                wait = await cls._take_token(provider, rate)
+                if wait <= 0: break
+                waited += wait
+                await asyncio.sleep(wait)
+            if waited: UPSTREAM_THROTTLE.observe(waited, provider)
+        return await request()